@@ -0,0 +1,67 @@
+"""
+Memory footprint of the activity tracker vs. a plain per-member dict.
+
+Run from the repository root:
+
+    python -m Benchmarks.activity_footprint
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+
+from Utils.activity import ActivityTracker
+
+
+def _measure(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size, obj
+
+
+def _member_ids(n: int) -> list[int]:
+    rng = random.Random(n)
+    return [rng.randrange(10 ** 17, 10 ** 18) for _ in range(n)]
+
+
+def run(n: int) -> None:
+    ids = _member_ids(n)
+    now = int(time.time())
+
+    def build_tracker():
+        tracker = ActivityTracker()
+        for i, member_id in enumerate(ids):
+            tracker.record_message(member_id, now - i)
+            tracker.record_voice(member_id, now - 2 * i)
+        return tracker
+
+    def build_dicts():
+        data = {}
+        for i, member_id in enumerate(ids):
+            data[member_id] = {"last_message": float(now - i), "last_voice": float(now - 2 * i)}
+        return data
+
+    tracker_bytes, tracker = _measure(build_tracker)
+    dict_bytes, _ = _measure(build_dicts)
+
+    start = time.perf_counter()
+    for member_id in ids:
+        tracker.record_message(member_id, now)
+    per_event_ns = (time.perf_counter() - start) / n * 1e9
+
+    print(
+        f"{n:>7,} members | tracker {tracker_bytes / 1024:>9,.0f} KiB ({tracker_bytes / n:5.1f} B/member) | "
+        f"dict-of-dicts {dict_bytes / 1024:>9,.0f} KiB ({dict_bytes / n:5.1f} B/member) | "
+        f"record {per_event_ns:5.0f} ns/event"
+    )
+
+
+if __name__ == "__main__":
+    for n in (10_000, 100_000):
+        run(n)
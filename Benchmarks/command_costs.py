@@ -0,0 +1,153 @@
+"""
+Per-command cost benchmark, run offline against the fake Discord harness.
+
+Every slash command registered by the cogs in ``Cogs/`` is invoked with a
+valid value for each parameter, as a bot admin, and measured for:
+
+- handler CPU time (median over ``--iterations`` runs)
+- peak and retained Python allocations for one invocation (tracemalloc;
+  retained includes the fake API's record of the calls it received)
+- REST calls per invocation, including anything queued by the handler
+  (outbound posts, side effects) that is sent before the bot goes quiet
+
+Run from the repository root:
+
+    python -m Benchmarks.command_costs
+    python -m Benchmarks.command_costs --command caselog --routes
+    python -m Benchmarks.command_costs --json costs.json   # for diffing between commits
+
+A command that waits on a button or modal shows as ``timeout``; an error
+raised by the handler shows its exception type. Both still report the cost
+up to that point.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from Benchmarks.fake_discord import Harness
+
+
+@dataclass
+class CommandCost:
+    command: str
+    status: str
+    cpu_ms: float
+    wall_ms: float
+    peak_kib: float
+    retained_kib: float
+    rest_calls: int
+    routes: dict[str, int] = field(default_factory=dict)
+
+
+async def _invoke_once(harness: Harness, name: str, timeout: float) -> tuple[str, float, float, list]:
+    command = harness.commands()[name]
+    interaction = harness.command_interaction(command)
+    before = len(harness.api.calls)
+    status = "ok"
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        await harness.invoke(interaction, timeout)
+    except asyncio.TimeoutError:
+        status = "timeout"
+    except Exception as e:
+        status = type(e).__name__
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    error = harness.errors.pop(interaction.id, None)
+    if error is not None and status == "ok":
+        status = type(error).__name__
+    await harness.settle()
+    return status, cpu * 1000, wall * 1000, harness.api.calls[before:]
+
+
+async def measure(harness: Harness, name: str, iterations: int, timeout: float) -> CommandCost:
+    # Warm-up run so imports, caches and lazily created stores aren't billed to the command
+    await _invoke_once(harness, name, timeout)
+
+    cpu_samples, wall_samples, rest_samples = [], [], []
+    status, calls = "ok", []
+    for _ in range(iterations):
+        status, cpu_ms, wall_ms, calls = await _invoke_once(harness, name, timeout)
+        cpu_samples.append(cpu_ms)
+        wall_samples.append(wall_ms)
+        rest_samples.append(len(calls))
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start_current, _ = tracemalloc.get_traced_memory()
+    await _invoke_once(harness, name, timeout)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return CommandCost(
+        command=name,
+        status=status,
+        cpu_ms=statistics.median(cpu_samples),
+        wall_ms=statistics.median(wall_samples),
+        peak_kib=(peak - start_current) / 1024,
+        retained_kib=max(0, current - start_current) / 1024,
+        rest_calls=int(statistics.median(rest_samples)),
+        routes=dict(Counter(call.route for call in calls)),
+    )
+
+
+async def run(names: Optional[list[str]], iterations: int, timeout: float) -> tuple[list[CommandCost], dict[str, str]]:
+    harness = Harness()
+    await harness.start()
+    try:
+        available = harness.commands()
+        selected = sorted(available) if not names else [n for n in names if n in available]
+        results = [await measure(harness, name, iterations, timeout) for name in selected]
+        failures = {ext: f"{type(e).__name__}: {e}" for ext, e in harness.load_failures.items()}
+        return results, failures
+    finally:
+        await harness.close()
+
+
+def report(results: list[CommandCost], failures: dict[str, str], routes: bool) -> str:
+    lines = [f"{'command':<20} {'status':<18} {'cpu':>8} {'wall':>9} {'peak':>9} {'retained':>9} {'rest':>5}"]
+    for r in results:
+        lines.append(
+            f"/{r.command:<19} {r.status[:18]:<18} {r.cpu_ms:>6.2f}ms {r.wall_ms:>7.1f}ms "
+            f"{r.peak_kib:>6.0f}KiB {r.retained_kib:>6.1f}KiB {r.rest_calls:>5}"
+        )
+        if routes:
+            for route, count in sorted(r.routes.items(), key=lambda item: -item[1]):
+                lines.append(f"    {count:>3} × {route}")
+    if failures:
+        lines.append("\nCogs that failed to load:")
+        lines.extend(f"  {ext}: {error}" for ext, error in failures.items())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every slash command against a fake Discord client.")
+    parser.add_argument("--command", action="append", help="Only benchmark this command (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=2.0, help="Seconds before a waiting command is abandoned")
+    parser.add_argument("--routes", action="store_true", help="List the REST routes each command called")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Cogs log their own failures; the table already reports them
+    logging.basicConfig(level=logging.CRITICAL)
+    results, failures = asyncio.run(run(args.command, args.iterations, args.timeout))
+    print(report(results, failures, args.routes))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": [asdict(r) for r in results], "load_failures": failures}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
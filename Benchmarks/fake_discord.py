@@ -0,0 +1,603 @@
+"""
+Offline stand-in for Discord, for benchmarks and load tests.
+
+Rather than hand-written mocks, this builds real discord.py objects (Guild,
+Member, TextChannel, Message, Interaction) from synthetic gateway payloads on
+a real ``commands.Bot`` that never logs in. REST traffic is intercepted at the
+two places discord.py sends it (``HTTPClient.request`` and the interaction
+webhook adapter), recorded, and answered by ``FakeDiscordAPI`` with plausible
+payloads, so cogs run their real code paths without a network.
+
+The guild is built from ``config``: every role ID in ``ROLE_CONFIG`` becomes
+a role and every ID in ``CHANNEL_CONFIG`` a channel, so permission checks
+and configured channel lookups resolve the way they do in production.
+
+    harness = Harness()
+    await harness.start()                # loads every cog in Cogs/
+    interaction = harness.command_interaction(harness.commands()["ping"])
+    await harness.invoke(interaction)
+    print(harness.api.calls)
+    await harness.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Iterable, Optional, Union
+
+import discord
+from discord import app_commands
+from discord.enums import AppCommandOptionType
+from discord.ext import commands
+from discord.webhook.async_ import async_context
+import config
+
+GUILD_ID = 1100000000000000001
+APPLICATION_ID = 1100000000000000002
+BOT_USER_ID = 1100000000000000003
+INVOKER_ID = 1100000000000000004
+TARGET_ID = 1100000000000000005
+GENERAL_CHANNEL_ID = 1100000000000000006
+ADMIN_ROLE_ID = 1100000000000000007
+VOICE_CHANNEL_ID = 1100000000000000008
+CATEGORY_ID = 1100000000000000009
+
+ALL_PERMISSIONS = str(discord.Permissions.all().value)
+
+# Settings that would otherwise bind ports, start threads or write traces during a run
+HARNESS_CONFIG = {
+    'METRICS_PORT': None,
+    'STALL_DETECTOR_ENABLED': False,
+    'TRACING_ENABLED': False,
+}
+
+_snowflakes = itertools.count(discord.utils.time_snowflake(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)))
+
+
+def snowflake() -> int:
+    return next(_snowflakes)
+
+
+def _now_iso() -> str:
+    return discord.utils.utcnow().isoformat()
+
+
+def _ids(value: Any) -> Iterable[int]:
+    if isinstance(value, int) and value > 0:
+        yield value
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            yield from _ids(item)
+
+
+def user_payload(user_id: int, name: str, bot: bool = False) -> dict[str, Any]:
+    return {"id": str(user_id), "username": name, "global_name": name, "discriminator": "0", "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, name: str, roles: Iterable[int] = (), bot: bool = False) -> dict[str, Any]:
+    return {
+        "user": user_payload(user_id, name, bot),
+        "roles": [str(r) for r in roles],
+        "joined_at": _now_iso(),
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+        "nick": None,
+    }
+
+
+def interaction_payload(kind: int, data: dict[str, Any], member: dict[str, Any], channel_id: int = GENERAL_CHANNEL_ID,
+                        message: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """An INTERACTION_CREATE payload from ``member`` (which should carry ``permissions``)."""
+    interaction_id = snowflake()
+    payload = {
+        "id": str(interaction_id), "type": kind, "token": f"harness-{interaction_id}", "version": 1,
+        "application_id": str(APPLICATION_ID), "guild_id": str(GUILD_ID), "channel_id": str(channel_id),
+        "channel": {"id": str(channel_id), "type": 0, "guild_id": str(GUILD_ID), "name": "general"},
+        "member": member, "data": data, "locale": "en-US", "guild_locale": "en-US",
+        "app_permissions": ALL_PERMISSIONS, "entitlements": [], "attachment_size_limit": 8 * 1024 * 1024,
+        "authorizing_integration_owners": {}, "context": 0,
+    }
+    if message is not None:
+        payload["message"] = message
+    return payload
+
+
+def voice_state_payload(member: dict[str, Any], channel_id: Optional[int]) -> dict[str, Any]:
+    """A VOICE_STATE_UPDATE payload moving ``member`` into ``channel_id`` (None to disconnect)."""
+    return {
+        "guild_id": str(GUILD_ID), "channel_id": str(channel_id) if channel_id else None,
+        "user_id": member["user"]["id"], "member": member, "session_id": "harness",
+        "deaf": False, "mute": False, "self_deaf": False, "self_mute": False, "self_video": False,
+        "suppress": False, "request_to_speak_timestamp": None,
+    }
+
+
+def message_payload(channel_id: int, content: str = "", components: Optional[list[dict[str, Any]]] = None,
+                    message_id: Optional[int] = None, author: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    return {
+        "id": str(message_id or snowflake()),
+        "channel_id": str(channel_id),
+        "author": author or user_payload(BOT_USER_ID, "NZDF Bot", bot=True),
+        "content": content,
+        "embeds": [],
+        "components": components or [],
+        "attachments": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": _now_iso(),
+        "edited_timestamp": None,
+        "type": 0,
+        "flags": 0,
+    }
+
+
+@dataclass
+class RestCall:
+    method: str
+    path: str
+    url: str
+    payload: Optional[dict[str, Any]]
+    at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+class _Response(SimpleNamespace):
+    """Enough of an aiohttp response for ``discord.HTTPException``."""
+
+
+class FakeGateway:
+    """Stands in for the gateway websocket: a fixed heartbeat latency and no-op sends."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.open = False
+        self.sent: list[tuple[str, tuple, dict]] = []
+
+    def is_ratelimited(self) -> bool:
+        return False
+
+    async def change_presence(self, *args: Any, **kwargs: Any) -> None:
+        self.sent.append(("change_presence", args, kwargs))
+
+    async def voice_state(self, *args: Any, **kwargs: Any) -> None:
+        self.sent.append(("voice_state", args, kwargs))
+
+    async def request_chunks(self, *args: Any, **kwargs: Any) -> None:
+        self.sent.append(("request_chunks", args, kwargs))
+
+    async def close(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+class FakeDiscordAPI:
+    """Records REST calls and answers them with payloads discord.py can parse.
+
+    ``latency`` adds a simulated round trip (seconds) to every call, which the
+    replay and load harnesses use to model a real API; ``jitter`` adds up to
+    that much more at random, so concurrent calls can complete out of order.
+    Editing a message after deleting it raises ``NotFound``, as Discord does.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.inflight = 0
+        self.calls: list[RestCall] = []
+        self.members: dict[int, dict[str, Any]] = {}
+        self.channels: dict[int, dict[str, Any]] = {}
+        self.messages: dict[int, dict[str, Any]] = {}
+        self.deleted: set[int] = set()
+        # Interaction token -> ID of its original response message, for @original edits
+        self.originals: dict[str, int] = {}
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+    # -- discord.py entry points -------------------------------------------------
+
+    async def request(self, route: discord.http.Route, *args: Any, **kwargs: Any) -> Any:
+        payload = self._payload(kwargs)
+        self.calls.append(RestCall(route.method, route.path, route.url, payload))
+        if self.latency or self.jitter:
+            self.inflight += 1
+            try:
+                await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+            finally:
+                self.inflight -= 1
+        return self.respond(route, payload or {})
+
+    @staticmethod
+    def _payload(kwargs: dict[str, Any]) -> Optional[dict[str, Any]]:
+        # HTTPClient passes json=/form=, the webhook adapter payload=/multipart=
+        for key in ('json', 'payload'):
+            if isinstance(kwargs.get(key), dict):
+                return kwargs[key]
+        for key in ('form', 'multipart'):
+            for part in kwargs.get(key) or []:
+                if part.get('name') == 'payload_json':
+                    try:
+                        return json.loads(part['value'])
+                    except (TypeError, ValueError):
+                        return None
+        return None
+
+    # -- responses ---------------------------------------------------------------
+
+    def message(self, channel_id: int, data: Optional[dict[str, Any]] = None, message_id: Optional[int] = None) -> dict[str, Any]:
+        """Create (or update, when ``message_id`` is known) a stored message from a send/edit payload."""
+        data = data or {}
+        if message_id in self.deleted:
+            raise self._not_found("Message")
+        existing = self.messages.get(message_id) if message_id else None
+        message = dict(existing) if existing else message_payload(channel_id, message_id=message_id)
+        for key in ("content", "embeds", "components", "flags"):
+            if data.get(key) is not None:
+                message[key] = data[key]
+        if existing:
+            message["edited_timestamp"] = _now_iso()
+        self.messages[int(message["id"])] = message
+        return message
+
+    def _not_found(self, what: str) -> discord.NotFound:
+        return discord.NotFound(_Response(status=404, reason="Not Found"), {"code": 10000, "message": f"Unknown {what}"})  # type: ignore[arg-type]
+
+    def respond(self, route: discord.http.Route, payload: dict[str, Any]) -> Any:
+        path, method = route.path, route.method
+        params = route.url.rsplit('/', 1)[-1].split('?', 1)[0]
+        channel_id = int(route.channel_id) if route.channel_id else None
+
+        if path == '/interactions/{webhook_id}/{webhook_token}/callback':
+            kind = payload.get("type", 4)
+            data = payload.get("data") or {}
+            interaction_id = route.url.split('/interactions/', 1)[1].split('/', 1)[0]
+            response: dict[str, Any] = {"interaction": {
+                "id": interaction_id,
+                "type": 2,
+                "response_message_loading": kind == 5,
+                "response_message_ephemeral": bool((data.get("flags") or 0) & 64),
+            }}
+            if kind in (4, 5, 7):
+                message = self.message(GENERAL_CHANNEL_ID, data)
+                self.originals[route.webhook_token or ""] = int(message["id"])
+                response["interaction"]["response_message_id"] = message["id"]
+                response["resource"] = {"type": kind, "message": message}
+            return response
+        if path == '/webhooks/{webhook_id}/{webhook_token}' and method == 'POST':
+            return self.message(GENERAL_CHANNEL_ID, payload)
+        if path == '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}':
+            original = params in ('@original', '%40original')
+            message_id = self.originals.get(route.webhook_token or "") if original else int(params)
+            if method == 'DELETE':
+                self.messages.pop(message_id or 0, None)
+                self.deleted.add(message_id or 0)
+                return None
+            return self.message(GENERAL_CHANNEL_ID, payload, message_id)
+        if path == '/channels/{channel_id}/messages':
+            return self.message(channel_id, payload) if method == 'POST' else []
+        if path == '/channels/{channel_id}/messages/{message_id}':
+            if method == 'DELETE':
+                self.messages.pop(int(params), None)
+                self.deleted.add(int(params))
+                return None
+            return self.message(channel_id, payload, int(params))
+        if path in ('/channels/{channel_id}/threads', '/channels/{channel_id}/messages/{message_id}/threads'):
+            thread = {
+                "id": str(snowflake()), "type": payload.get("type", 11), "name": payload.get("name", "thread"),
+                "guild_id": str(GUILD_ID), "parent_id": str(channel_id), "owner_id": str(BOT_USER_ID),
+                "thread_metadata": {"archived": False, "auto_archive_duration": 1440, "archive_timestamp": _now_iso(), "locked": False},
+                "message_count": 0, "member_count": 1, "rate_limit_per_user": 0,
+            }
+            self.channels[int(thread["id"])] = thread
+            return thread
+        if path == '/channels/{channel_id}' and method == 'PATCH':
+            channel = dict(self.channels.get(channel_id) or {"id": str(channel_id), "type": 0, "guild_id": str(GUILD_ID), "position": 0})
+            channel.update({k: v for k, v in payload.items() if k in ("name", "topic", "parent_id", "archived", "locked")})
+            if "archived" in payload or "locked" in payload:
+                metadata = dict(channel.get("thread_metadata") or {})
+                metadata.update({k: payload[k] for k in ("archived", "locked") if k in payload})
+                metadata.setdefault("archive_timestamp", _now_iso())
+                metadata.setdefault("auto_archive_duration", 1440)
+                channel["thread_metadata"] = metadata
+            self.channels[channel_id] = channel
+            return channel
+        if path == '/users/@me/channels':
+            recipient = int(payload.get("recipient_id", TARGET_ID))
+            member = self.members.get(recipient)
+            user = member["user"] if member else user_payload(recipient, f"user{recipient}")
+            return {"id": str(snowflake()), "type": 1, "recipients": [user], "last_message_id": None}
+        if path == '/guilds/{guild_id}/members/{user_id}':
+            if method == 'GET':
+                member = self.members.get(int(params))
+                if member is None:
+                    raise self._not_found("Member")
+                return member
+            return None
+        if path == '/users/{user_id}':
+            member = self.members.get(int(params))
+            if member is None:
+                raise self._not_found("User")
+            return member["user"]
+        if path == '/gateway':
+            return {"url": "wss://gateway.discord.gg"}
+        if method in ('PUT', 'DELETE'):
+            return None
+        return {}
+
+
+class Harness:
+    """A bot with every cog loaded, a fake guild, and REST answered by ``FakeDiscordAPI``."""
+
+    def __init__(self, api: Optional[FakeDiscordAPI] = None, data_dir: Optional[str] = None):
+        self.api = api or FakeDiscordAPI()
+        self.data_dir = data_dir
+        self.bot: commands.Bot = commands.Bot(command_prefix='!', intents=discord.Intents.all())
+        self.guild: Optional[discord.Guild] = None
+        self.errors: dict[int, BaseException] = {}
+        self.load_failures: dict[str, BaseException] = {}
+        self._config_backup: dict[str, Any] = {}
+        self._tempdir: Optional[tempfile.TemporaryDirectory] = None
+        self._adapter_request: Any = None
+
+    # -- lifecycle ----------------------------------------------------------------
+
+    def _override_config(self) -> None:
+        if self.data_dir is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix="nzdf-bench-")
+            self.data_dir = self._tempdir.name
+        overrides = dict(HARNESS_CONFIG, DATA_DIR=self.data_dir)
+        for key, value in overrides.items():
+            self._config_backup[key] = getattr(config, key, None)
+            setattr(config, key, value)
+        # The invoker acts as a bot admin so commands take their main path
+        self._admins_backup = list(config.BOT_ADMINS)
+        if INVOKER_ID not in config.BOT_ADMINS:
+            config.BOT_ADMINS.append(INVOKER_ID)
+
+    def _restore_config(self) -> None:
+        for key, value in self._config_backup.items():
+            setattr(config, key, value)
+        config.BOT_ADMINS[:] = self._admins_backup
+
+    async def start(self, extensions: Optional[Iterable[str]] = None) -> None:
+        self._override_config()
+        bot = self.bot
+        await bot.__aenter__()
+        bot.ws = FakeGateway()  # type: ignore[assignment]
+        bot.http.request = self.api.request  # type: ignore[method-assign]
+        adapter = async_context.get()
+        self._adapter_request = adapter.request
+        adapter.request = self.api.request  # type: ignore[method-assign]
+
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data=user_payload(BOT_USER_ID, "NZDF Bot", bot=True))  # type: ignore[arg-type]
+        state.application_id = APPLICATION_ID
+        self.guild = self._build_guild()
+        state._add_guild(self.guild)
+
+        async def on_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+            # Stands in for bot.py's handler, including the event cogs count failures from
+            bot.dispatch("app_command_failed", interaction, error)
+            self.errors[interaction.id] = getattr(error, 'original', error)
+
+        bot.tree.on_error = on_error  # type: ignore[method-assign]
+
+        if extensions is None:
+            extensions = sorted(
+                f"Cogs.{name[:-3]}" for name in os.listdir(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Cogs'))
+                if name.endswith('.py') and name != '__init__.py'
+            )
+        for extension in extensions:
+            try:
+                await bot.load_extension(extension)
+            except Exception as e:
+                self.load_failures[extension] = e
+
+    async def close(self) -> None:
+        for extension in list(self.bot.extensions):
+            try:
+                await self.bot.unload_extension(extension)
+            except Exception:
+                pass
+        if self._adapter_request is not None:
+            async_context.get().request = self._adapter_request  # type: ignore[method-assign]
+        await self.bot.close()
+        self._restore_config()
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+
+    # -- fixtures -----------------------------------------------------------------
+
+    def _build_guild(self) -> discord.Guild:
+        role_ids = sorted(set(_ids(list(getattr(config, 'ROLE_CONFIG', {}).values()))))
+        roles = [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                  "hoist": False, "managed": False, "mentionable": False, "flags": 0}]
+        roles.append({"id": str(ADMIN_ROLE_ID), "name": "Harness Admin", "permissions": ALL_PERMISSIONS,
+                      "position": len(role_ids) + 2, "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0})
+        for position, role_id in enumerate(role_ids, start=1):
+            roles.append({"id": str(role_id), "name": f"role-{role_id}", "permissions": "0", "position": position,
+                          "color": 0, "hoist": False, "managed": False, "mentionable": True, "flags": 0})
+
+        channels = [
+            {"id": str(GENERAL_CHANNEL_ID), "type": 0, "name": "general", "position": 0, "permission_overwrites": []},
+            {"id": str(VOICE_CHANNEL_ID), "type": 2, "name": "voice", "position": 1, "permission_overwrites": [],
+             "bitrate": 64000, "user_limit": 0},
+            {"id": str(CATEGORY_ID), "type": 4, "name": "category", "position": 2, "permission_overwrites": []},
+        ]
+        for key, value in (getattr(config, 'CHANNEL_CONFIG', {}) or {}).items():
+            kind = 4 if key.endswith('CATEGORY') else 0
+            for channel_id in _ids(value):
+                channels.append({"id": str(channel_id), "type": kind, "name": key.lower(), "position": len(channels), "permission_overwrites": []})
+        for channel_id in _ids(getattr(config, 'SESSION_VOICE_CHANNELS', [])):
+            channels.append({"id": str(channel_id), "type": 2, "name": "session-vc", "position": len(channels),
+                             "permission_overwrites": [], "bitrate": 64000, "user_limit": 0})
+        for channel in channels:
+            channel["guild_id"] = str(GUILD_ID)
+            self.api.channels[int(channel["id"])] = channel
+
+        members = [
+            member_payload(BOT_USER_ID, "NZDF Bot", [ADMIN_ROLE_ID], bot=True),
+            member_payload(INVOKER_ID, "Benchmark Invoker", [ADMIN_ROLE_ID, *role_ids]),
+            member_payload(TARGET_ID, "Benchmark Target", role_ids[:1]),
+        ]
+        for member in members:
+            self.api.members[int(member["user"]["id"])] = member
+
+        guild = discord.Guild(data={  # type: ignore[arg-type]
+            "id": str(GUILD_ID), "name": "Benchmark Guild", "owner_id": str(INVOKER_ID), "roles": roles,
+            "channels": channels, "members": members, "member_count": len(members), "features": [], "emojis": [],
+            "stickers": [], "premium_tier": 0, "afk_timeout": 300, "verification_level": 0,
+            "default_message_notifications": 0, "explicit_content_filter": 0, "mfa_level": 0, "nsfw_level": 0,
+            "preferred_locale": "en-US", "system_channel_flags": 0, "large": False,
+        }, state=self.bot._connection)
+        return guild
+
+    def add_member(self, user_id: int, name: Optional[str] = None, roles: Iterable[int] = ()) -> discord.Member:
+        assert self.guild is not None
+        data = member_payload(user_id, name or f"member{user_id}", roles)
+        self.api.members[user_id] = data
+        member = discord.Member(data=data, guild=self.guild, state=self.bot._connection)  # type: ignore[arg-type]
+        self.guild._add_member(member)
+        return member
+
+    # -- interactions -------------------------------------------------------------
+
+    def commands(self) -> dict[str, app_commands.Command]:
+        """Every slash command by qualified name."""
+        return {
+            command.qualified_name: command
+            for command in self.bot.tree.walk_commands()
+            if isinstance(command, app_commands.Command)
+        }
+
+    def _interaction_payload(self, kind: int, data: dict[str, Any], user_id: int = INVOKER_ID,
+                             channel_id: int = GENERAL_CHANNEL_ID, message: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        member = dict(self.api.members.get(user_id) or member_payload(user_id, f"member{user_id}"))
+        member["permissions"] = ALL_PERMISSIONS if user_id == INVOKER_ID else "0"
+        return interaction_payload(kind, data, member, channel_id, message)
+
+    def command_interaction(self, command: app_commands.Command, user_id: int = INVOKER_ID,
+                            overrides: Optional[dict[str, Any]] = None) -> discord.Interaction:
+        """An application command interaction filling every parameter with a valid value."""
+        options: list[dict[str, Any]] = []
+        resolved: dict[str, dict[str, Any]] = {}
+        for param in command.parameters:
+            value = (overrides or {}).get(param.name)
+            options.append({"name": param.display_name, "type": param.type.value,
+                            "value": value if value is not None else self._option_value(param, resolved)})
+
+        node: Union[app_commands.Command, app_commands.Group] = command
+        while node.parent is not None:
+            kind = 1 if node is command else 2
+            options = [{"name": node.name, "type": kind, "options": options}]
+            node = node.parent
+        data = {"id": str(snowflake()), "name": node.name, "type": 1, "options": options, "resolved": resolved, "guild_id": str(GUILD_ID)}
+        return discord.Interaction(data=self._interaction_payload(2, data, user_id), state=self.bot._connection)  # type: ignore[arg-type]
+
+    def component_payload(self, message: discord.Message, custom_id: str, user_id: int = INVOKER_ID,
+                          component_type: int = 2, values: Optional[list[str]] = None) -> dict[str, Any]:
+        """An INTERACTION_CREATE payload for a click on ``message`` as it currently stands."""
+        data: dict[str, Any] = {"custom_id": custom_id, "component_type": component_type}
+        if values is not None:
+            data["values"] = values
+        raw = self.api.messages.get(message.id)
+        if raw is None:
+            # A click racing the message's deletion still arrives, carrying the message it was pressed on
+            deleted = message.id in self.api.deleted
+            raw = message_payload(message.channel.id, message_id=message.id) if deleted else self.api.message(message.channel.id, message_id=message.id)
+        return self._interaction_payload(3, data, user_id, message.channel.id, raw)
+
+    def component_interaction(self, message: discord.Message, custom_id: str, user_id: int = INVOKER_ID,
+                              component_type: int = 2, values: Optional[list[str]] = None) -> discord.Interaction:
+        payload = self.component_payload(message, custom_id, user_id, component_type, values)
+        return discord.Interaction(data=payload, state=self.bot._connection)  # type: ignore[arg-type]
+
+    def dispatch(self, event: str, payload: dict[str, Any]) -> None:
+        """Feed a gateway event through discord.py's parser, as the websocket would."""
+        self.bot._connection.parsers[event](payload)
+
+    def _option_value(self, param: app_commands.Parameter, resolved: dict[str, dict[str, Any]]) -> Any:
+        if param.choices:
+            return param.choices[0].value
+        kind = param.type
+        if kind is AppCommandOptionType.string:
+            text = "benchmark"
+            if param.min_value:
+                text = text.ljust(int(param.min_value), "x")
+            return text[: int(param.max_value)] if param.max_value else text
+        if kind in (AppCommandOptionType.integer, AppCommandOptionType.number):
+            value = param.min_value if param.min_value is not None else 1
+            if param.max_value is not None:
+                value = min(value, param.max_value)
+            return int(value) if kind is AppCommandOptionType.integer else float(value)
+        if kind is AppCommandOptionType.boolean:
+            return True
+        if kind in (AppCommandOptionType.user, AppCommandOptionType.mentionable):
+            member = self.api.members[TARGET_ID]
+            resolved.setdefault("users", {})[str(TARGET_ID)] = member["user"]
+            resolved.setdefault("members", {})[str(TARGET_ID)] = {k: v for k, v in member.items() if k != "user"} | {"permissions": "0"}
+            return str(TARGET_ID)
+        if kind is AppCommandOptionType.channel:
+            wanted = {t.value for t in param.channel_types} or {0}
+            channel = next((c for c in self.api.channels.values() if c["type"] in wanted and c.get("guild_id")), None)
+            if channel is None:
+                channel = self.api.channels[GENERAL_CHANNEL_ID]
+            resolved.setdefault("channels", {})[channel["id"]] = {
+                "id": channel["id"], "type": channel["type"], "name": channel.get("name", "channel"), "permissions": ALL_PERMISSIONS,
+            }
+            return channel["id"]
+        if kind is AppCommandOptionType.role:
+            assert self.guild is not None
+            role = max(self.guild.roles, key=lambda r: r.position)
+            resolved.setdefault("roles", {})[str(role.id)] = {
+                "id": str(role.id), "name": role.name, "permissions": str(role.permissions.value), "position": role.position,
+                "color": 0, "hoist": False, "managed": False, "mentionable": True, "flags": 0,
+            }
+            return str(role.id)
+        if kind is AppCommandOptionType.attachment:
+            attachment_id = str(snowflake())
+            resolved.setdefault("attachments", {})[attachment_id] = {
+                "id": attachment_id, "filename": "evidence.png", "size": 1024, "content_type": "image/png",
+                "url": "https://cdn.discordapp.com/attachments/0/0/evidence.png",
+                "proxy_url": "https://media.discordapp.net/attachments/0/0/evidence.png",
+            }
+            return attachment_id
+        return None
+
+    async def invoke(self, interaction: discord.Interaction, timeout: float = 5.0) -> None:
+        """Run an application command interaction the way ``CommandTree`` does on dispatch."""
+        await asyncio.wait_for(self.bot.tree._call(interaction), timeout)
+
+    async def settle(self, quiet: float = 0.005, limit: float = 1.0) -> None:
+        """Wait for work queued by a handler (outbound posts, side effects) to finish sending."""
+        deadline = time.monotonic() + limit
+        seen = -1
+        while time.monotonic() < deadline:
+            await asyncio.sleep(quiet)
+            if len(self.api.calls) == seen and not self.api.inflight and self._queues_empty():
+                return
+            seen = len(self.api.calls)
+
+    def _queues_empty(self) -> bool:
+        outbound = self.bot.get_cog('Outbound')
+        if outbound and outbound.scheduler.depth:  # type: ignore[attr-defined]
+            return False
+        side_effects = self.bot.get_cog('SideEffects')
+        if side_effects and (side_effects.queue.depth or side_effects.queue.running):  # type: ignore[attr-defined]
+            return False
+        return True
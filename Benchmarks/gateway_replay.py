@@ -0,0 +1,416 @@
+"""
+Replay recorded gateway events into the cogs, offline, at 1x-100x speed.
+
+Recordings come from ``/gatewayrecord`` (see ``Utils/gateway_recording.py``)
+or from the ``synth`` scenarios below. Each event is fed through discord.py's
+own parser (``ConnectionState.parsers``), so it dispatches exactly as it
+would from the websocket. REST goes to ``FakeDiscordAPI`` with a simulated
+round trip. Guild IDs are rewritten to the harness guild. Members, roles and
+channels named in the recording are created on first sight. Button clicks
+are re-pointed at the replay's own copy of the message they were pressed on,
+matched by component label, because non-persistent views get new custom IDs
+every run.
+
+Reports per-handler throughput and latency percentiles (listeners, slash
+commands, view callbacks), interaction ack latency against Discord's 3
+second deadline, handler errors and how far the replay fell behind schedule.
+
+Run from the repository root:
+
+    python -m Benchmarks.gateway_replay synth session night.jsonl.gz --voters 60 --seconds 120
+    python -m Benchmarks.gateway_replay synth raid raid.jsonl.gz --members 500 --seconds 60
+    python -m Benchmarks.gateway_replay replay night.jsonl.gz --speed 10 --rest-latency 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Iterable, Iterator, Optional
+
+import discord
+from discord.ext import commands
+import config
+from Benchmarks.fake_discord import (
+    ADMIN_ROLE_ID, ALL_PERMISSIONS, GENERAL_CHANNEL_ID, GUILD_ID, INVOKER_ID, VOICE_CHANNEL_ID, APPLICATION_ID,
+    FakeDiscordAPI, Harness, interaction_payload, member_payload, message_payload, snowflake, voice_state_payload,
+)
+from Utils.gateway_recording import read_recording, write_recording
+
+ACK_DEADLINE = 3.0
+
+_CHANNEL_TYPES = {
+    0: discord.TextChannel, 5: discord.TextChannel, 2: discord.VoiceChannel,
+    4: discord.CategoryChannel, 13: discord.StageChannel, 15: discord.ForumChannel,
+}
+
+
+def _percentiles(values: list[float]) -> tuple[float, float, float, float]:
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return pick(0.5), pick(0.95), pick(0.99), ordered[-1]
+
+
+class _ErrorLogCounter(logging.Handler):
+    """Counts ERROR records by logger; discord.py logs swallowed view and listener errors this way."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.ERROR)
+        self.counts: Counter = Counter()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.counts[record.name] += 1
+
+
+class LatencyProbe:
+    """Times every listener, slash command and view callback while installed."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.inflight = 0
+        self._patches: list[tuple[Any, str, Any]] = []
+
+    def _timed(self, name: str, coro_fn):
+        async def run(*args, **kwargs):
+            self.inflight += 1
+            started = time.perf_counter()
+            try:
+                return await coro_fn(*args, **kwargs)
+            except Exception:
+                self.errors[name] += 1
+                raise
+            finally:
+                self.samples[name].append(time.perf_counter() - started)
+                self.inflight -= 1
+
+        return run
+
+    def _patch(self, owner: Any, attr: str, replacement: Any) -> None:
+        self._patches.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, replacement)
+
+    def install(self) -> None:
+        probe = self
+        run_event = self.bot._run_event
+        tree_call = self.bot.tree._call
+        view_task = discord.ui.view.BaseView._scheduled_task
+        modal_task = discord.ui.Modal._scheduled_task
+
+        async def _run_event(coro, event_name, *args, **kwargs):
+            name = getattr(coro, '__qualname__', event_name)
+            await run_event(probe._timed(name, coro), event_name, *args, **kwargs)
+
+        async def _call(interaction):
+            name = f"/{(interaction.data or {}).get('name', 'unknown')}"
+            await probe._timed(name, tree_call)(interaction)
+
+        async def _view_task(view, item, interaction):
+            await probe._timed(f"{type(view).__name__} (view)", view_task)(view, item, interaction)
+
+        async def _modal_task(modal, interaction, *args, **kwargs):
+            await probe._timed(f"{type(modal).__name__} (modal)", modal_task)(modal, interaction, *args, **kwargs)
+
+        self._patch(self.bot, '_run_event', _run_event)
+        self._patch(self.bot.tree, '_call', _call)
+        self._patch(discord.ui.view.BaseView, '_scheduled_task', _view_task)
+        self._patch(discord.ui.Modal, '_scheduled_task', _modal_task)
+
+    def uninstall(self) -> None:
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+
+
+class Replayer:
+    def __init__(self, harness: Harness):
+        self.harness = harness
+        self.state = harness.bot._connection
+        self.dispatched: dict[int, float] = {}
+        self.unrouted = 0
+        self.skipped: Counter = Counter()
+        self.lateness: list[float] = []
+        # Recorded message ID -> replay message ID, so repeat clicks land on the same message
+        self._messages: dict[int, int] = {}
+
+    # -- fixtures -----------------------------------------------------------------
+
+    def _ensure_role(self, role_id: int) -> None:
+        guild = self.harness.guild
+        assert guild is not None
+        if guild.get_role(role_id) is None:
+            guild._add_role(discord.Role(guild=guild, state=self.state, data={  # type: ignore[arg-type]
+                "id": str(role_id), "name": f"role-{role_id}", "permissions": "0", "position": 1, "color": 0,
+                "hoist": False, "managed": False, "mentionable": True, "flags": 0,
+            }))
+
+    def _ensure_member(self, data: Optional[dict[str, Any]]) -> None:
+        guild = self.harness.guild
+        if not data or "user" not in data or guild is None:
+            return
+        for role_id in data.get("roles", []):
+            self._ensure_role(int(role_id))
+        user_id = int(data["user"]["id"])
+        if guild.get_member(user_id) is None:
+            self.harness.add_member(user_id, data["user"].get("username"), [int(r) for r in data.get("roles", [])])
+
+    def _ensure_channel(self, channel_id: Optional[Any], kind: int = 0, name: str = "replayed") -> None:
+        guild = self.harness.guild
+        if channel_id is None or guild is None or guild.get_channel_or_thread(int(channel_id)) is not None:
+            return
+        factory = _CHANNEL_TYPES.get(kind)
+        if factory is None:
+            return
+        payload = {"id": str(channel_id), "type": kind, "name": name, "position": 0,
+                   "permission_overwrites": [], "guild_id": str(GUILD_ID), "bitrate": 64000, "user_limit": 0}
+        self.harness.api.channels[int(channel_id)] = payload
+        guild._add_channel(factory(state=self.state, guild=guild, data=payload))  # type: ignore[arg-type]
+
+    def _localize(self, event: str, data: dict[str, Any]) -> Optional[dict[str, Any]]:
+        data = dict(data)
+        if "guild_id" in data:
+            data["guild_id"] = str(GUILD_ID)
+        if event == "INTERACTION_CREATE":
+            data["application_id"] = str(APPLICATION_ID)
+            data["token"] = f"replay-{data['id']}"
+            if not data.get("guild_id"):
+                self.skipped["dm interaction"] += 1
+                return None
+            channel = dict(data.get("channel") or {"id": data.get("channel_id"), "type": 0})
+            channel["guild_id"] = str(GUILD_ID)
+            data["channel"] = channel
+            self._ensure_member(data.get("member"))
+            self._ensure_channel(channel.get("id"), channel.get("type", 0), channel.get("name", "replayed"))
+            if data.get("type") == 3 and not self._route_component(data):
+                self.unrouted += 1
+                return None
+        elif event in ("GUILD_MEMBER_UPDATE", "MESSAGE_CREATE"):
+            self._ensure_member(data.get("member") and dict(data["member"], user=data.get("author") or data.get("user")))
+            self._ensure_channel(data.get("channel_id"))
+        elif event == "VOICE_STATE_UPDATE":
+            self._ensure_member(data.get("member"))
+            self._ensure_channel(data.get("channel_id"), 2, "replayed-voice")
+        elif event == "GUILD_MEMBER_ADD":
+            for role_id in data.get("roles", []):
+                self._ensure_role(int(role_id))
+        return data
+
+    # -- component routing --------------------------------------------------------
+
+    @staticmethod
+    def _components(message: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        for row in message.get("components") or []:
+            yield from row.get("components") or [row]
+
+    def _route_component(self, data: dict[str, Any]) -> bool:
+        """Point a recorded click at the matching component on the replay's copy of the message."""
+        recorded = data.get("message") or {}
+        custom_id = (data.get("data") or {}).get("custom_id")
+        target = next((c for c in self._components(recorded) if c.get("custom_id") == custom_id), None)
+        if target is None:
+            return False
+        key = (target.get("type"), target.get("label"))
+
+        api = self.harness.api
+        message = None
+        mapped = self._messages.get(int(recorded.get("id", 0)))
+        if mapped is not None:
+            message = api.messages.get(mapped)
+        if message is None:
+            for candidate in reversed(list(api.messages.values())):
+                if any((c.get("type"), c.get("label")) == key for c in self._components(candidate)):
+                    message = candidate
+                    break
+        if message is None:
+            return False
+        component = next((c for c in self._components(message) if (c.get("type"), c.get("label")) == key), None)
+        if component is None or not component.get("custom_id"):
+            return False
+        self._messages[int(recorded.get("id", 0))] = int(message["id"])
+        data["message"] = message
+        data["data"] = dict(data["data"], custom_id=component["custom_id"])
+        data["channel_id"] = message["channel_id"]
+        data["channel"] = dict(data["channel"], id=message["channel_id"])
+        return True
+
+    # -- replay -------------------------------------------------------------------
+
+    async def run(self, events: Iterable[dict[str, Any]], speed: float) -> tuple[int, float]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        count = 0
+        for record in events:
+            due = start + record["t"] / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.lateness.append(-delay)
+            parser = self.state.parsers.get(record["event"])
+            if parser is None:
+                self.skipped[record["event"]] += 1
+                continue
+            data = self._localize(record["event"], record["d"])
+            if data is None:
+                continue
+            if record["event"] == "INTERACTION_CREATE":
+                self.dispatched[int(data["id"])] = time.perf_counter()
+            parser(data)
+            count += 1
+        return count, loop.time() - start
+
+
+async def replay(path: str, speed: float, rest_latency: float, drain: float) -> str:
+    header, events = read_recording(path)
+    harness = Harness(FakeDiscordAPI(latency=rest_latency))
+    await harness.start()
+    probe = LatencyProbe(harness.bot)
+    error_logs = _ErrorLogCounter()
+    root = logging.getLogger()
+    root.addHandler(error_logs)
+    probe.install()
+    replayer = Replayer(harness)
+    try:
+        fed, elapsed = await replayer.run(events, speed)
+        drain_started = time.monotonic()
+        deadline = drain_started + drain
+        while time.monotonic() < deadline:
+            await harness.settle(limit=max(0.0, deadline - time.monotonic()))
+            if not probe.inflight:
+                break
+        drained = time.monotonic() - drain_started
+    finally:
+        probe.uninstall()
+        root.removeHandler(error_logs)
+        await harness.close()
+
+    acks: dict[int, float] = {}
+    for call in harness.api.calls:
+        if call.path == '/interactions/{webhook_id}/{webhook_token}/callback':
+            interaction_id = int(call.url.split('/interactions/', 1)[1].split('/', 1)[0])
+            acks.setdefault(interaction_id, call.at)
+    ack_latency = [acks[i] - t for i, t in replayer.dispatched.items() if i in acks]
+    unanswered = sum(1 for i in replayer.dispatched if i not in acks)
+    late = sum(1 for latency in ack_latency if latency > ACK_DEADLINE)
+
+    lines = [
+        f"Replayed {fed:,} events from {path} at {speed:g}x in {elapsed:.1f}s "
+        f"({fed / elapsed if elapsed else 0:,.0f} events/s); handlers finished {drained:.1f}s after the last event",
+        f"REST: {len(harness.api.calls):,} calls with {rest_latency * 1000:.0f}ms simulated latency",
+    ]
+    if replayer.lateness:
+        lines.append(f"Fell behind schedule on {len(replayer.lateness):,} events (worst {max(replayer.lateness) * 1000:.0f}ms)")
+    if header.get("recorded_at"):
+        lines.append(f"Recorded {time.strftime('%Y-%m-%d %H:%M', time.localtime(header['recorded_at']))}")
+
+    lines.append(f"\n{'handler':<52} {'count':>6} {'errors':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, samples in sorted(probe.samples.items(), key=lambda item: -len(item[1])):
+        p50, p95, p99, worst = _percentiles(samples)
+        lines.append(
+            f"{name[:52]:<52} {len(samples):>6} {probe.errors[name]:>6} "
+            f"{p50 * 1000:>6.1f}ms {p95 * 1000:>6.1f}ms {p99 * 1000:>6.1f}ms {worst * 1000:>6.1f}ms"
+        )
+
+    lines.append(f"\nInteractions: {len(replayer.dispatched):,} dispatched, {len(ack_latency):,} acknowledged, "
+                 f"{unanswered:,} never answered, {late:,} past the {ACK_DEADLINE:.0f}s deadline, "
+                 f"{replayer.unrouted:,} clicks on messages that don't exist in the replay")
+    if ack_latency:
+        p50, p95, p99, worst = _percentiles(ack_latency)
+        lines.append(f"Ack sent after: p50 {p50 * 1000:.0f}ms • p95 {p95 * 1000:.0f}ms • p99 {p99 * 1000:.0f}ms • max {worst * 1000:.0f}ms")
+    if error_logs.counts:
+        lines.append("Errors logged: " + ", ".join(f"{name} ×{count}" for name, count in error_logs.counts.most_common()))
+    if replayer.skipped:
+        lines.append("Skipped: " + ", ".join(f"{name} ×{count}" for name, count in replayer.skipped.items()))
+    if harness.load_failures:
+        lines.append("Cogs that failed to load: " + ", ".join(harness.load_failures))
+    return "\n".join(lines)
+
+
+# ---------------------- SYNTHETIC SCENARIOS ------------------ #
+
+def _session_roles() -> list[int]:
+    roles = getattr(config, 'ROLE_CONFIG', {}).get('SESSION_ALLOWED_ROLES', [])
+    return [r for r in roles if isinstance(r, int)]
+
+
+def synth_session(voters: int, seconds: float, seed: int = 1) -> list[dict[str, Any]]:
+    """A session night: a vote, a burst of vote/unvote clicks and voice joins, then a shutdown."""
+    rng = random.Random(seed)
+    invoker = member_payload(INVOKER_ID, "Session Host", [ADMIN_ROLE_ID, *_session_roles()])
+    invoker["permissions"] = ALL_PERMISSIONS
+    events = [{"t": 0.0, "event": "INTERACTION_CREATE",
+               "d": interaction_payload(2, {"id": "1", "name": "sessionvote", "type": 1, "options": []}, invoker)}]
+    vote_message = message_payload(GENERAL_CHANNEL_ID, components=[{"type": 1, "components": [
+        {"type": 2, "custom_id": "recorded-vote", "label": "Vote to Start", "style": 1},
+    ]}])
+
+    for i in range(voters):
+        member = member_payload(snowflake(), f"voter{i}", _session_roles())
+        member["permissions"] = "0"
+        joined = rng.uniform(0.5, seconds)
+        events.append({"t": joined, "event": "VOICE_STATE_UPDATE", "d": voice_state_payload(member, VOICE_CHANNEL_ID)})
+        clicks = 1 + (rng.random() < 0.25) + (rng.random() < 0.1)
+        at = rng.uniform(1.0, seconds)
+        for _ in range(clicks):
+            events.append({"t": at, "event": "INTERACTION_CREATE", "d": interaction_payload(
+                3, {"custom_id": "recorded-vote", "component_type": 2}, member, GENERAL_CHANNEL_ID, vote_message)})
+            at += rng.uniform(0.2, 3.0)
+        if rng.random() < 0.3:
+            events.append({"t": rng.uniform(joined, seconds + 5), "event": "VOICE_STATE_UPDATE", "d": voice_state_payload(member, None)})
+
+    events.append({"t": seconds + 10, "event": "INTERACTION_CREATE",
+                   "d": interaction_payload(2, {"id": "2", "name": "sessionshutdown", "type": 1, "options": []}, invoker)})
+    return sorted(events, key=lambda e: e["t"])
+
+
+def synth_raid(members: int, seconds: float, seed: int = 1) -> list[dict[str, Any]]:
+    """A join raid: ``members`` new accounts joining over ``seconds``."""
+    rng = random.Random(seed)
+    events = []
+    for i in range(members):
+        data = member_payload(snowflake(), f"raider{i}")
+        data["guild_id"] = str(GUILD_ID)
+        events.append({"t": rng.uniform(0, seconds), "event": "GUILD_MEMBER_ADD", "d": data})
+    return sorted(events, key=lambda e: e["t"])
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record/replay load testing against a fake Discord API.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    play = sub.add_parser("replay", help="Replay a recording into the cogs")
+    play.add_argument("path")
+    play.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier (1-100)")
+    play.add_argument("--rest-latency", type=float, default=50.0, help="Simulated REST round trip in ms")
+    play.add_argument("--drain", type=float, default=30.0, help="Seconds to wait for handlers after the last event")
+
+    synth = sub.add_parser("synth", help="Write a synthetic scenario recording")
+    synth.add_argument("scenario", choices=("session", "raid"))
+    synth.add_argument("path")
+    synth.add_argument("--voters", type=int, default=40)
+    synth.add_argument("--members", type=int, default=300)
+    synth.add_argument("--seconds", type=float, default=60.0)
+    synth.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.mode == "synth":
+        events = (synth_session(args.voters, args.seconds, args.seed) if args.scenario == "session"
+                  else synth_raid(args.members, args.seconds, args.seed))
+        count = write_recording(args.path, events, {"guild_ids": [GUILD_ID], "synthetic": args.scenario})
+        print(f"Wrote {count:,} events to {args.path}")
+        return
+
+    if not 1 <= args.speed <= 100:
+        parser.error("--speed must be between 1 and 100")
+    # Errors are counted into the report rather than printed
+    logging.getLogger().setLevel(logging.ERROR)
+    print(asyncio.run(replay(args.path, args.speed, args.rest_latency / 1000, args.drain)))
+
+
+if __name__ == "__main__":
+    main()
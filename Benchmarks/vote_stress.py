@@ -0,0 +1,265 @@
+"""
+Concurrent vote stress test and correctness checker for ``SessionVoteView``.
+
+Hundreds of members click the session vote button at once, against the real
+Session cog on the fake Discord harness (no network). Clicks go through
+discord.py's own gateway parser, and REST calls get a jittered round trip, so
+handlers interleave and edits complete out of order the way they do live.
+
+Two scenarios:
+
+- ``toggle``: every member clicks a random number of times with quorum out of
+  reach. The tally must equal the members with an odd number of clicks. The
+  last edit of the vote message must show that tally. Every click must get
+  exactly one reply. There must be no more edits than clicks, since edits
+  are coalesced.
+- ``quorum``: every member clicks once with the normal quorum. Exactly one
+  session must start. The vote message must be deleted once and never edited
+  afterwards. Every click after quorum must be told the vote has closed.
+
+Exits non-zero if any check fails, so CI can run it:
+
+    python -m Benchmarks.vote_stress
+    python -m Benchmarks.vote_stress --scenario toggle --voters 500 --rest-latency 40 --jitter 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import discord
+import config
+from Benchmarks.fake_discord import INVOKER_ID, FakeDiscordAPI, Harness, RestCall
+from Benchmarks.gateway_replay import LatencyProbe, _ErrorLogCounter, _percentiles
+
+FIRST_VOTER_ID = 1200000000000000000
+VOTE_LABEL = "Vote to Start"
+ONLINE_TITLE = "🟢 Session is Now ONLINE!"
+VIEW_HANDLER = "SessionVoteView (view)"
+CALLBACK_PATH = '/interactions/{webhook_id}/{webhook_token}/callback'
+MESSAGE_PATH = '/channels/{channel_id}/messages/{message_id}'
+
+
+@dataclass
+class Outcome:
+    scenario: str
+    clicks: int
+    seconds: float
+    edits: int
+    latencies: list[float] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.clicks / self.seconds if self.seconds else 0.0
+
+    def check(self, ok: bool, failure: str) -> None:
+        if not ok:
+            self.failures.append(failure)
+
+
+def _session_roles() -> list[int]:
+    roles = getattr(config, 'ROLE_CONFIG', {}).get('SESSION_ALLOWED_ROLES', [])
+    return [r for r in roles if isinstance(r, int)]
+
+
+def _content(call: RestCall) -> str:
+    return str(((call.payload or {}).get("data") or {}).get("content") or "")
+
+
+def _embed_field(embeds: list[dict[str, Any]], name: str) -> str:
+    for embed in embeds:
+        for embed_field in embed.get("fields") or []:
+            if embed_field.get("name") == name:
+                return str(embed_field.get("value"))
+    return ""
+
+
+async def _open_vote(harness: Harness) -> tuple[discord.Message, Any, str]:
+    cog = harness.bot.get_cog('Session')
+    if cog is None:
+        raise RuntimeError(f"Session cog did not load: {harness.load_failures.get('Cogs.session')!r}")
+    assert harness.guild is not None
+    message = await cog.start_vote(harness.guild, harness.guild.get_member(INVOKER_ID))  # type: ignore[attr-defined]
+    if message is None:
+        raise RuntimeError("start_vote did not post a vote message; is SESSION_STATUS_CHANNEL configured?")
+    view = harness.bot._connection._view_store._synced_message_views[message.id]
+    raw = harness.api.messages[message.id]
+    custom_id = next(
+        component["custom_id"]
+        for row in raw["components"]
+        for component in row.get("components", [])
+        if component.get("label") == VOTE_LABEL
+    )
+    await harness.settle()
+    return message, view, custom_id
+
+
+async def _fire(harness: Harness, probe: LatencyProbe, message: discord.Message, custom_id: str,
+                clicks: list[int], spread: float, rng: random.Random, timeout: float) -> tuple[dict[int, int], float]:
+    """Dispatch every click at a random moment within ``spread`` seconds; wait until the view has handled them all."""
+    schedule = sorted((rng.uniform(0, spread), user_id) for user_id in clicks)
+    dispatched: dict[int, int] = {}
+    started = time.perf_counter()
+    for at, user_id in schedule:
+        delay = at - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = harness.component_payload(message, custom_id, user_id)
+        dispatched[int(payload["id"])] = user_id
+        harness.dispatch("INTERACTION_CREATE", payload)
+
+    deadline = time.monotonic() + timeout
+    while len(probe.samples[VIEW_HANDLER]) < len(clicks) or probe.inflight:
+        if time.monotonic() > deadline:
+            break
+        await asyncio.sleep(0.001)
+    return dispatched, time.perf_counter() - started
+
+
+async def stress(scenario: str, voters: int, max_clicks: int, spread: float,
+                 latency: float, jitter: float, seed: int, timeout: float = 60.0) -> Outcome:
+    rng = random.Random(seed)
+    harness = Harness(FakeDiscordAPI(latency=latency, jitter=jitter))
+    await harness.start()
+    probe = LatencyProbe(harness.bot)
+    error_logs = _ErrorLogCounter()
+    root = logging.getLogger()
+    starts: list[tuple] = []
+    try:
+        voter_ids = [FIRST_VOTER_ID + i for i in range(voters)]
+        for user_id in voter_ids:
+            harness.add_member(user_id, roles=_session_roles())
+        message, view, custom_id = await _open_vote(harness)
+
+        history = harness.bot.get_cog('Session').history  # type: ignore[union-attr]
+        record_start = history.started
+
+        def started(*args: Any, **kwargs: Any) -> Any:
+            starts.append(args)
+            return record_start(*args, **kwargs)
+
+        history.started = started
+
+        if scenario == "toggle":
+            view.required_votes = voters + 1
+            clicks = [user_id for user_id in voter_ids for _ in range(rng.randint(1, max_clicks))]
+        else:
+            clicks = list(voter_ids)
+        required = view.required_votes
+
+        before = len(harness.api.calls)
+        root.addHandler(error_logs)
+        probe.install()
+        try:
+            dispatched, seconds = await _fire(harness, probe, message, custom_id, clicks, spread, rng, timeout)
+            await harness.settle(limit=timeout)
+        finally:
+            probe.uninstall()
+            root.removeHandler(error_logs)
+        calls = harness.api.calls[before:]
+        votes = set(view.votes)
+        closed = view.closed
+    finally:
+        await harness.close()
+
+    message_url = f"/messages/{message.id}"
+    edits = [c for c in calls if c.method == 'PATCH' and c.path == MESSAGE_PATH and c.url.endswith(message_url)]
+    deletes = [c for c in calls if c.method == 'DELETE' and c.path == MESSAGE_PATH and c.url.endswith(message_url)]
+    announcements = [
+        c for c in calls
+        if c.method == 'POST' and c.path == '/channels/{channel_id}/messages'
+        and any(e.get("title") == ONLINE_TITLE for e in (c.payload or {}).get("embeds") or [])
+    ]
+    replies: dict[int, list[str]] = {}
+    for call in calls:
+        if call.path == CALLBACK_PATH:
+            interaction_id = int(call.url.split('/interactions/', 1)[1].split('/', 1)[0])
+            replies.setdefault(interaction_id, []).append(_content(call))
+
+    outcome = Outcome(scenario, len(clicks), seconds, len(edits), list(probe.samples[VIEW_HANDLER]))
+    handled = len(outcome.latencies)
+    outcome.check(handled == len(clicks), f"{len(clicks) - handled} of {len(clicks)} clicks were not handled within {timeout:.0f}s")
+    unanswered = sum(1 for i in dispatched if not replies.get(i))
+    repeated = sum(1 for i in dispatched if len(replies.get(i, ())) > 1)
+    outcome.check(not unanswered, f"{unanswered} clicks got no reply")
+    outcome.check(not repeated, f"{repeated} clicks were replied to more than once")
+    if error_logs.counts:
+        outcome.failures.append("errors logged: " + ", ".join(f"{name} ×{count}" for name, count in error_logs.counts.items()))
+    outcome.check(len(edits) <= len(clicks), f"{len(edits)} edits for {len(clicks)} clicks")
+
+    if scenario == "toggle":
+        expected = {user_id for user_id, count in Counter(clicks).items() if count % 2}
+        outcome.check(votes == expected, f"tally is {len(votes)} but {len(expected)} members should have a vote "
+                                         f"({len(votes - expected)} extra, {len(expected - votes)} missing)")
+        outcome.check(bool(edits), "the vote message was never edited")
+        if edits:
+            shown = _embed_field((edits[-1].payload or {}).get("embeds") or [], "Current Votes")
+            outcome.check(shown.startswith(f"**{len(expected)}/{required}**"),
+                          f"last edit shows {shown!r}, expected {len(expected)}/{required}")
+        outcome.check(not starts and not announcements, f"session started {len(starts)} times without quorum")
+    else:
+        counted = sum(1 for i in dispatched if any("Vote counted" in r for r in replies.get(i, ())))
+        refused = sum(1 for i in dispatched if any("has closed" in r for r in replies.get(i, ())))
+        outcome.check(closed, "the vote never closed")
+        outcome.check(len(starts) == 1, f"session start recorded {len(starts)} times")
+        outcome.check(len(announcements) == 1, f"{len(announcements)} online announcements posted")
+        outcome.check(len(deletes) == 1, f"vote message deleted {len(deletes)} times")
+        if deletes:
+            late = sum(1 for c in edits if c.at > deletes[0].at)
+            outcome.check(not late, f"{late} edits sent after the vote message was deleted")
+        outcome.check(counted == len(votes) >= required, f"{counted} votes acknowledged but the tally is {len(votes)}")
+        outcome.check(counted + refused == len(clicks), f"{len(clicks) - counted - refused} clicks got neither a vote nor a closed reply")
+        if announcements:
+            shown = _embed_field((announcements[0].payload or {}).get("embeds") or [], "Vote Results")
+            outcome.check(f"**{len(votes)}/{required}**" in shown, f"announcement shows {shown!r}, tally is {len(votes)}")
+    return outcome
+
+
+def report(outcomes: list[Outcome], latency: float, jitter: float) -> str:
+    lines = [f"REST round trip {latency * 1000:.0f}ms + up to {jitter * 1000:.0f}ms jitter",
+             f"{'scenario':<10} {'clicks':>7} {'seconds':>8} {'clicks/s':>9} {'edits':>6} {'p50':>8} {'p95':>8} {'p99':>8}  result"]
+    for o in outcomes:
+        p50, p95, p99, _ = _percentiles(o.latencies) if o.latencies else (0.0, 0.0, 0.0, 0.0)
+        lines.append(
+            f"{o.scenario:<10} {o.clicks:>7} {o.seconds:>7.2f}s {o.throughput:>9,.0f} {o.edits:>6} "
+            f"{p50 * 1000:>6.1f}ms {p95 * 1000:>6.1f}ms {p99 * 1000:>6.1f}ms  {'FAIL' if o.failures else 'ok'}"
+        )
+        lines.extend(f"    ✗ {failure}" for failure in o.failures)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Stress the session vote button with concurrent clicks and check the result.")
+    parser.add_argument("--scenario", choices=("toggle", "quorum", "all"), default="all")
+    parser.add_argument("--voters", type=int, default=300)
+    parser.add_argument("--max-clicks", type=int, default=4, help="Most clicks per member in the toggle scenario")
+    parser.add_argument("--spread", type=float, default=0.25, help="Seconds over which the clicks arrive")
+    parser.add_argument("--rest-latency", type=float, default=20.0, help="Simulated REST round trip in ms")
+    parser.add_argument("--jitter", type=float, default=30.0, help="Random extra REST latency in ms")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Errors are counted by the checker; keep the console to the report
+    logging.getLogger().setLevel(logging.ERROR)
+    logging.getLogger().handlers[:] = [logging.NullHandler()]
+    scenarios = ("toggle", "quorum") if args.scenario == "all" else (args.scenario,)
+    latency, jitter = args.rest_latency / 1000, args.jitter / 1000
+    outcomes = [
+        asyncio.run(stress(scenario, args.voters, args.max_clicks, args.spread, latency, jitter, args.seed))
+        for scenario in scenarios
+    ]
+    print(report(outcomes, latency, jitter))
+    sys.exit(1 if any(o.failures for o in outcomes) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,62 @@
-import discord 
+import math
+import time
+
+import discord
 from discord import app_commands
-from discord.ext import commands 
+from discord.ext import commands, tasks
+from discord.http import Route
+from Utils.windows import RollingWindow
 
-class Ping(commands.Cog): 
-    def __init__(self, bot): 
+class Ping(commands.Cog):
+    def __init__(self, bot):
         self.bot = bot
+        # Sampled on a fixed schedule, so the cost doesn't depend on how often /ping is used
+        self.heartbeat = RollingWindow(120)  # ~1 hour at one sample per 30s
+        self.rest = RollingWindow(120)
+
+    async def cog_load(self):
+        self.sample_latency.start()
+
+    async def cog_unload(self):
+        self.sample_latency.cancel()
+
+    @tasks.loop(seconds=30)
+    async def sample_latency(self):
+        if math.isfinite(self.bot.latency):
+            self.heartbeat.add(self.bot.latency * 1000)
+        try:
+            await self.rest_probe()
+        except discord.HTTPException:
+            pass
+
+    @sample_latency.before_loop
+    async def _before_sample(self):
+        await self.bot.wait_until_ready()
+
+    async def rest_probe(self) -> float:
+        """Time a cheap REST call (GET /gateway) and record it in the REST window."""
+        started = time.perf_counter()
+        await self.bot.http.request(Route('GET', '/gateway'))
+        elapsed = (time.perf_counter() - started) * 1000
+        self.rest.add(elapsed)
+        return elapsed
+
+    @staticmethod
+    def _window_text(window: RollingWindow, current: float, decimals: int = 0) -> str:
+        percentiles = window.percentiles()
+        if not percentiles:
+            return f"**{current:.{decimals}f}ms**"
+        p50, p95, p99 = percentiles
+        return (
+            f"**{current:.{decimals}f}ms** {window.trend()}\n"
+            f"p50 {p50:.{decimals}f} • p95 {p95:.{decimals}f} • p99 {p99:.{decimals}f}"
+        )
 
     @app_commands.command(name="ping", description="Check the bot's latency")
-    async def ping(self, interaction: discord.Interaction): 
+    async def ping(self, interaction: discord.Interaction):
         """Check bot latency with a clean, informative embed."""
         latency_ms = round(self.bot.latency * 1000)
-        
+
         # Determine latency status and color
         if latency_ms < 100:
             status = "🟢 Excellent"
@@ -24,28 +70,44 @@ class Ping(commands.Cog):
         else:
             status = "🔴 Poor"
             color = discord.Color.red()
-        
+
+        # Report the latest background probe rather than probing per request
+        rest_ms = self.rest.last
+
         embed = discord.Embed(
             title="🏓 Pong!",
             description=f"Bot latency information",
             color=color
-        ) 
+        )
         embed.add_field(
-            name="📡 Latency", 
-            value=f"**{latency_ms}ms**\n{status}", 
+            name="📡 Heartbeat",
+            value=f"{self._window_text(self.heartbeat, latency_ms)}\n{status}",
             inline=True
         )
+        embed.add_field(
+            name="🌐 REST",
+            value=self._window_text(self.rest, rest_ms) if rest_ms is not None else "⏳ No samples yet",
+            inline=True
+        )
+        metrics = self.bot.get_cog('Metrics')
+        lag_window = getattr(metrics, 'loop_lag_window', None)
+        if lag_window is not None and lag_window.last is not None:
+            embed.add_field(
+                name="⏱️ Event Loop Lag",
+                value=self._window_text(lag_window, lag_window.last, decimals=1),
+                inline=True
+            )
         embed.add_field(
             name="🤖 Status",
             value="✅ Online & Ready",
             inline=True
         )
         embed.set_footer(
-            text=f"Requested by {interaction.user.display_name}",
+            text=f"Requested by {interaction.user.display_name} • Percentiles over the last hour (loop lag: 2 min)",
             icon_url=interaction.user.display_avatar.url
         )
-        
+
         await interaction.response.send_message(embed=embed)
 
-async def setup(bot): 
-    await bot.add_cog(Ping(bot)) 
\ No newline at end of file
+async def setup(bot):
+    await bot.add_cog(Ping(bot))
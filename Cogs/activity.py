@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands, tasks
+import config
+from config import CHANNEL_CONFIG, has_permission, get_required_role_mentions
+from Utils.activity import ActivityTracker
+from Utils.outbound import Priority, post
+from Utils.storage import data_path
+
+logger = logging.getLogger('NZDF.activity')
+
+class Activity(commands.Cog):
+    """Tracks each member's last message and voice activity for inactivity sweeps."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.path = data_path("activity.bin")
+        try:
+            self.tracker = ActivityTracker.load(self.path)
+        except Exception:
+            logger.exception('Could not read %s; starting a fresh activity tracker', self.path)
+            self.tracker = ActivityTracker()
+        self.threshold_days: int = getattr(config, 'INACTIVITY_THRESHOLD_DAYS', 14)
+
+    async def cog_load(self):
+        self.flush_activity.start()
+        self.inactivity_sweep.start()
+
+    async def cog_unload(self):
+        self.flush_activity.cancel()
+        self.inactivity_sweep.cancel()
+        if self.tracker.dirty:
+            self.tracker.save(self.path)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild and not message.author.bot:
+            self.tracker.record_message(message.author.id)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        # Joining, leaving and moving all count; time spent in voice is covered by the sweep
+        if not member.bot and before.channel != after.channel:
+            self.tracker.record_voice(member.id)
+
+    @tasks.loop(minutes=5)
+    async def flush_activity(self):
+        if self.tracker.dirty:
+            try:
+                await asyncio.to_thread(self.tracker.save, self.path)
+            except Exception:
+                logger.exception('Failed to flush activity tracker')
+
+    def find_inactive(self, guild: discord.Guild, days: int) -> list[tuple[discord.Member, int]]:
+        """Members with no message or voice activity in ``days`` days, oldest first."""
+        cutoff = time.time() - days * 86400
+        if self.tracker.started_at > cutoff:
+            # Not enough history yet to call anyone inactive
+            return []
+        in_voice = {m.id for channel in guild.voice_channels for m in channel.members}
+        # Members who joined inside the window haven't had the chance to be inactive yet
+        candidates = (
+            m.id for m in guild.members
+            if not m.bot and m.id not in in_voice and not (m.joined_at and m.joined_at.timestamp() > cutoff)
+        )
+        inactive = sorted(self.tracker.inactive(candidates, cutoff), key=lambda item: item[1])
+        return [(member, last) for member, last in ((guild.get_member(mid), last) for mid, last in inactive) if member]
+
+    def _build_report(self, guild: discord.Guild, days: int, limit: int = 30) -> discord.Embed:
+        inactive = self.find_inactive(guild, days)
+        embed = discord.Embed(
+            title="💤 Inactivity Report",
+            description=f"Members with no messages or voice activity in the last **{days}** day(s).",
+            color=discord.Color.dark_gold()
+        )
+        if self.tracker.started_at > time.time() - days * 86400:
+            embed.add_field(
+                name="Not enough history",
+                value=f"Activity tracking started <t:{self.tracker.started_at}:R>.",
+                inline=False
+            )
+        elif inactive:
+            lines = [
+                f"{member.mention} — " + (f"last active <t:{last}:R>" if last else "no activity recorded")
+                for member, last in inactive[:limit]
+            ]
+            if len(inactive) > limit:
+                lines.append(f"...and {len(inactive) - limit} more")
+            embed.add_field(name=f"Inactive ({len(inactive)})", value="\n".join(lines)[:1024], inline=False)
+        else:
+            embed.add_field(name="All clear", value="Everyone has been active recently.", inline=False)
+        embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
+        embed.set_footer(text=f"Tracking {len(self.tracker)} members")
+        return embed
+
+    @tasks.loop(hours=24)
+    async def inactivity_sweep(self):
+        channel_id = CHANNEL_CONFIG.get("INACTIVITY_REPORT_CHANNEL") or CHANNEL_CONFIG.get("COMMAND_LOG_CHANNEL")
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if not isinstance(channel, discord.TextChannel):
+            return
+        embed = self._build_report(channel.guild, self.threshold_days)
+        post(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+
+    @inactivity_sweep.before_loop
+    async def _before_sweep(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="inactive", description="List members inactive for a number of days")
+    @app_commands.describe(days="Days without messages or voice activity (default from config)")
+    async def inactive(self, interaction: discord.Interaction, days: Optional[app_commands.Range[int, 1, 365]] = None):
+        if not isinstance(interaction.user, discord.Member) or not interaction.guild:
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "inactive_report"):
+            required_roles = get_required_role_mentions("inactive_report", interaction.guild)
+            msg = "You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        embed = self._build_report(interaction.guild, days or self.threshold_days)
+        await interaction.response.send_message(embed=embed, ephemeral=True, allowed_mentions=discord.AllowedMentions.none())
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Activity(bot))
+    try:
+        app_cmd = bot.tree.get_command('inactive')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
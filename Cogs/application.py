@@ -2,9 +2,13 @@ from __future__ import annotations
 import discord
 from discord import app_commands, Permissions
 from discord.ext import commands
+import logging
 from typing import Literal
 from config import ROLE_CONFIG, MEDIA, has_permission, media_file
 import config
+from Utils.outbound import Priority, send
+
+logger = logging.getLogger('NZDF.application')
 
 class Application(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -15,7 +19,7 @@ class Application(commands.Cog):
             await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
         else:
             await interaction.response.send_message(f"❌ An error occurred: {str(error)}", ephemeral=True)
-            print(f"Error in application command: {str(error)}")
+            logger.error('Error in application command: %s', error, exc_info=getattr(error, 'original', error))
 
     def _build_embed(self, result: Literal["Pass", "Fail"], user: discord.Member, reason: str, notes: str, author: discord.Member) -> discord.Embed:
         if result.lower() == "pass":
@@ -98,7 +102,7 @@ class Application(commands.Cog):
         
         # Since we're now using URL links, no files need to be attached
         # Send embed only (no usage log above)
-        await channel.send(embed=embed)
+        await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(embed=embed))
 
         # Optionally inform the invoker ephemerally
         await interaction.followup.send("Application posted.", ephemeral=True)
@@ -9,6 +9,12 @@ import asyncio
 import time
 import logging
 from config import ROLE_CONFIG, MEDIA, get_highest_role, has_permission, media_file
+from Utils.outbound import Priority, send
+from Utils.storage import data_path
+from Utils.callsignstore import CallsignRegistry, normalize
+from Utils.metrics import cache_lookup
+from Utils.timers import TimerHeap
+from Utils.side_effects import enqueue
 
 logger = logging.getLogger('NZDF.callsigns')
 MANAGER_ROLE_ID = 1427869184179568712
@@ -26,79 +32,39 @@ class CallsignModal(Modal, title="Callsign Request"):
         self.cog = cog
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        if not isinstance(interaction.user, discord.Member):
-            await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
-            return None
-
-        highest_role = get_highest_role(interaction.user)
-        if not highest_role:
-            await interaction.response.send_message("Could not determine your rank.", ephemeral=True)
-            return None
-
-        embed = discord.Embed(
-            title="🏷️ Callsign Authorization Request",
-            description=f"**Personnel Callsign Assignment Request**\n\nA member has requested a new tactical callsign for operational use.",
-            color=discord.Color.orange()
-        )
-        embed.add_field(
-            name="🎯 Requested Callsign", 
-            value=f"**{self.callsign.value}**",
-            inline=False
-        )
-        embed.add_field(
-            name="👤 Requesting Member", 
-            value=f"{interaction.user.mention}\n*{interaction.user.display_name}*",
-            inline=True
-        )
-        embed.add_field(
-            name="🎖️ Current Rank", 
-            value=f"**{highest_role.name}**",
-            inline=True
-        )
-        embed.add_field(
-            name="📅 Request Time", 
-            value=f"<t:{int(discord.utils.utcnow().timestamp())}:R>",
-            inline=True
-        )
-        embed.add_field(
-            name="⚡ Action Required", 
-            value="**Command approval needed**\n• Review callsign appropriateness\n• Verify member eligibility\n• Approve or deny request",
-            inline=False
-        )
-        embed.set_thumbnail(url=MEDIA.get("LOGO", ""))
-        embed.set_footer(
-            text="Callsign requests require command authorization • Use buttons below to approve/deny",
-            icon_url=interaction.user.display_avatar.url
-        )
-        files = []
-
-        # Create approval buttons
-        view = CallsignApprovalView(self.cog, interaction.user, self.callsign.value)
-        
-        # Send the request with mention above (no usage log)
-        if interaction.channel and isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
-            role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_CALLSIGN"]) if interaction.guild else None
-            mention = role.mention if role else ""
-            await interaction.response.send_message("Request submitted!", ephemeral=True)
-            await interaction.channel.send(content=mention, embed=embed, view=view)
-        else:
-            await interaction.response.send_message("This command can only be used in text channels.", ephemeral=True)
+        await self.cog.submit_request(interaction, self.callsign.value)
 
 class CallsignApprovalView(View):
-    def __init__(self, cog: Callsigns, requestor: discord.Member, callsign: str):
+    def __init__(
+        self,
+        cog: Callsigns,
+        requestor_id: int,
+        callsign: str,
+        *,
+        approved: Optional[bool] = None,
+        switch_count: int = 0,
+        creation_time: Optional[float] = None,
+    ):
         super().__init__(timeout=None)
         self.cog = cog
-        self.requestor = requestor
+        self.requestor_id = requestor_id
         self.callsign = callsign
-        self.approved = None
-        self.switch_count = 0
+        self.approved = approved
+        self.switch_count = switch_count
         self.max_switches = 4
-        self.creation_time = time.time()
+        self.creation_time = creation_time or time.time()
         self.timeout_hours = 5
+        self.expired = False
+        self.message_id: Optional[int] = None
+        self.channel_id: Optional[int] = None
+
+    @property
+    def expires_at(self) -> float:
+        return self.creation_time + self.timeout_hours * 3600
 
     def _check_timeout(self) -> bool:
-        """Check if 5 hours have passed since creation"""
-        return (time.time() - self.creation_time) > (self.timeout_hours * 3600)
+        """Whether the expiry scheduler has already closed this request"""
+        return self.expired
 
     def _update_buttons(self):
         """Update button states based on current status and switch count"""
@@ -121,14 +87,19 @@ class CallsignApprovalView(View):
     async def _send_dm(self, status: str):
         """Send DM to requestor with embed"""
         try:
+            bot = self.cog.bot
+            requestor = bot.get_user(self.requestor_id)
+            cache_lookup("user", requestor is not None)
+            if requestor is None:
+                requestor = await bot.fetch_user(self.requestor_id)
             embed = discord.Embed(
                 title="🏷️ Callsign Request Update",
                 description=f"Your callsign **{self.callsign}** was **{status}**.\n\nPlease change your nickname (if it has not been done for you).",
                 color=discord.Color.green() if status == "accepted" else discord.Color.red()
             )
             embed.set_thumbnail(url=MEDIA["LOGO"])
-            await self.requestor.send(embed=embed)
-        except discord.HTTPException:
+            await send(bot, Priority.ANNOUNCEMENT, ("dm", self.requestor_id), lambda: requestor.send(embed=embed))
+        except discord.Forbidden:
             pass  # User might have DMs disabled
 
     @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, custom_id="approve_callsign")
@@ -144,12 +115,20 @@ class CallsignApprovalView(View):
             return await interaction.response.send_message(f"You don't have permission to approve callsigns. Required role: {mention_text}", ephemeral=True)
 
         if self._check_timeout():
-            return await interaction.response.send_message("This request has timed out after 5 hours.", ephemeral=True)
+            return await interaction.response.send_message(f"This request has timed out after {self.timeout_hours} hours.", ephemeral=True)
 
         if self.switch_count >= self.max_switches:
             return await interaction.response.send_message("Maximum number of status changes reached.", ephemeral=True)
 
+        holder = self.cog.registry.get(self.callsign)
+        if holder and holder.user_id != self.requestor_id:
+            return await interaction.response.send_message(f"**{holder.display}** is already assigned to <@{holder.user_id}>.", ephemeral=True)
+
         # Update status
+        try:
+            self.cog.registry.register(self.callsign, self.requestor_id, interaction.user.id)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
         old_status = self.approved
         self.approved = True
         if old_status != True:
@@ -181,12 +160,12 @@ class CallsignApprovalView(View):
         # Update buttons
         self._update_buttons()
 
-        await interaction.message.edit(embed=embed, view=self)
-        
-        # Send DM
-        await self._send_dm("accepted")
+        # Acknowledge by editing the request in place; the DM and confirmation follow in the background
+        await interaction.response.edit_message(embed=embed, view=self)
+        self.cog.save_request(self)
 
-        await interaction.response.send_message("Callsign request approved!", ephemeral=True)
+        enqueue(self.cog.bot, "callsign-dm", lambda: self._send_dm("accepted"))
+        enqueue(self.cog.bot, "callsign-confirm", lambda: interaction.followup.send("Callsign request approved!", ephemeral=True))
 
     @discord.ui.button(label="Deny", style=discord.ButtonStyle.red, custom_id="deny_callsign")
     async def deny(self, interaction: discord.Interaction, button: Button):
@@ -201,7 +180,7 @@ class CallsignApprovalView(View):
             return await interaction.response.send_message(f"You don't have permission to deny callsigns. Required role: {mention_text}", ephemeral=True)
 
         if self._check_timeout():
-            return await interaction.response.send_message("This request has timed out after 5 hours.", ephemeral=True)
+            return await interaction.response.send_message(f"This request has timed out after {self.timeout_hours} hours.", ephemeral=True)
 
         if self.switch_count >= self.max_switches:
             return await interaction.response.send_message("Maximum number of status changes reached.", ephemeral=True)
@@ -209,6 +188,7 @@ class CallsignApprovalView(View):
         # Update status
         old_status = self.approved
         self.approved = False
+        self.cog.registry.release(self.callsign, self.requestor_id)
         if old_status != False:
             self.switch_count += 1
 
@@ -238,27 +218,193 @@ class CallsignApprovalView(View):
         # Update buttons
         self._update_buttons()
 
-        await interaction.message.edit(embed=embed, view=self)
-        
-        # Send DM
-        await self._send_dm("denied")
+        # Acknowledge by editing the request in place; the DM and confirmation follow in the background
+        await interaction.response.edit_message(embed=embed, view=self)
+        self.cog.save_request(self)
 
-        await interaction.response.send_message("Callsign request denied!", ephemeral=True)
+        enqueue(self.cog.bot, "callsign-dm", lambda: self._send_dm("denied"))
+        enqueue(self.cog.bot, "callsign-confirm", lambda: interaction.followup.send("Callsign request denied!", ephemeral=True))
 
 class Callsigns(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.registry = CallsignRegistry(data_path("callsigns.db"))
+        self.expiry = TimerHeap("callsign-expiry")
+        self._views: dict[int, CallsignApprovalView] = {}
+
+    async def cog_load(self):
+        self.expiry.start()
+        # Rehydrate pending requests so their buttons keep working after a restart
+        for row in self.registry.load_pending():
+            approved = None if row["approved"] is None else bool(row["approved"])
+            view = CallsignApprovalView(
+                self, row["requestor_id"], row["callsign"],
+                approved=approved, switch_count=row["switch_count"], creation_time=row["created_at"],
+            )
+            view._update_buttons()
+            self.track_request(view, row["message_id"], row["channel_id"], persist=False)
+            self.bot.add_view(view, message_id=row["message_id"])
+        logger.info('Restored %d pending callsign request(s)', len(self._views))
+
+    async def cog_unload(self):
+        self.expiry.stop()
+        for view in self._views.values():
+            view.stop()
+        self.registry.close()
+
+    def track_request(self, view: CallsignApprovalView, message_id: int, channel_id: int, persist: bool = True) -> None:
+        """Remember a posted request and arm its expiry timer."""
+        view.message_id = message_id
+        view.channel_id = channel_id
+        self._views[message_id] = view
+        if persist:
+            self.save_request(view)
+        self.expiry.schedule(message_id, view.expires_at, lambda: self._expire_request(message_id))
+
+    def save_request(self, view: CallsignApprovalView) -> None:
+        """Persist the view's state, or drop it once no further changes are allowed."""
+        if view.message_id is None or view.channel_id is None:
+            return
+        if view.switch_count >= view.max_switches:
+            self._finish_request(view.message_id)
+            return
+        self.registry.save_pending(
+            view.message_id, view.channel_id, view.requestor_id, view.callsign,
+            view.approved, view.switch_count, view.creation_time,
+        )
+
+    def _finish_request(self, message_id: int) -> Optional[CallsignApprovalView]:
+        view = self._views.pop(message_id, None)
+        self.expiry.cancel(message_id)
+        self.registry.delete_pending(message_id)
+        if view:
+            view.stop()
+        return view
+
+    async def _expire_request(self, message_id: int) -> None:
+        """Disable a request's buttons once its approval window has closed."""
+        view = self._finish_request(message_id)
+        if not view or view.channel_id is None:
+            return
+        view.expired = True
+        view._update_buttons()
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(view.channel_id)
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return
+        try:
+            message = await channel.fetch_message(message_id)
+        except discord.HTTPException:
+            return
+        if view.approved is None and message.embeds:
+            embed = message.embeds[0].copy()
+            embed.color = discord.Color.dark_grey()
+            embed.add_field(name="Status", value=f"⌛ Expired after {view.timeout_hours} hours without a decision", inline=False)
+            edit = lambda: message.edit(embed=embed, view=view)
+        else:
+            edit = lambda: message.edit(view=view)
+        await send(self.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), edit)
+
+    async def submit_request(self, interaction: discord.Interaction, callsign: str) -> None:
+        """Post a callsign request for approval, flagging collisions with assigned callsigns."""
+        if not isinstance(interaction.user, discord.Member):
+            await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+            return None
+
+        highest_role = get_highest_role(interaction.user)
+        if not highest_role:
+            await interaction.response.send_message("Could not determine your rank.", ephemeral=True)
+            return None
+
+        if not normalize(callsign):
+            await interaction.response.send_message("❌ A callsign needs at least one letter or number.", ephemeral=True)
+            return None
+
+        embed = discord.Embed(
+            title="🏷️ Callsign Authorization Request",
+            description=f"**Personnel Callsign Assignment Request**\n\nA member has requested a new tactical callsign for operational use.",
+            color=discord.Color.orange()
+        )
+        embed.add_field(
+            name="🎯 Requested Callsign", 
+            value=f"**{callsign}**",
+            inline=False
+        )
+        embed.add_field(
+            name="👤 Requesting Member", 
+            value=f"{interaction.user.mention}\n*{interaction.user.display_name}*",
+            inline=True
+        )
+        embed.add_field(
+            name="🎖️ Current Rank", 
+            value=f"**{highest_role.name}**",
+            inline=True
+        )
+        embed.add_field(
+            name="📅 Request Time", 
+            value=f"<t:{int(discord.utils.utcnow().timestamp())}:R>",
+            inline=True
+        )
+        exact, near = self.registry.conflicts(callsign, interaction.user.id)
+        if exact or near:
+            lines = []
+            if exact:
+                lines.append(f"❗ **Exact match:** **{exact.display}** is assigned to <@{exact.user_id}>")
+            for entry, score in near:
+                lines.append(f"⚠️ Similar to **{entry.display}** (<@{entry.user_id}>, {score:.0%})")
+            embed.add_field(
+                name="🔁 Callsign Conflicts",
+                value="\n".join(lines),
+                inline=False
+            )
+        embed.add_field(
+            name="⚡ Action Required", 
+            value="**Command approval needed**\n• Review callsign appropriateness\n• Verify member eligibility\n• Approve or deny request",
+            inline=False
+        )
+        embed.set_thumbnail(url=MEDIA.get("LOGO", ""))
+        embed.set_footer(
+            text="Callsign requests require command authorization • Use buttons below to approve/deny",
+            icon_url=interaction.user.display_avatar.url
+        )
+        files = []
+
+        # Create approval buttons
+        view = CallsignApprovalView(self, interaction.user.id, callsign)
+        
+        # Send the request with mention above (no usage log)
+        if interaction.channel and isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
+            role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_CALLSIGN"]) if interaction.guild else None
+            mention = role.mention if role else ""
+            await interaction.response.send_message("Request submitted!", ephemeral=True)
+            channel = interaction.channel
+            message = await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(content=mention, embed=embed, view=view))
+            if message:
+                self.track_request(view, message.id, channel.id)
+        else:
+            await interaction.response.send_message("This command can only be used in text channels.", ephemeral=True)
 
     @app_commands.command(name="callsign", description="Request a callsign")
-    async def callsign(self, interaction: discord.Interaction):
+    @app_commands.describe(requested="The callsign you want (leave empty to open the request form)")
+    async def callsign(self, interaction: discord.Interaction, requested: Optional[app_commands.Range[str, 2, 32]] = None):
         if not isinstance(interaction.user, discord.Member):
             return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
 
         # No role required to request a callsign; anyone who is a guild member may request.
 
+        if requested:
+            return await self.submit_request(interaction, requested)
+
         modal = CallsignModal(self)
         await interaction.response.send_modal(modal)
 
+    @callsign.autocomplete("requested")
+    async def callsign_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=suggestion, value=suggestion)
+            for suggestion in self.registry.suggest(current, interaction.user.id)
+        ]
+
 async def setup(bot: commands.Bot):
     cog = Callsigns(bot)
     await bot.add_cog(cog)
@@ -5,6 +5,7 @@ from discord import app_commands, Permissions
 from discord.ext import commands
 from config import ROLE_CONFIG, MEDIA, has_any_role_ids, has_permission, get_required_role_mentions, check_channel_restriction, media_file
 import config
+from Utils.outbound import Priority, send
 
 class Communication(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -79,11 +80,12 @@ class Communication(commands.Cog):
             await interaction.followup.send("This command can only be used in text channels.", ephemeral=True)
             return
 
+        channel = interaction.channel
         if embed:
             embed_msg = discord.Embed(description=message, color=discord.Color.blue())
-            await interaction.channel.send(embed=embed_msg)
+            await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(embed=embed_msg))
         else:
-            await interaction.channel.send(message)
+            await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(message))
 
         await interaction.followup.send("Message sent!", ephemeral=True)
 
@@ -118,7 +120,8 @@ class Communication(commands.Cog):
         )
         
         # Send to channel separately to avoid usage log
-        await interaction.channel.send(embed=embed)
+        channel = interaction.channel
+        await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(embed=embed))
         
         # Confirm to user ephemerally
         await interaction.followup.send("Signed message sent!", ephemeral=True)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands, tasks
+import config
+from Utils.gateway_recording import RECORDED_EVENTS, GatewayRecorder
+from Utils.storage import data_path
+
+logger = logging.getLogger('NZDF.gateway_recording')
+
+class GatewayRecording(commands.Cog):
+    """Captures raw gateway events to a file for offline replay (see Benchmarks/gateway_replay.py)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.events = tuple(getattr(config, 'GATEWAY_RECORD_EVENTS', RECORDED_EVENTS))
+        self.max_events: int = getattr(config, 'GATEWAY_RECORD_MAX_EVENTS', 250_000)
+        self.recorder: Optional[GatewayRecorder] = None
+        self.stop_at: Optional[float] = None
+
+    async def cog_load(self):
+        self.flush_recording.start()
+
+    async def cog_unload(self):
+        self.flush_recording.cancel()
+        await self.stop_recording()
+
+    async def start_recording(self, minutes: float) -> GatewayRecorder:
+        await self.stop_recording()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        recorder = GatewayRecorder(
+            self.bot._connection.parsers,
+            data_path(f"gateway-{stamp}.jsonl.gz"),
+            events=self.events,
+            max_events=self.max_events,
+        )
+        recorder.start({
+            "guild_ids": [guild.id for guild in self.bot.guilds],
+            "bot_user_id": self.bot.user.id if self.bot.user else None,
+            "events": list(self.events),
+        })
+        self.recorder = recorder
+        self.stop_at = time.monotonic() + minutes * 60
+        logger.info('Recording gateway events to %s for %.0f minutes', recorder.path, minutes)
+        return recorder
+
+    async def stop_recording(self) -> Optional[GatewayRecorder]:
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.stop()
+        await asyncio.to_thread(recorder.write, recorder.take())
+        logger.info('Stopped gateway recording after %s events', recorder.recorded)
+        return recorder
+
+    @tasks.loop(seconds=5)
+    async def flush_recording(self):
+        recorder = self.recorder
+        if recorder is None:
+            return
+        if self.stop_at is not None and time.monotonic() >= self.stop_at:
+            await self.stop_recording()
+            return
+        lines = recorder.take()
+        if lines:
+            try:
+                await asyncio.to_thread(recorder.write, lines)
+            except OSError:
+                logger.exception('Could not write gateway recording to %s', recorder.path)
+
+    @app_commands.command(name="gatewayrecord", description="[ADMIN] Record gateway events for offline load testing")
+    @app_commands.describe(action="What to do", minutes="Stop automatically after this many minutes")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Start", value="start"),
+        app_commands.Choice(name="Stop", value="stop"),
+        app_commands.Choice(name="Status", value="status"),
+    ])
+    async def gatewayrecord(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        minutes: Optional[app_commands.Range[int, 1, 720]] = 60
+    ):
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        if action.value == "start":
+            recorder = await self.start_recording(minutes or 60)
+            title, color = "🔴 Recording Gateway Events", discord.Color.red()
+        elif action.value == "stop":
+            recorder = await self.stop_recording()
+            if recorder is None:
+                await interaction.response.send_message("No gateway recording is running.", ephemeral=True)
+                return
+            title, color = "⏹️ Gateway Recording Stopped", discord.Color.dark_grey()
+        else:
+            recorder = self.recorder
+            if recorder is None:
+                await interaction.response.send_message("No gateway recording is running.", ephemeral=True)
+                return
+            title, color = "🔴 Recording Gateway Events", discord.Color.red()
+
+        embed = discord.Embed(title=title, color=color)
+        embed.add_field(name="File", value=f"`{os.path.basename(recorder.path)}`", inline=False)
+        embed.add_field(name="Events", value=f"{recorder.recorded:,} / {recorder.max_events:,}", inline=True)
+        if recorder.started_at:
+            embed.add_field(name="Started", value=f"<t:{int(recorder.started_at)}:R>", inline=True)
+        if self.recorder is recorder and self.stop_at is not None:
+            ends = time.time() + max(0.0, self.stop_at - time.monotonic())
+            embed.add_field(name="Stops", value=f"<t:{int(ends)}:R>", inline=True)
+        embed.set_footer(text="Recordings contain member data; keep them private. Tokens are redacted.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(GatewayRecording(bot))
+    try:
+        app_cmd = bot.tree.get_command('gatewayrecord')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
@@ -5,6 +5,7 @@ This cog provides comprehensive logging for all bot command usage and errors.
 
 Features:
 - Logs all successful slash command executions with user, channel, and timestamp info
+  (or, with COMMAND_LOG_DIGEST set, one hourly/daily summary of routine commands)
 - Logs all command errors with detailed traceback information
 - Pings bot admins when critical errors occur
 - Professional embed formatting with thumbnails and branding
@@ -20,19 +21,35 @@ Admin Commands:
 - /logstatus - Check current logging configuration
 - /setlogchannel - Get configuration help for current channel
 - /testlog - Send test logs to verify system works
+- /loglevel - Show or change a module's log level
 """
 
 import discord
 from discord import Permissions
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import datetime
+import time
 from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import traceback
 import config
 import logging
 from collections import deque
 import io
+from Utils.outbound import Priority, send
+from Utils.side_effects import enqueue
+from Utils.metrics import cache_lookup
+from Utils.digest import CommandDigest, DigestPeriod
+from Utils.logsetup import LEVELS, TEXT_FORMAT, attach, detach, known_loggers, level_overrides, set_level
+
+logger = logging.getLogger('NZDF.logging')
+
+# Commands that change ranks, membership, discipline or logging are never held back for the digest
+DEFAULT_IMMEDIATE_COMMANDS = [
+    "discharge", "bulkdischarge", "promote", "demote", "bulkrank",
+    "disciplinary", "caselog", "say", "setlogchannel",
+]
 
 class LoggingSystem(commands.Cog):
     """Comprehensive logging system for command usage and errors."""
@@ -57,8 +74,37 @@ class LoggingSystem(commands.Cog):
         handler = _BufferHandler(self)
         handler.setLevel(logging.DEBUG)
         # Use a simple formatter
-        handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s'))
-        logging.getLogger().addHandler(handler)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        # Runs on the logging thread once Utils.logsetup is configured
+        attach(handler)
+        self._buffer_handler = handler
+
+        # Digest mode: routine successful commands are summarised once per period instead of posted one by one
+        self.immediate_commands = {name.lstrip('/') for name in getattr(config, 'COMMAND_LOG_IMMEDIATE', DEFAULT_IMMEDIATE_COMMANDS)}
+        self.digest: Optional[CommandDigest] = None
+        period = getattr(config, 'COMMAND_LOG_DIGEST', None)
+        if period:
+            tz_name = getattr(config, 'COMMAND_LOG_DIGEST_TIMEZONE', 'Pacific/Auckland')
+            try:
+                tz = ZoneInfo(tz_name)
+            except ZoneInfoNotFoundError:
+                logger.warning('Unknown COMMAND_LOG_DIGEST_TIMEZONE %r; using UTC', tz_name)
+                tz = datetime.timezone.utc
+            try:
+                self.digest = CommandDigest(period, tz)
+            except ValueError:
+                logger.warning('Unknown COMMAND_LOG_DIGEST %r; logging every command', period)
+
+    async def cog_load(self):
+        if self.digest:
+            self.post_digest.start()
+
+    async def cog_unload(self):
+        detach(self._buffer_handler)
+        if self.digest:
+            self.post_digest.cancel()
+            if self.digest.pending:
+                await self._send_digest(self.digest.take())
         
     async def get_log_channel(self) -> Optional[discord.TextChannel]:
         """Get the configured logging channel."""
@@ -66,85 +112,125 @@ class LoggingSystem(commands.Cog):
             channel_id = config.CHANNEL_CONFIG["COMMAND_LOG_CHANNEL"]
             channel = self.bot.get_channel(channel_id)
             if not channel:
-                print(f"[LOGGING] Channel {channel_id} not found!")
+                logger.warning('Log channel %s not found', channel_id)
                 return None
             if isinstance(channel, discord.TextChannel):
                 return channel
             else:
-                print(f"[LOGGING] Channel {channel_id} is not a text channel!")
+                logger.warning('Log channel %s is not a text channel', channel_id)
                 return None
-        except Exception as e:
-            print(f"[LOGGING] Error getting log channel: {e}")
+        except Exception:
+            logger.exception('Error getting log channel')
             return None
 
     async def log_command_usage(self, interaction: discord.Interaction, command_name: str, success: bool = True, error: Optional[str] = None):
-        """Log command usage to the designated channel."""
+        """Log command usage to the designated channel.
+
+        Failures propagate so the side-effect queue can retry or dead-letter the post.
+        """
         channel = await self.get_log_channel()
         if not channel:
             return
             
-        try:
-            # Create embed for command log
-            color = discord.Color.green() if success else discord.Color.red()
-            status_emoji = "🎮" if success else "⚠️"
-            
-            embed = discord.Embed(
-                title=f"{status_emoji} Command {'Used' if success else 'Error'}",
-                color=color,
-                timestamp=datetime.datetime.utcnow()
+        # Create embed for command log
+        color = discord.Color.green() if success else discord.Color.red()
+        status_emoji = "🎮" if success else "⚠️"
+        
+        embed = discord.Embed(
+            title=f"{status_emoji} Command {'Used' if success else 'Error'}",
+            color=color,
+            timestamp=datetime.datetime.utcnow()
+        )
+        
+        # Add command info
+        embed.add_field(
+            name="Command",
+            value=f"`/{command_name}`",
+            inline=True
+        )
+        
+        # Add user info - just the ping, no nickname
+        user = interaction.user
+        embed.add_field(
+            name="User",
+            value=f"{user.mention}",
+            inline=True
+        )
+        
+        # Add channel info - just the channel, no guild
+        if interaction.guild:
+            channel_name = getattr(interaction.channel, 'mention', str(interaction.channel)) if interaction.channel else 'Unknown'
+            embed.add_field(
+                name="Channel",
+                value=f"{channel_name}",
+                inline=True
             )
-            
-            # Add command info
+        else:
             embed.add_field(
-                name="Command",
-                value=f"`/{command_name}`",
+                name="Channel",
+                value="Direct Message",
                 inline=True
             )
-            
-            # Add user info - just the ping, no nickname
-            user = interaction.user
+        
+        # Add error info if failed
+        if not success and error:
             embed.add_field(
-                name="User",
-                value=f"{user.mention}",
+                name="Error Details",
+                value=f"```python\n{error[:1000]}{'...' if len(error) > 1000 else ''}\n```",
+                inline=False
+            )
+        
+        # Add user avatar as thumbnail
+        embed.set_thumbnail(url=user.display_avatar.url)
+        
+        # Add footer
+        embed.set_footer(
+            text=f"Command ID: {interaction.id}",
+            icon_url=config.MEDIA["LOGO"]
+        )
+        
+        await send(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+
+    @tasks.loop(minutes=1)
+    async def post_digest(self):
+        if self.digest and self.digest.due():
+            await self._send_digest(self.digest.take())
+
+    async def _send_digest(self, period: DigestPeriod):
+        """Post one summary of the routine commands used in ``period``."""
+        if not period.total:
+            return
+        channel = await self.get_log_channel()
+        if not channel:
+            return
+        try:
+            embed = discord.Embed(
+                title="🧾 Command Digest",
+                description=(
+                    f"<t:{int(period.start)}:f> → <t:{int(min(period.end, time.time()))}:t>\n"
+                    f"**{period.total:,}** commands by **{len(period.users):,}** users in **{len(period.channels):,}** channels"
+                ),
+                color=discord.Color.dark_green(),
+                timestamp=discord.utils.utcnow()
+            )
+            top = period.commands.most_common(20)
+            lines = [f"`/{name}` × {count:,}" for name, count in top]
+            if len(period.commands) > len(top):
+                lines.append(f"...and {len(period.commands) - len(top)} more")
+            embed.add_field(name="Commands", value="\n".join(lines)[:1024], inline=True)
+            embed.add_field(
+                name="Most Active",
+                value="\n".join(f"<@{user_id}> × {count:,}" for user_id, count in period.users.most_common(10))[:1024],
                 inline=True
             )
-            
-            # Add channel info - just the channel, no guild
-            if interaction.guild:
-                channel_name = getattr(interaction.channel, 'mention', str(interaction.channel)) if interaction.channel else 'Unknown'
-                embed.add_field(
-                    name="Channel",
-                    value=f"{channel_name}",
-                    inline=True
-                )
-            else:
-                embed.add_field(
-                    name="Channel",
-                    value="Direct Message",
-                    inline=True
-                )
-            
-            # Add error info if failed
-            if not success and error:
-                embed.add_field(
-                    name="Error Details",
-                    value=f"```python\n{error[:1000]}{'...' if len(error) > 1000 else ''}\n```",
-                    inline=False
-                )
-            
-            # Add user avatar as thumbnail
-            embed.set_thumbnail(url=user.display_avatar.url)
-            
-            # Add footer
+            immediate = ", ".join(f"/{name}" for name in sorted(self.immediate_commands))
             embed.set_footer(
-                text=f"Command ID: {interaction.id}",
+                text=f"{self.digest.period.title() if self.digest else 'Command'} digest • Errors{' and ' + immediate if immediate else ''} are posted as they happen",
                 icon_url=config.MEDIA["LOGO"]
             )
-            
-            await channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
-            
-        except Exception as e:
-            print(f"[LOGGING] Failed to log command usage: {e}")
+            await send(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+        except Exception:
+            logger.exception('Failed to post command digest')
 
     async def log_error_with_ping(self, interaction: discord.Interaction, command_name: str, error: Exception):
         """Log error and ping bot admins."""
@@ -238,16 +324,14 @@ class LoggingSystem(commands.Cog):
 
             # Post the error embed to the logging channel WITHOUT pinging admins
             try:
-                # Create buffer for the log file
-                buf_channel = io.BytesIO(logs_bytes)
-                buf_channel.seek(0)
-                await channel.send(embed=embed, file=discord.File(buf_channel, filename='terminal.log'), allowed_mentions=discord.AllowedMentions.none())
+                # Fresh buffer per attempt: a 429 retry re-runs the factory after the first upload consumed it
+                await send(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, file=discord.File(io.BytesIO(logs_bytes), filename='terminal.log'), allowed_mentions=discord.AllowedMentions.none()))
             except Exception:
                 # Fallback: send embed without file
                 try:
-                    await channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+                    await send(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
                 except Exception:
-                    logging.getLogger('NZDF.logging').exception('Failed to post error embed to log channel')
+                    logger.exception('Failed to post error embed to log channel')
 
             # Note: Direct messaging to admins has been disabled to prevent unwanted notifications
             
@@ -262,9 +346,12 @@ class LoggingSystem(commands.Cog):
             # skip commands specified in config. Also skip the panel UI itself.
             if command.qualified_name in ignored or command.qualified_name.startswith('x'):
                 return
-            await self.log_command_usage(interaction, command.qualified_name, success=True)
+            if self.digest is not None and command.qualified_name not in self.immediate_commands:
+                self.digest.add(command.qualified_name, interaction.user.id, interaction.channel_id)
+                return
+            enqueue(self.bot, "command-log", lambda: self.log_command_usage(interaction, command.qualified_name, success=True))
         except Exception:
-            print('[LOGGING] Failed in on_app_command_completion')
+            logger.exception('Failed in on_app_command_completion')
 
     @commands.Cog.listener() 
     async def on_command_completion(self, ctx: commands.Context):
@@ -392,11 +479,23 @@ class LoggingSystem(commands.Cog):
                     inline=False
                 )
             
+            if self.digest:
+                embed.add_field(
+                    name="🧾 Digest",
+                    value=f"{self.digest.period.title()}: **{self.digest.pending}** commands waiting, next summary <t:{int(self.digest.current.end)}:R>",
+                    inline=False
+                )
+            else:
+                embed.add_field(name="🧾 Digest", value="Off: every command is posted", inline=False)
+
             # Add admin list (non-pinging - show display name or ID)
             admin_entries = []
             for admin_id in config.BOT_ADMINS:
                 try:
-                    user = self.bot.get_user(admin_id) or await self.bot.fetch_user(admin_id)
+                    user = self.bot.get_user(admin_id)
+                    cache_lookup("user", user is not None)
+                    if user is None:
+                        user = await self.bot.fetch_user(admin_id)
                     name = getattr(user, 'display_name', None) or getattr(user, 'name', None) or str(admin_id)
                     admin_entries.append(f"{name} (ID: `{admin_id}`)")
                 except Exception:
@@ -415,11 +514,41 @@ class LoggingSystem(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to check status: {str(e)}", ephemeral=True)
 
+    @app_commands.command(name="loglevel", description="[ADMIN] Show or change a module's log level")
+    @app_commands.describe(module="Logger name, e.g. NZDF.session (leave empty to list overrides)", level="New level; Reset follows the parent logger again")
+    @app_commands.choices(level=[app_commands.Choice(name=name.title(), value=name) for name in LEVELS[:4]] + [app_commands.Choice(name="Reset", value="reset")])
+    async def log_level(self, interaction: discord.Interaction, module: Optional[str] = None, level: Optional[app_commands.Choice[str]] = None):
+        """Change log levels at runtime; changes last until the bot restarts."""
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        if level and not module:
+            await interaction.response.send_message("❌ Pick a module to change, e.g. `NZDF.session` or `discord`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="📝 Log Levels", color=discord.Color.blue())
+        if module and level:
+            set_level(module, None if level.value == "reset" else level.value)
+            logger.info('Log level of %s set to %s by %s', module, level.value, interaction.user.id)
+        if module:
+            effective = logging.getLevelName(logging.getLogger(module).getEffectiveLevel())
+            embed.add_field(name=module, value=f"**{effective}**" + (" (changed)" if level else ""), inline=False)
+        overrides = "\n".join(f"`{name}` {value}" for name, value in level_overrides().items())
+        embed.add_field(name="Levels set", value=overrides[:1024], inline=False)
+        embed.set_footer(text="Changes last until the bot restarts; set LOG_LEVELS in config.py to keep them")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @log_level.autocomplete("module")
+    async def log_level_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.lower()
+        return [app_commands.Choice(name=name, value=name) for name in known_loggers() if current in name.lower()][:25]
+
 async def setup(bot):
     await bot.add_cog(LoggingSystem(bot))
     # Defensive: ensure admin commands are hidden from non-privileged users
     try:
-        for cmd_name in ('testlog', 'setlogchannel', 'logstatus'):
+        for cmd_name in ('testlog', 'setlogchannel', 'logstatus', 'loglevel'):
             app_cmd = bot.tree.get_command(cmd_name)
             if app_cmd:
                 try:
@@ -1,8 +1,12 @@
 import discord  
 from discord.ext import commands  
+import logging
 import os  
 import easy_pil  
 import random  
+from Utils.outbound import Priority, send
+
+logger = logging.getLogger('NZDF.memberjoin')
 
 
 
@@ -14,23 +18,21 @@ class memberjoin(commands.Cog):
     
     @commands.Cog.listener()  
     async def on_member_join(self, member: discord.Member):  
-        print(f"Member join event triggered for {member.name}")
+        logger.info('Member join event triggered for %s', member.name)
     
         welcome_channel = member.guild.system_channel   
         if welcome_channel is None:
-            print(f"ERROR: No system channel set in the server! Please set a system channel in Server Settings > Overview")
+            logger.error('No system channel set in the server! Please set a system channel in Server Settings > Overview')
             return
 
         images = [image for image in os.listdir("Cogs/welcome_images/") if image.endswith ((".png", ".jpg", ".jpeg"))]  
         bg = easy_pil.Editor (f'./Cogs/welcome_images/{random.choice(images)}')
     
 
-        image_file = discord.File (fp=bg.image_bytes, filename='welcome.png')  
-        
-        print(f"Trying to send welcome message to {welcome_channel.name}")
-        await welcome_channel.send(f'Hello there {member.mention} head to https://discord.com/channels/1276682947763896463/1420634043971538945 to apply for the NZDF!')  
-        print(f"Trying to send welcome image")
-        await welcome_channel.send(file=image_file)  
+        logger.info('Trying to send welcome message to %s', welcome_channel.name)
+        await send(self.bot, Priority.WELCOME, ("channel", welcome_channel.id), lambda: welcome_channel.send(f'Hello there {member.mention} head to https://discord.com/channels/1276682947763896463/1420634043971538945 to apply for the NZDF!'))
+        logger.info('Trying to send welcome image')
+        await send(self.bot, Priority.WELCOME, ("channel", welcome_channel.id), lambda: welcome_channel.send(file=discord.File(fp=bg.image_bytes, filename='welcome.png')))
 
 
 async def setup(bot):  
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import discord
+from aiohttp import web
+from discord.ext import commands
+import config
+from Utils.metrics import REGISTRY, interaction_label
+from Utils.resthooks import add_rest_hook, callback_interaction_id, remove_rest_hook
+from Utils.windows import RollingWindow
+
+logger = logging.getLogger('NZDF.metrics')
+
+# Route of the REST request running in the current task, so rate limit log lines can be attributed
+_current_route: ContextVar[Optional[str]] = ContextVar('nzdf_metrics_route', default=None)
+
+_MAX_INFLIGHT = 512
+
+
+class _RateLimitLogFilter(logging.Filter):
+    """Counts the 429s discord.py retries internally; those never reach our request wrapper as errors."""
+
+    def __init__(self, cog: 'Metrics'):
+        super().__init__()
+        self.cog = cog
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str) and record.msg.startswith('We are being rate limited'):
+            self.cog.rest_rate_limited.inc(_current_route.get() or 'unknown')
+        return True
+
+
+class Metrics(commands.Cog):
+    """Serves Prometheus metrics on a local HTTP port and instruments commands and REST calls."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.host: str = getattr(config, 'METRICS_HOST', '127.0.0.1')
+        self.port: Optional[int] = getattr(config, 'METRICS_PORT', 9108)
+        self._runner: Optional[web.AppRunner] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._log_filter = _RateLimitLogFilter(self)
+        self._inflight: dict[int, str] = {}
+        # Last ~2 minutes of loop lag samples (ms) for /ping percentiles
+        self.loop_lag_window = RollingWindow(240)
+
+        self.commands = REGISTRY.counter(
+            "nzdf_commands_total", "Slash command invocations by outcome", ("command", "status"))
+        self.command_duration = REGISTRY.histogram(
+            "nzdf_command_duration_seconds", "Interaction received to command completed", ("command", "status"))
+        self.ack_latency = REGISTRY.histogram(
+            "nzdf_interaction_ack_seconds", "Interaction received to initial response acknowledged", ("command",))
+        self.rest_requests = REGISTRY.counter(
+            "nzdf_rest_requests_total", "Discord REST requests by route and result", ("route", "status"))
+        self.rest_latency = REGISTRY.histogram(
+            "nzdf_rest_request_seconds", "Discord REST request time including rate limit waits", ("route",))
+        self.rest_rate_limited = REGISTRY.counter(
+            "nzdf_rest_rate_limited_total", "429 responses from Discord by route", ("route",))
+        self.loop_lag = REGISTRY.histogram(
+            "nzdf_event_loop_lag_seconds", "How late a periodic event loop probe woke up",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+        REGISTRY.gauge(
+            "nzdf_gateway_latency_seconds", "Gateway heartbeat latency", callback=self._gateway_latency)
+        REGISTRY.gauge(
+            "nzdf_queue_depth", "Items waiting in the bot's internal queues", ("queue",), callback=self._queue_depths)
+
+    async def cog_load(self):
+        add_rest_hook(self.bot, self._observe_request)
+        for name in ('discord.http', 'discord.webhook.async_'):
+            logging.getLogger(name).addFilter(self._log_filter)
+
+        self._lag_task = asyncio.create_task(self._probe_loop_lag())
+        if self.port:
+            await self._start_server()
+
+    async def cog_unload(self):
+        remove_rest_hook(self._observe_request)
+        for name in ('discord.http', 'discord.webhook.async_'):
+            logging.getLogger(name).removeFilter(self._log_filter)
+        if self._lag_task:
+            self._lag_task.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _start_server(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError:
+            logger.exception('Could not bind metrics endpoint on %s:%s', self.host, self.port)
+            await runner.cleanup()
+            return
+        self._runner = runner
+        logger.info('Metrics endpoint listening on http://%s:%s/metrics', self.host, self.port)
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=REGISTRY.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    @contextmanager
+    def _observe_request(self, route, kwargs):
+        """Time a discord.py REST request and count its result per route."""
+        label = f"{route.method} {route.path}"
+        token = _current_route.set(label)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            yield
+            status = "ok"
+        except discord.RateLimited:
+            status = "429"
+            self.rest_rate_limited.inc(label)
+            raise
+        except discord.HTTPException as e:
+            status = str(e.status)
+            if e.status == 429:
+                self.rest_rate_limited.inc(label)
+            raise
+        finally:
+            _current_route.reset(token)
+            self.rest_requests.inc(label, status)
+            self.rest_latency.observe(time.perf_counter() - started, label)
+            if status == "ok":
+                interaction_id = callback_interaction_id(route)
+                if interaction_id is not None:
+                    self._record_ack(interaction_id)
+
+    def _record_ack(self, interaction_id: int) -> None:
+        name = self._inflight.get(interaction_id, "other")
+        created = discord.utils.snowflake_time(interaction_id).timestamp()
+        self.ack_latency.observe(max(0.0, time.time() - created), name)
+
+    def _record_completion(self, interaction: discord.Interaction, status: str) -> None:
+        name = self._inflight.pop(interaction.id, None) or getattr(interaction.command, 'qualified_name', 'unknown')
+        self.commands.inc(name, status)
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        self.command_duration.observe(max(0.0, elapsed), name, status)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        if len(self._inflight) >= _MAX_INFLIGHT:
+            # Interactions that never completed (e.g. components) would otherwise pile up
+            self._inflight.pop(next(iter(self._inflight)))
+        self._inflight[interaction.id] = interaction_label(interaction)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self._record_completion(interaction, "ok")
+
+    @commands.Cog.listener()
+    async def on_app_command_failed(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        self._record_completion(interaction, "error")
+
+    async def _probe_loop_lag(self, interval: float = 0.5) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            self.loop_lag.observe(lag)
+            self.loop_lag_window.add(lag * 1000)
+
+    def _gateway_latency(self):
+        latency = self.bot.latency
+        return [((), latency)] if math.isfinite(latency) else []
+
+    def _queue_depths(self):
+        samples: list[tuple[tuple[str, ...], float]] = []
+        outbound = self.bot.get_cog('Outbound')
+        if outbound:
+            for priority, depth in outbound.scheduler.depth_by_class().items():  # type: ignore[attr-defined]
+                samples.append(((f"outbound_{priority.name.lower()}",), depth))
+        side_effects = self.bot.get_cog('SideEffects')
+        if side_effects:
+            samples.append((("side_effects",), side_effects.queue.depth))  # type: ignore[attr-defined]
+            samples.append((("side_effects_dead_letters",), len(side_effects.queue.dead_letters)))  # type: ignore[attr-defined]
+        moderation = self.bot.get_cog('Moderation')
+        if moderation:
+            samples.append((("case_log_pending",), moderation.cases.pending))  # type: ignore[attr-defined]
+            samples.append((("ticket_notices",), len(moderation.ticket_timers)))  # type: ignore[attr-defined]
+        callsigns = self.bot.get_cog('Callsigns')
+        if callsigns:
+            samples.append((("callsign_requests",), len(callsigns.expiry)))  # type: ignore[attr-defined]
+        session = self.bot.get_cog('Session')
+        if session:
+            samples.append((("session_timers",), len(session.timers)))  # type: ignore[attr-defined]
+        return samples
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Metrics(bot))
@@ -2,14 +2,236 @@ from __future__ import annotations
 
 import discord
 from discord import app_commands, Permissions
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
+import logging
 import random
+import time
+from typing import Optional
 from config import ROLE_CONFIG, MEDIA, BEAT_ITEMS, CHANNEL_CONFIG, has_any_role_ids, has_permission, get_required_role_mentions, check_channel_restriction, get_output_channel, media_file
 import config
+from Utils.storage import data_path
+from Utils.casestore import CaseStore, CaseRecord
+from Utils.threads import create_thread_with_retry
+from Utils.outbound import Priority, send, post
+from Utils.side_effects import enqueue
+from Utils.tickets import TicketNotice, TicketNoticeStore
+from Utils.timers import TimerHeap
+from Utils.metrics import cache_lookup
+
+logger = logging.getLogger('NZDF.moderation')
 
 class Moderation(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.cases = CaseStore(data_path("cases.db"))
+        self._backfill_task: Optional[asyncio.Task] = None
+        self.tickets = TicketNoticeStore(data_path("tickets.db"))
+        self.ticket_timers = TimerHeap("ticket-inactivity")
+        self.ticket_hours: float = getattr(config, 'TICKET_INACTIVITY_HOURS', 12)
+        self.ticket_categories: set[int] = set(getattr(config, 'TICKET_CATEGORIES', None) or [])
+        self.ticket_prefix: str = (getattr(config, 'TICKET_CHANNEL_PREFIX', 'ticket-') or '').lower()
+        self.ticket_close_action: str = getattr(config, 'TICKET_CLOSE_ACTION', 'lock')
+
+    async def cog_load(self):
+        self.flush_cases.start()
+        self._backfill_task = asyncio.create_task(self._backfill_caselog())
+        self.ticket_timers.start()
+        # Re-arm outstanding notices; replies missed while offline are caught when each deadline fires
+        notices = self.tickets.load_all()
+        for notice in notices:
+            self._arm_notice(notice)
+        if notices:
+            logger.info('Restored %d ticket inactivity notice(s)', len(notices))
+
+    async def cog_unload(self):
+        self.flush_cases.cancel()
+        self.ticket_timers.stop()
+        if self._backfill_task:
+            self._backfill_task.cancel()
+        await asyncio.to_thread(self.cases.flush)
+        self.cases.close()
+        self.tickets.close()
+
+    def _is_ticket(self, channel: discord.abc.GuildChannel | discord.Thread) -> bool:
+        """Whether ``channel`` is a ticket: in a ``TICKET_CATEGORIES`` category or named with ``TICKET_CHANNEL_PREFIX``."""
+        if isinstance(channel, discord.Thread):
+            if self.ticket_prefix and channel.name.lower().startswith(self.ticket_prefix):
+                return True
+            channel = channel.parent  # type: ignore[assignment]
+            if channel is None:
+                return False
+        if channel.category_id in self.ticket_categories:
+            return True
+        return bool(self.ticket_prefix) and channel.name.lower().startswith(self.ticket_prefix)
+
+    def _arm_notice(self, notice: TicketNotice) -> None:
+        channel_id = notice.channel_id
+        self.ticket_timers.schedule(channel_id, notice.deadline, lambda: self._enforce_notice(channel_id))
+
+    def _clear_notice(self, channel_id: int) -> None:
+        self.ticket_timers.cancel(channel_id)
+        self.tickets.delete(channel_id)
+
+    @staticmethod
+    def _is_reply(author: discord.abc.User, notice: TicketNotice) -> bool:
+        """Whether a message from ``author`` answers the notice: the ticket user or anyone else who isn't staff."""
+        if author.bot:
+            return False
+        if author.id == notice.user_id:
+            return True
+        return not (isinstance(author, discord.Member) and has_permission(author, "inactivity"))
+
+    @classmethod
+    def _replied_since(cls, channel: discord.TextChannel | discord.Thread, notice: TicketNotice) -> bool:
+        """Whether someone has answered the notice, judged from ``last_message_id`` alone.
+
+        Snowflakes are time-ordered, so any later message has a larger id. If
+        the latest message is in cache and came from a bot or staff it doesn't
+        count; if it isn't cached we err on the side of keeping the ticket open.
+        """
+        last_id = channel.last_message_id
+        if not last_id or last_id <= notice.notice_id:
+            return False
+        last = channel.last_message
+        cache_lookup("message", last is not None)
+        return last is None or cls._is_reply(last.author, notice)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or message.channel.id not in self.ticket_timers:
+            return
+        notice = self.tickets.get(message.channel.id)
+        # Staff follow-ups ("still waiting on you") mustn't cancel the auto-close
+        if notice is not None and not self._is_reply(message.author, notice):
+            return
+        self._clear_notice(message.channel.id)
+        logger.info('Inactivity notice in #%s cleared by a reply from %s', getattr(message.channel, 'name', message.channel.id), message.author)
+
+    async def _enforce_notice(self, channel_id: int) -> None:
+        """Close a ticket whose inactivity notice expired without a reply."""
+        notice = self.tickets.get(channel_id)
+        if notice is None:
+            return
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(channel_id)
+        self.tickets.delete(channel_id)
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return
+        if self._replied_since(channel, notice):
+            logger.info('Inactivity notice in #%s lapsed after a reply; leaving ticket open', channel.name)
+            return
+        if not self._is_ticket(channel):
+            logger.warning('Inactivity notice in #%s expired but it is not a ticket channel; leaving it open', channel.name)
+            return
+
+        embed = discord.Embed(
+            title="Ticket Closed",
+            description=f"This ticket has been closed after {notice.hours:g} hours without a response to the inactivity notice.",
+            color=discord.Color.dark_grey()
+        )
+        try:
+            await send(self.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), lambda: channel.send(embed=embed))
+            action = await self._close_ticket(channel, notice)
+        except discord.HTTPException:
+            logger.exception('Failed to close inactive ticket #%s', channel.name)
+            return
+        await self._log_ticket_closure(channel, notice, action)
+
+    async def _close_ticket(self, channel: discord.TextChannel | discord.Thread, notice: TicketNotice) -> str:
+        """Close an expired ticket. Channels are only deleted when ``TICKET_CLOSE_ACTION`` is ``"delete"``."""
+        reason = "Ticket inactivity notice expired"
+        bucket = ("channel_edit", channel.id)
+        if isinstance(channel, discord.Thread):
+            await send(self.bot, Priority.ANNOUNCEMENT, bucket, lambda: channel.edit(archived=True, locked=True, reason=reason))
+            return "archived"
+
+        if self.ticket_close_action == "delete":
+            await send(self.bot, Priority.ANNOUNCEMENT, bucket, lambda: channel.delete(reason=reason))
+            return "deleted"
+
+        overwrites = dict(channel.overwrites)
+        member = channel.guild.get_member(notice.user_id)
+        archive = channel.guild.get_channel(CHANNEL_CONFIG.get("TICKET_ARCHIVE_CATEGORY") or 0)
+        if isinstance(archive, discord.CategoryChannel):
+            if member:
+                overwrites[member] = discord.PermissionOverwrite(view_channel=False)
+            await send(self.bot, Priority.ANNOUNCEMENT, bucket, lambda: channel.edit(category=archive, overwrites=overwrites, reason=reason))
+            return f"moved to {archive.name}"
+
+        # Lock in place: the ticket's user can still read it but no longer post
+        if member:
+            overwrite = overwrites.get(member, discord.PermissionOverwrite())
+            overwrite.update(send_messages=False)
+            overwrites[member] = overwrite
+        name = channel.name if channel.name.startswith("closed-") else f"closed-{channel.name}"[:100]
+        await send(self.bot, Priority.ANNOUNCEMENT, bucket, lambda: channel.edit(name=name, overwrites=overwrites, reason=reason))
+        return "locked"
+
+    async def _log_ticket_closure(self, channel: discord.TextChannel | discord.Thread, notice: TicketNotice, action: str) -> None:
+        logging_cog = self.bot.get_cog('LoggingSystem')
+        if not logging_cog or not hasattr(logging_cog, 'get_log_channel'):
+            return
+        log_channel = await logging_cog.get_log_channel()  # type: ignore
+        if not log_channel:
+            return
+        embed = discord.Embed(
+            title="🎫 Inactive Ticket Closed",
+            description=f"**Ticket:** #{channel.name} ({action})\n**User:** <@{notice.user_id}>\n**Notice by:** <@{notice.issued_by}>",
+            color=discord.Color.dark_grey()
+        )
+        embed.add_field(name="Notice Sent", value=f"<t:{int(notice.deadline - notice.hours * 3600)}:f>", inline=True)
+        embed.add_field(name="Deadline", value=f"<t:{int(notice.deadline)}:f>", inline=True)
+        post(self.bot, Priority.LOG, ("channel", log_channel.id), lambda: log_channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+
+    @tasks.loop(seconds=5)
+    async def flush_cases(self):
+        """Write queued case log rows to disk in one batch."""
+        if self.cases.pending:
+            try:
+                await asyncio.to_thread(self.cases.flush)
+            except Exception:
+                logger.exception('Failed to flush case log batch')
+
+    async def _backfill_caselog(self, batch_size: int = 100):
+        """Index caselog channel history newer than the saved checkpoint.
+
+        The first run crawls the whole channel; later runs only pick up
+        messages posted since the last checkpoint, so this is cheap on restart.
+        """
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(CHANNEL_CONFIG["CASELOG_CHANNEL"])
+        if not isinstance(channel, discord.TextChannel):
+            logger.warning('Case log backfill skipped: caselog channel not found')
+            return
+
+        # Old embeds name the moderator by display name only; resolve it where exactly one member matches
+        by_name: dict[str, Optional[int]] = {}
+        for member in channel.guild.members:
+            by_name[member.display_name] = None if member.display_name in by_name else member.id
+
+        checkpoint = self.cases.get_meta("backfill_after")
+        after = discord.Object(id=int(checkpoint)) if checkpoint else None
+        seen = 0
+        last_id: Optional[int] = None
+        try:
+            async for message in channel.history(limit=None, after=after, oldest_first=True):
+                last_id = message.id
+                seen += 1
+                if self.bot.user and message.author.id == self.bot.user.id:
+                    record = CaseRecord.from_message(message)
+                    if record:
+                        record.moderator_id = by_name.get(record.moderator_name)
+                        self.cases.add(record)
+                if seen % batch_size == 0:
+                    await asyncio.to_thread(self.cases.flush)
+                    self.cases.set_meta("backfill_after", str(last_id))
+            await asyncio.to_thread(self.cases.flush)
+            if last_id is not None:
+                self.cases.set_meta("backfill_after", str(last_id))
+            logger.info('Case log backfill scanned %d messages', seen)
+        except discord.HTTPException:
+            logger.exception('Case log backfill interrupted; will resume from checkpoint')
 
     @app_commands.command(name="beat", description="Beat someone with a random item (joke command)")
     @app_commands.describe(user="The user to beat")
@@ -94,7 +316,7 @@ class Moderation(commands.Cog):
             description=(
                 "Hey,\n\n"
                 "We've noticed that this ticket has been inactive for some time. To ensure we can assist you properly, "
-                "please respond within 12 hours of this message. If we don't hear back from you, the ticket will be "
+                f"please respond within {self.ticket_hours:g} hours of this message. If we don't hear back from you, the ticket will be "
                 "automatically closed to keep things organized.\n\n"
                 "If the ticket is closed and you still need help, don't worry you can always open a new ticket at any time.\n\n"
                 "We're here to help, so feel free to let us know how we can assist you further!\n\n"
@@ -104,10 +326,31 @@ class Moderation(commands.Cog):
         )
         # No logo, no footer for inactivity notice
 
-        if isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
+        if not isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
+            return await interaction.response.send_message("This command can only be used in text channels.", ephemeral=True)
+
+        if not self._is_ticket(interaction.channel):
+            # Only tickets are closed automatically; anywhere else the notice is just a message
             await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions(users=True))
-        else:
-            await interaction.response.send_message("This command can only be used in text channels.", ephemeral=True)
+            await interaction.followup.send(
+                "ℹ️ This isn't a ticket channel, so it won't be closed automatically. "
+                "Ticket channels are set with `TICKET_CATEGORIES` or `TICKET_CHANNEL_PREFIX` in config.py.",
+                ephemeral=True
+            )
+            return
+
+        embed.add_field(name="Closes", value=f"<t:{int(time.time() + self.ticket_hours * 3600)}:R>", inline=False)
+        callback = await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions(users=True))
+        # The notice's own snowflake dates it and marks where replies start
+        notice = TicketNotice(
+            channel_id=interaction.channel.id,
+            notice_id=callback.message_id or interaction.id,
+            user_id=user.id,
+            issued_by=interaction.user.id,
+            hours=self.ticket_hours,
+        )
+        self.tickets.save(notice)
+        self._arm_notice(notice)
 
     @app_commands.command(name="caselog", description="Create a case log entry")
     @app_commands.describe(
@@ -140,6 +383,9 @@ class Moderation(commands.Cog):
         if not isinstance(output_channel, discord.TextChannel):
             return await interaction.response.send_message("Case log channel not found or not properly configured.", ephemeral=True)
 
+        # Acknowledge straight away so the REST calls below can't push us past the interaction deadline
+        await interaction.response.defer(ephemeral=True)
+
         embed = discord.Embed(
             title="⚖️ Case Log",
             description=f"**User:** {user.mention}\n**Punishment:** {punishment}\n**Reason:** {reason}",
@@ -148,47 +394,127 @@ class Moderation(commands.Cog):
         embed.set_thumbnail(url=MEDIA.get("LOGO", ""))
         embed.set_footer(text=f"Case logged by {interaction.user.display_name}")
         
-        files = []
-        f, url = media_file("INFRACTION")
-        if url and f:
-            try:
-                files.append(f)
-            except Exception:
-                pass
+        def send_case():
+            # Open the attachment per attempt; discord.py closes it after an upload, even one that hit a 429
+            f, url = media_file("INFRACTION")
+            return output_channel.send(embed=embed, files=[f] if url and f else [])
 
         # Send the embed and create a thread
-        message = await output_channel.send(embed=embed, files=files)
-        
-        # Wait a tiny bit for Discord to register the message
-        import asyncio
-        await asyncio.sleep(0.3)
-        
-        # Create thread using the correct API
+        message = await send(self.bot, Priority.INTERACTION, ("channel", output_channel.id), send_case)
+        self.cases.add(CaseRecord(
+            message_id=message.id,
+            channel_id=output_channel.id,
+            guild_id=interaction.guild.id,
+            user_id=user.id,
+            moderator_id=interaction.user.id,
+            moderator_name=interaction.user.display_name,
+            punishment=punishment,
+            reason=reason,
+            created_at=int(message.created_at.timestamp()),
+        ))
+
+        # Create the evidence thread, retrying only while the message isn't ready yet
         try:
-            thread = await message.create_thread(
+            thread = await create_thread_with_retry(
+                message,
                 name=f"Case - {user.display_name}",
                 auto_archive_duration=1440,  # 24h auto-archive
                 reason="Evidence thread for case log"
             )
-            await thread.send(f"Put evidence here\n-# *Logged by: {interaction.user.mention}*")
+            enqueue(self.bot, "caselog-thread", lambda: thread.send(f"Put evidence here\n-# *Logged by: {interaction.user.mention}*"))
         except discord.Forbidden:
-            await interaction.response.send_message("⚠️ Bot lacks permission to create threads.", ephemeral=True)
+            await interaction.followup.send("⚠️ Bot lacks permission to create threads.", ephemeral=True)
             return
         except discord.HTTPException as e:
-            await interaction.response.send_message(f"⚠️ Failed to create thread: {e}", ephemeral=True)
+            await interaction.followup.send(f"⚠️ Failed to create thread: {e}", ephemeral=True)
             return
 
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"✅ Case logged for {user.mention} in <#{output_channel.id}>.", ephemeral=True
         )
 
+    @app_commands.command(name="casesearch", description="Search previous case log entries")
+    @app_commands.describe(
+        user="Only show cases for this user",
+        moderator="Only show cases logged by this moderator",
+        query="Words to match in the punishment or reason",
+        limit="How many cases to show (max 25)"
+    )
+    async def casesearch(
+        self,
+        interaction: discord.Interaction,
+        user: Optional[discord.Member] = None,
+        moderator: Optional[discord.Member] = None,
+        query: Optional[str] = None,
+        limit: app_commands.Range[int, 1, 25] = 10
+    ):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "caselog"):
+            required_roles = get_required_role_mentions("caselog", interaction.guild)
+            msg = f"You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not (user or moderator or query):
+            return await interaction.response.send_message("Provide at least a user, a moderator or a search query.", ephemeral=True)
+
+        started = time.perf_counter()
+        if self.cases.pending:
+            await asyncio.to_thread(self.cases.flush)
+        total, rows = await asyncio.to_thread(
+            self.cases.search,
+            user.id if user else None,
+            moderator.id if moderator else None,
+            query,
+            limit,
+            (moderator.display_name, moderator.name, moderator.global_name or "") if moderator else (),
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        filters = []
+        if user:
+            filters.append(f"**User:** {user.mention}")
+        if moderator:
+            filters.append(f"**Moderator:** {moderator.mention}")
+        if query:
+            filters.append(f"**Query:** `{query[:100]}`")
+
+        embed = discord.Embed(
+            title="🔎 Case Search",
+            description="\n".join(filters),
+            color=discord.Color.orange()
+        )
+        if not rows:
+            embed.add_field(name="Results", value="No matching cases found.", inline=False)
+        shown = 0
+        for row in rows:
+            link = ""
+            if row["guild_id"] and row["channel_id"] and row["message_id"]:
+                link = f" • [Jump](https://discord.com/channels/{row['guild_id']}/{row['channel_id']}/{row['message_id']})"
+            moderator_text = f"<@{row['moderator_id']}>" if row["moderator_id"] else (row["moderator_name"] or "Unknown")[:50]
+            reason = row["reason"] if len(row["reason"]) <= 200 else row["reason"][:200] + "..."
+            name = row['punishment'][:200]
+            value = f"<@{row['user_id']}> • <t:{row['created_at']}:d> • by {moderator_text}{link}\n{reason}"
+            # Stay under Discord's 6000 character embed limit, leaving room for the footer
+            if len(embed) + len(name) + len(value) > 5900:
+                break
+            embed.add_field(name=name, value=value, inline=False)
+            shown += 1
+        more = f" • …and {len(rows) - shown} more" if shown < len(rows) else ""
+        embed.set_footer(text=f"Showing {shown} of {total} case(s){more} • {elapsed_ms:.1f}ms")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True, allowed_mentions=discord.AllowedMentions.none())
+
 async def setup(bot: commands.Bot):
     cog = Moderation(bot)
     await bot.add_cog(cog)
 
     # Defensive visibility attributes for slash commands
     try:
-        for cmd_name in ('beat', 'disciplinary', 'inactivity', 'caselog'):
+        for cmd_name in ('beat', 'disciplinary', 'inactivity', 'caselog', 'casesearch'):
             app_cmd = bot.tree.get_command(cmd_name)
             if app_cmd:
                 try:
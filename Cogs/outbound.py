@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands
+import config
+from Utils.outbound import OutboundScheduler, Priority
+
+class Outbound(commands.Cog):
+    """Hosts the shared outbound REST scheduler used by the other cogs."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.scheduler = OutboundScheduler(
+            max_bucket_depth=getattr(config, 'OUTBOUND_MAX_BUCKET_DEPTH', 50),
+            max_total=getattr(config, 'OUTBOUND_MAX_TOTAL', 1000),
+            max_inflight=getattr(config, 'OUTBOUND_MAX_INFLIGHT', 8),
+        )
+
+    async def cog_unload(self):
+        await self.scheduler.close()
+
+    @app_commands.command(name="outboundstatus", description="[ADMIN] Show outbound queue metrics")
+    async def outbound_status(self, interaction: discord.Interaction):
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        depths = self.scheduler.depth_by_class()
+        embed = discord.Embed(
+            title="📤 Outbound Scheduler",
+            description=f"**Queued:** {self.scheduler.depth} • **In flight:** {self.scheduler.inflight} • **429 backoffs:** {self.scheduler.rate_limited}",
+            color=discord.Color.blue()
+        )
+        for priority in Priority:
+            m = self.scheduler.metrics[priority]
+            embed.add_field(
+                name=priority.name.title(),
+                value=(
+                    f"Queued: **{depths[priority]}**\n"
+                    f"Done: {m.completed} • Failed: {m.failed} • Shed: {m.shed}\n"
+                    f"Wait avg: {m.wait_avg * 1000:.0f}ms • max: {m.wait_max * 1000:.0f}ms"
+                ),
+                inline=True
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Outbound(bot))
+    try:
+        app_cmd = bot.tree.get_command('outboundstatus')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
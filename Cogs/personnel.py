@@ -5,12 +5,46 @@ from discord import app_commands, Permissions
 from discord.ext import commands
 from discord.ui import View, Button
 from typing import Optional
+import logging
+import re
 import config
+from Utils.threads import create_thread_with_retry
+from Utils.outbound import Priority, send
+from Utils.side_effects import enqueue
+from Utils.bulk import run_bulk, BulkResult
+from Utils.ranks import RankLadder, RankError
+from Utils.storage import data_path
+from Utils.medalstore import MedalLedger
+from Utils.fuzzy import FuzzyIndex
 from config import (
     ROLE_CONFIG, MEDIA, AVAILABLE_MEDALS, MEDAL_REQUEST_PING_USER,
     has_any_role_ids, has_permission, get_required_role_mentions, get_highest_role, media_file
 )
 
+logger = logging.getLogger('NZDF.personnel')
+
+_PRESERVE_ON_DISCHARGE = frozenset(ROLE_CONFIG["PRESERVE_ROLES_ON_DISCHARGE"])
+_ADD_ON_DISCHARGE = frozenset(ROLE_CONFIG["ADD_ROLES_ON_DISCHARGE"])
+_MEMBER_ID_RE = re.compile(r"\d{15,20}")
+
+def discharge_roles(member: discord.Member, guild: discord.Guild) -> list[discord.Role]:
+    """Final role list for a discharged member.
+
+    Keeps configured preserve roles and managed roles (boosts, integrations),
+    which Discord won't let us remove, then adds the discharge roles.
+    """
+    current = {role.id for role in member.roles}
+    managed = {role.id for role in member.roles if role.managed}
+    final_ids = (current & _PRESERVE_ON_DISCHARGE) | managed | _ADD_ON_DISCHARGE
+    final_ids.discard(guild.id)  # @everyone is implicit
+    return [role for role in map(guild.get_role, final_ids) if role is not None]
+
+def resolve_members(guild: discord.Guild, text: str) -> tuple[list[discord.Member], int]:
+    """Parse mentions/IDs from ``text`` into cached members. Returns ``(members, unmatched_count)``."""
+    ids = list(dict.fromkeys(int(m) for m in _MEMBER_ID_RE.findall(text)))
+    members = [m for m in map(guild.get_member, ids) if m is not None]
+    return members, len(ids) - len(members)
+
 class DischargeConfirmView(View):
     def __init__(self, cog: "Personnel", member: discord.Member):
         super().__init__(timeout=60)
@@ -23,22 +57,13 @@ class DischargeConfirmView(View):
             await interaction.response.send_message("Something went wrong.", ephemeral=True)
             return
 
-        # Store roles to preserve and add
-        preserve_roles = [
-            role for role in self.member.roles
-            if role.id in ROLE_CONFIG["PRESERVE_ROLES_ON_DISCHARGE"]
-        ]
-        add_roles = [
-            interaction.guild.get_role(role_id)
-            for role_id in ROLE_CONFIG["ADD_ROLES_ON_DISCHARGE"]
-        ]
-        add_roles = [role for role in add_roles if role is not None]
-
-        # Remove all roles except those to preserve
+        # Compute the final role set once and apply it in a single edit
+        roles = discharge_roles(self.member, interaction.guild)
         try:
-            await self.member.edit(roles=preserve_roles)
-            if add_roles:
-                await self.member.add_roles(*add_roles)
+            await send(
+                self.cog.bot, Priority.INTERACTION, ("guild_members", interaction.guild.id),
+                lambda: self.member.edit(roles=roles, reason="Discharge")
+            )
             
             await interaction.response.send_message("Member has been discharged.", ephemeral=True)
         except discord.HTTPException:
@@ -64,20 +89,256 @@ class DischargeConfirmView(View):
                     item.disabled = True
             await interaction.message.edit(view=self)
 
+class BulkDischargeConfirmView(View):
+    def __init__(self, cog: "Personnel", members: list[discord.Member], reason: str, skipped: str = ""):
+        super().__init__(timeout=120)
+        self.cog = cog
+        self.members = members
+        self.reason = reason
+        self.skipped = skipped
+
+    def _disable(self):
+        for item in self.children:
+            if isinstance(item, Button):
+                item.disabled = True
+
+    @discord.ui.button(label="Confirm Bulk Discharge", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: Button):
+        if not interaction.guild:
+            await interaction.response.send_message("Something went wrong.", ephemeral=True)
+            return
+        self._disable()
+        self.stop()
+        await interaction.response.edit_message(content=f"⏳ Discharging {len(self.members)} member(s)...", view=self)
+        await self.cog.run_bulk_discharge(interaction, self.members, self.reason, self.skipped)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: Button):
+        self._disable()
+        self.stop()
+        await interaction.response.edit_message(content="Bulk discharge cancelled.", view=self)
+
+class MedalDecisionView(View):
+    """Approve/deny buttons on medal requests.
+
+    Stateless: the request is looked up in the ledger by message ID, so a single
+    persistent instance registered at startup serves every request message.
+    """
+
+    def __init__(self, cog: "Personnel"):
+        super().__init__(timeout=None)
+        self.cog = cog
+
+    async def _decide(self, interaction: discord.Interaction, approved: bool):
+        if not isinstance(interaction.user, discord.Member) or not interaction.message:
+            return await interaction.response.send_message("This action can only be performed by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "medal_approve"):
+            required_roles = get_required_role_mentions("medal_approve", interaction.guild)
+            msg = "❌ You don't have permission to decide medal requests."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        request = self.cog.medals.get_request(interaction.message.id)
+        if request is not None and request["member_id"] == interaction.user.id:
+            return await interaction.response.send_message("❌ You can't decide your own medal request.", ephemeral=True)
+
+        row = self.cog.medals.decide(interaction.message.id, approved, interaction.user.id)
+        if row is None:
+            return await interaction.response.send_message("This medal request isn't in the ledger.", ephemeral=True)
+
+        embed = interaction.message.embeds[0].copy() if interaction.message.embeds else discord.Embed()
+        status = f"✅ **Approved** by {interaction.user.mention}" if approved else f"❌ **Denied** by {interaction.user.mention}"
+        embed.color = discord.Color.green() if approved else discord.Color.red()
+        for i, field in enumerate(embed.fields):
+            if field.name == "📋 Status":
+                embed.set_field_at(i, name="📋 Status", value=status, inline=True)
+                break
+        else:
+            embed.add_field(name="📋 Status", value=status, inline=True)
+
+        await interaction.response.edit_message(embed=embed, view=self)
+
+        # Requests are decided in their evidence thread, which shares the message's ID
+        thread = interaction.guild.get_thread(interaction.message.id) if interaction.guild else None
+        if thread:
+            verdict = "approved 🎖️" if approved else "denied"
+            enqueue(self.cog.bot, "medal-decision", lambda: thread.send(f"<@{row['member_id']}> your request for **{row['medal']}** was **{verdict}** by {interaction.user.mention}."))
+
+    @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, custom_id="medal_approve")
+    async def approve(self, interaction: discord.Interaction, button: Button):
+        await self._decide(interaction, True)
+
+    @discord.ui.button(label="Deny", style=discord.ButtonStyle.red, custom_id="medal_deny")
+    async def deny(self, interaction: discord.Interaction, button: Button):
+        await self._decide(interaction, False)
+
 class Personnel(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.ladder = RankLadder(getattr(config, 'RANK_LADDER', []))
+        self.medals = MedalLedger(data_path("medals.db"), AVAILABLE_MEDALS)
+        self._rebuild_medal_index()
+        self.medal_view = MedalDecisionView(self)
+
+    async def cog_load(self):
+        # One persistent view handles the buttons on every medal request message
+        self.bot.add_view(self.medal_view)
+
+    async def cog_unload(self):
+        self.medal_view.stop()
+        self.medals.close()
+
+    def _check_rank_change(self, actor: discord.Member, member: discord.Member, steps: int) -> tuple[Optional[int], int]:
+        """Validate a rank move and return ``(current, new)`` ladder positions."""
+        current, new = self.ladder.target(member, steps)
+        if actor.id not in config.BOT_ADMINS:
+            actor_rank = self.ladder.position(actor)
+            if actor_rank is None or new >= actor_rank or (current is not None and current >= actor_rank):
+                raise RankError("You can only change ranks below your own.")
+        return current, new
+
+    def _check_discharge(self, actor: discord.Member, member: discord.Member) -> None:
+        """Refuse to discharge anyone at or above ``actor``, by rank ladder or by top role."""
+        if actor.id in config.BOT_ADMINS:
+            return
+        if member.id == member.guild.owner_id or member.top_role >= actor.top_role:
+            raise RankError("Their highest role is at or above yours.")
+        actor_rank, member_rank = self.ladder.position(actor), self.ladder.position(member)
+        if member_rank is not None and (actor_rank is None or member_rank >= actor_rank):
+            raise RankError("Their rank is at or above yours.")
+
+    async def _apply_rank(self, member: discord.Member, guild: discord.Guild, new: int, reason: str):
+        roles = self.ladder.roles_for(member, guild, new)
+        await send(self.bot, Priority.INTERACTION, ("guild_members", guild.id), lambda: member.edit(roles=roles, reason=reason))
+
+    async def _rank_command(self, interaction: discord.Interaction, member: discord.Member, steps: int, reason: Optional[str]):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "promote"):
+            required_roles = get_required_role_mentions("promote", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild or not isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
+            return await interaction.response.send_message("This command can only be used in server text channels.", ephemeral=True)
+
+        if not self.ladder:
+            return await interaction.response.send_message("The rank ladder is not configured. Set `RANK_LADDER` in config.py.", ephemeral=True)
+
+        try:
+            current, new = self._check_rank_change(interaction.user, member, steps)
+        except RankError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        promoted = steps > 0
+        try:
+            await self._apply_rank(member, interaction.guild, new, f"{'Promoted' if promoted else 'Demoted'} by {interaction.user}")
+        except (RankError, discord.HTTPException) as e:
+            return await interaction.followup.send(f"❌ Failed to update ranks: {e}", ephemeral=True)
+
+        old_role = interaction.guild.get_role(self.ladder.roles[current]) if current is not None else None
+        new_role = interaction.guild.get_role(self.ladder.roles[new])
+        embed = discord.Embed(
+            title="🎖️ Promotion" if promoted else "🔻 Demotion",
+            description=f"{member.mention} has been **{'promoted' if promoted else 'demoted'}**.",
+            color=discord.Color.gold() if promoted else discord.Color.orange()
+        )
+        embed.add_field(name="Previous Rank", value=old_role.mention if old_role else "Unranked", inline=True)
+        embed.add_field(name="New Rank", value=new_role.mention if new_role else f"`{self.ladder.roles[new]}`", inline=True)
+        if reason:
+            embed.add_field(name="📄 Reason", value=reason, inline=False)
+        embed.add_field(name="Issued by", value=interaction.user.mention, inline=False)
+        embed.set_thumbnail(url=MEDIA.get("LOGO", ""))
+        if promoted and MEDIA.get("PROMOTION"):
+            embed.set_image(url=MEDIA["PROMOTION"])
+
+        channel = interaction.channel
+        await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions(users=True)))
+        await interaction.followup.send(f"✅ {member.mention} is now {new_role.mention if new_role else 'updated'}.", ephemeral=True)
+
+    @app_commands.command(name="promote", description="Promote a member one rank")
+    @app_commands.describe(member="The member to promote", reason="Reason (shown in embed)")
+    async def promote(self, interaction: discord.Interaction, member: discord.Member, reason: Optional[str] = None):
+        await self._rank_command(interaction, member, 1, reason)
+
+    @app_commands.command(name="demote", description="Demote a member one rank")
+    @app_commands.describe(member="The member to demote", reason="Reason (shown in embed)")
+    async def demote(self, interaction: discord.Interaction, member: discord.Member, reason: Optional[str] = None):
+        await self._rank_command(interaction, member, -1, reason)
+
+    @app_commands.command(name="bulkrank", description="Promote or demote several members at once")
+    @app_commands.describe(
+        action="Promote or demote",
+        members="Mentions or IDs of the members, separated by spaces",
+        steps="How many ranks to move each member (default 1)"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Promote", value="promote"),
+        app_commands.Choice(name="Demote", value="demote"),
+    ])
+    async def bulkrank(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        members: str,
+        steps: app_commands.Range[int, 1, 10] = 1
+    ):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "promote"):
+            required_roles = get_required_role_mentions("promote", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        if not self.ladder:
+            return await interaction.response.send_message("The rank ladder is not configured. Set `RANK_LADDER` in config.py.", ephemeral=True)
+
+        resolved, missing = resolve_members(interaction.guild, members)
+        if not resolved:
+            return await interaction.response.send_message("No server members found in that list.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        guild = interaction.guild
+        actor = interaction.user
+        delta = steps if action.value == "promote" else -steps
+        verb = "Promoted" if delta > 0 else "Demoted"
+
+        async def change_one(member: discord.Member):
+            _, new = self._check_rank_change(actor, member, delta)
+            roles = self.ladder.roles_for(member, guild, new)
+            await send(self.bot, Priority.ANNOUNCEMENT, ("guild_members", guild.id), lambda: member.edit(roles=roles, reason=f"Bulk {verb.lower()} by {actor}"))
+
+        async def progress(result: BulkResult):
+            await interaction.edit_original_response(content=f"⏳ Bulk {action.value} in progress\n{result.summary()}")
+
+        result = await run_bulk(resolved, change_one, concurrency=getattr(config, 'BULK_ACTION_CONCURRENCY', 3), progress=progress)
+        report = result.report(f"✅ {verb} {len(result.succeeded)} member(s)", lambda m: m.mention)
+        if missing:
+            report += f"\n-# {missing} ID(s) did not match a server member and were skipped."
+        await self._finish_bulk(interaction, report)
+
+    def _rebuild_medal_index(self):
+        """Rebuild the autocomplete index after the medal catalog changes."""
+        self.medal_index = FuzzyIndex(self.medals.catalog())
 
     @app_commands.command(name="medalrequest", description="Submit a medal request")
     @app_commands.describe(medal="The medal being requested")
-    @app_commands.choices(medal=[
-        app_commands.Choice(name=medal, value=medal)
-        for medal in AVAILABLE_MEDALS
-    ])
     async def medalrequest(
         self,
         interaction: discord.Interaction,
-        medal: app_commands.Choice[str]
+        medal: str
     ):
         if not isinstance(interaction.user, discord.Member):
             return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
@@ -89,6 +350,16 @@ class Personnel(commands.Cog):
                 msg += f" Required roles: {required_roles}"
             return await interaction.response.send_message(msg, ephemeral=True)
 
+        # Autocomplete only suggests; the typed value still has to be a catalog medal
+        resolved = self.medal_index.resolve(medal)
+        if resolved is None:
+            suggestions = self.medal_index.search(medal, limit=3)
+            msg = f"❌ **{medal}** isn't a recognised medal."
+            if suggestions:
+                msg += " Did you mean: " + ", ".join(f"**{name}**" for name in suggestions) + "?"
+            return await interaction.response.send_message(msg, ephemeral=True)
+        medal = resolved
+
         embed = discord.Embed(
             title="🎖️ Medal Request Submitted",
             description=f"**Application for Military Honor**\n\nA formal request has been submitted for recognition of distinguished service.",
@@ -96,7 +367,7 @@ class Personnel(commands.Cog):
         )
         embed.add_field(
             name="🏅 Medal Requested", 
-            value=f"**{medal.value}**",
+            value=f"**{medal}**",
             inline=False
         )
         embed.add_field(
@@ -137,9 +408,21 @@ class Personnel(commands.Cog):
             if user:
                 ping_content = user.mention
 
+        # Acknowledge first; the send, thread and thread embed below are three REST calls
+        await interaction.response.defer(ephemeral=True)
+
         # Send request and create thread
-        message = await interaction.channel.send(content=ping_content, embed=embed, files=files)
-        thread = await message.create_thread(name=f"🎖️ Medal Request - {interaction.user.display_name}", auto_archive_duration=10080)
+        channel = interaction.channel
+        message = await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(content=ping_content, embed=embed, files=files, view=self.medal_view))
+        self.medals.record_request(message.id, channel.id, interaction.user.id, medal)
+        try:
+            thread = await create_thread_with_retry(
+                message,
+                name=f"🎖️ Medal Request - {interaction.user.display_name}",
+                auto_archive_duration=10080
+            )
+        except discord.HTTPException as e:
+            return await interaction.followup.send(f"⚠️ Medal request posted, but the evidence thread could not be created: {e}", ephemeral=True)
         
         # Send detailed instructions in thread
         thread_embed = discord.Embed(
@@ -164,9 +447,94 @@ class Personnel(commands.Cog):
         )
         thread_embed.set_footer(text="Provide clear, detailed evidence for the best chance of approval")
         
-        await thread.send(embed=thread_embed)
+        enqueue(self.bot, "medalrequest-thread", lambda: thread.send(embed=thread_embed))
+
+        await interaction.followup.send("🎖️ **Medal request submitted successfully!** Please check the thread below and provide the required evidence.", ephemeral=True)
+
+    @medalrequest.autocomplete("medal")
+    async def medal_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=name[:100], value=name[:100]) for name in self.medal_index.search(current, limit=25)]
+
+    @app_commands.command(name="medalcatalog", description="Add or remove a requestable medal")
+    @app_commands.describe(action="Add or remove", medal="Medal name")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Add", value="add"),
+        app_commands.Choice(name="Remove", value="remove"),
+    ])
+    async def medalcatalog(self, interaction: discord.Interaction, action: app_commands.Choice[str], medal: app_commands.Range[str, 2, 100]):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
 
-        await interaction.response.send_message("🎖️ **Medal request submitted successfully!** Please check the thread below and provide the required evidence.", ephemeral=True)
+        if not has_permission(interaction.user, "medal_approve"):
+            required_roles = get_required_role_mentions("medal_approve", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        medal = medal.strip()
+        if action.value == "add":
+            changed = self.medals.add_medal(medal)
+            msg = f"✅ Added **{medal}** to the medal catalog." if changed else f"**{medal}** is already in the catalog."
+        else:
+            medal = self.medal_index.resolve(medal) or medal
+            changed = self.medals.remove_medal(medal)
+            msg = f"✅ Removed **{medal}** from the medal catalog." if changed else f"**{medal}** isn't in the catalog."
+            if changed and medal.casefold() in self.medals.config_catalog:
+                msg += " It is listed in `AVAILABLE_MEDALS` in config.py and will return on restart unless removed there too."
+        if changed:
+            self._rebuild_medal_index()
+            msg += f" ({len(self.medal_index)} medals available)"
+        await interaction.response.send_message(msg, ephemeral=True)
+
+    @medalcatalog.autocomplete("medal")
+    async def medalcatalog_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return await self.medal_autocomplete(interaction, current)
+
+    @app_commands.command(name="medals", description="Show a member's awarded medals")
+    @app_commands.describe(member="The member to look up (defaults to you)")
+    async def medals_command(self, interaction: discord.Interaction, member: Optional[discord.Member] = None):
+        target = member or interaction.user
+        awards = self.medals.medals_for(target.id)
+        total = self.medals.total_for(target.id)
+
+        embed = discord.Embed(
+            title=f"🎖️ Medals - {target.display_name}",
+            color=discord.Color.gold()
+        )
+        if awards:
+            embed.description = "\n".join(
+                f"🏅 **{medal}**" + (f" ×{count}" if count > 1 else "")
+                for medal, count in sorted(awards.items(), key=lambda item: (-item[1], item[0]))
+            )
+            rank = self.medals.rank_of(target.id)
+            embed.add_field(name="Total Awards", value=f"**{total}**", inline=True)
+            embed.add_field(name="Leaderboard", value=f"**#{rank}**" if rank else "Unranked", inline=True)
+        else:
+            embed.description = "No medals awarded yet."
+        embed.set_thumbnail(url=target.display_avatar.url)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="medalboard", description="Show the medal leaderboard")
+    async def medalboard(self, interaction: discord.Interaction):
+        top = self.medals.leaderboard(10)
+        embed = discord.Embed(title="🏆 Medal Leaderboard", color=discord.Color.gold())
+        if top:
+            medals = ["🥇", "🥈", "🥉"]
+            embed.description = "\n".join(
+                f"{medals[i] if i < 3 else f'**{i + 1}.**'} <@{member_id}> — **{total}** award(s)"
+                for i, (member_id, total) in enumerate(top)
+            )
+            most_awarded = self.medals.medal_totals().most_common(5)
+            embed.add_field(
+                name="Most Awarded Medals",
+                value="\n".join(f"🏅 {medal}: **{count}**" for medal, count in most_awarded),
+                inline=False
+            )
+        else:
+            embed.description = "No medals have been awarded yet."
+        embed.set_thumbnail(url=MEDIA.get("LOGO", ""))
+        await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions.none())
 
     @app_commands.command(name="discharge", description="Discharge a member")
     @app_commands.describe(reason="Reason for discharge")
@@ -213,13 +581,105 @@ class Personnel(commands.Cog):
         view = DischargeConfirmView(self, interaction.user)
         await interaction.response.send_message(embed=embed, view=view, files=files, ephemeral=True)
 
+    @app_commands.command(name="bulkdischarge", description="Discharge several members at once (staff only)")
+    @app_commands.describe(
+        members="Mentions or IDs of the members to discharge, separated by spaces",
+        reason="Reason for discharge"
+    )
+    async def bulkdischarge(self, interaction: discord.Interaction, members: str, reason: str):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not has_permission(interaction.user, "bulk_discharge"):
+            required_roles = get_required_role_mentions("bulk_discharge", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        resolved, missing = resolve_members(interaction.guild, members)
+        if not resolved:
+            return await interaction.response.send_message("No server members found in that list.", ephemeral=True)
+
+        allowed: list[discord.Member] = []
+        refused: list[discord.Member] = []
+        for member in resolved:
+            try:
+                self._check_discharge(interaction.user, member)
+                allowed.append(member)
+            except RankError:
+                refused.append(member)
+        skipped = ""
+        if refused:
+            names = ", ".join(m.mention for m in refused[:20]) + (f" and {len(refused) - 20} more" if len(refused) > 20 else "")
+            skipped = f"-# Skipped {len(refused)} member(s) at or above your rank: {names}"
+        if not allowed:
+            return await interaction.response.send_message(
+                f"❌ You can only discharge members below your own rank.\n{skipped}", ephemeral=True, allowed_mentions=discord.AllowedMentions.none()
+            )
+
+        preview = ", ".join(m.mention for m in allowed[:20])
+        if len(allowed) > 20:
+            preview += f" and {len(allowed) - 20} more"
+        content = f"⚠️ You are about to discharge **{len(allowed)}** member(s): {preview}\n**Reason:** {reason}"
+        if skipped:
+            content += f"\n{skipped}"
+        if missing:
+            content += f"\n-# {missing} ID(s) did not match a server member and will be skipped."
+        view = BulkDischargeConfirmView(self, allowed, reason, skipped)
+        await interaction.response.send_message(content, view=view, ephemeral=True, allowed_mentions=discord.AllowedMentions.none())
+
+    async def run_bulk_discharge(self, interaction: discord.Interaction, members: list[discord.Member], reason: str, skipped: str = ""):
+        """Apply the discharge role set to each member through the shared rate-limited queue."""
+        guild = interaction.guild
+        assert guild is not None and isinstance(interaction.user, discord.Member)
+        actor = interaction.user
+        bucket = ("guild_members", guild.id)
+
+        async def discharge_one(member: discord.Member):
+            # Checked again: roles may have changed while the confirmation was open
+            self._check_discharge(actor, member)
+            roles = discharge_roles(member, guild)
+            await send(self.bot, Priority.ANNOUNCEMENT, bucket, lambda: member.edit(roles=roles, reason=f"Bulk discharge: {reason}"))
+
+        async def progress(result: BulkResult):
+            await interaction.edit_original_response(content=f"⏳ Bulk discharge in progress\n{result.summary()}")
+
+        result = await run_bulk(members, discharge_one, concurrency=getattr(config, 'BULK_ACTION_CONCURRENCY', 3), progress=progress)
+        report = result.report("✅ Bulk discharge complete", lambda m: m.mention)
+        if skipped:
+            report += f"\n{skipped}"
+        await self._finish_bulk(interaction, report)
+
+    async def _finish_bulk(self, interaction: discord.Interaction, report: str):
+        try:
+            await interaction.edit_original_response(content=report)
+            return
+        except discord.HTTPException:
+            pass
+        # Interaction tokens expire after 15 minutes, followups included; post in the channel instead
+        channel = interaction.channel
+        if isinstance(channel, discord.abc.Messageable):
+            content = f"{interaction.user.mention}\n{report}"[:2000]
+            try:
+                await send(self.bot, Priority.INTERACTION, ("channel", channel.id), lambda: channel.send(
+                    content, allowed_mentions=discord.AllowedMentions(users=[interaction.user])
+                ))
+                return
+            except discord.HTTPException:
+                pass
+        logger.warning('Could not deliver bulk action report to %s:\n%s', interaction.user, report)
+
 async def setup(bot: commands.Bot):
     cog = Personnel(bot)
     await bot.add_cog(cog)
 
     # Defensive visibility attributes for slash commands
     try:
-        for cmd_name in ('medalrequest', 'discharge'):
+        for cmd_name in ('medalrequest', 'discharge', 'bulkdischarge', 'promote', 'demote', 'bulkrank', 'medalcatalog'):
             app_cmd = bot.tree.get_command(cmd_name)
             if app_cmd:
                 try:
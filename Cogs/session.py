@@ -1,25 +1,51 @@
 from __future__ import annotations
 
+import asyncio
 import discord
 from discord import app_commands, Permissions
 from discord.ext import commands
 from discord.ui import View, Button
+import logging
+import time
+from datetime import datetime, timezone
 from typing import Optional, Set
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import config
 from config import ROLE_CONFIG, CHANNEL_CONFIG, has_any_role_ids
+from Utils.attendance import SessionAttendance
+from Utils.outbound import Priority, send, post
+from Utils.sessionstore import SessionHistory, DURATION, QUORUM, REPEATS, next_occurrence, parse_schedule_time
+from Utils.storage import data_path
+from Utils.timers import TimerHeap
+
+logger = logging.getLogger('NZDF.session')
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_SHADES = " ░▒▓█"
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "—"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m {int(seconds % 60):02d}s" if seconds < 600 else f"{int(seconds // 60)}m"
+    return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
 
 class SessionVoteView(View):
-    def __init__(self, cog: "Session"):
+    def __init__(self, cog: "Session", votes: Optional[Set[int]] = None):
         super().__init__(timeout=None)
         self.cog = cog
-        self.votes: Set[int] = set()
+        self.votes: Set[int] = set(votes or ())
+        self.message_id: Optional[int] = None
+        self.channel_id: Optional[int] = None
+        self.closes_at: Optional[float] = None
         self.required_votes = 3
+        self.closed = False
+        # Clicks arrive faster than edits complete: at most one edit is in flight and one waiting
+        self._edit_lock = asyncio.Lock()
+        self._edit_waiting = False
 
-    async def update_embed(self, interaction: discord.Interaction):
-        if not interaction.message:
-            return
-
-        embed = interaction.message.embeds[0]
+    async def _render(self, message: discord.Message):
+        embed = message.embeds[0]
         # Update vote count with better formatting
         votes_text = f"**{len(self.votes)}/{self.required_votes}** votes needed"
         if len(self.votes) >= self.required_votes:
@@ -37,66 +63,87 @@ class SessionVoteView(View):
         else:
             embed.set_field_at(1, name="Status", value="**Voting in Progress**")
         
-        await interaction.message.edit(embed=embed)
+        await send(self.cog.bot, Priority.INTERACTION, ("channel", message.channel.id), lambda: message.edit(embed=embed))
 
-        # Check if we have enough votes
-        if len(self.votes) >= self.required_votes:
-            # Get the session status channel
-            if not interaction.guild:
-                return
-            
-            channel = interaction.guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
-            if not isinstance(channel, discord.TextChannel):
+    async def update_embed(self, interaction: discord.Interaction):
+        """Show the current tally; a waiting edit renders whatever the tally is when its turn comes."""
+        if not interaction.message or self._edit_waiting:
+            return
+        self._edit_waiting = True
+        async with self._edit_lock:
+            self._edit_waiting = False
+            if self.closed:
                 return
+            await self._render(interaction.message)
+
+    async def start_session(self, interaction: discord.Interaction):
+        """Announce the session once quorum is reached; only the click that reached it gets here."""
+        message = interaction.message
+        if not message:
+            return
+        # Wait out an in-flight tally edit so it can't land after the delete; rendering now would be wasted
+        async with self._edit_lock:
+            pass
+
+        self.cog._finish_vote(message.id)
+        # Get the session status channel
+        if not interaction.guild:
+            return
+        
+        channel = interaction.guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
+        if not isinstance(channel, discord.TextChannel):
+            return
 
-            # Delete previous session messages before starting new session
-            await self.cog._delete_previous_session_messages(channel)
+        # Delete previous session messages before starting new session
+        await self.cog._delete_previous_session_messages(channel)
 
-            # Delete the vote message
-            await interaction.message.delete()
+        # Delete the vote message
+        await message.delete()
 
-            # Send online message
-            role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
-            mention = role.mention if role else ""
-            
-            online_embed = discord.Embed(
-                title="🟢 Session is Now ONLINE!",
-                description="**The session has officially started!**\n\n**Join us for:**\n• **Military Operations** - Coordinated missions\n• **Training Exercises** - Skill development\n• **Team Building** - Work together\n• **Achievement Hunting** - Earn recognition\n\n**Get in-game and join the action!**\n\n-#Some of these activities may be present but are not guaranteed.",
-                color=discord.Color.green()
-            )
-            online_embed.add_field(
-                name="Vote Results",
-                value=f"✅ **{len(self.votes)}/{self.required_votes}** votes achieved",
-                inline=True
-            )
-            online_embed.add_field(
-                name="Session Started",
-                value="<t:{}:R>".format(int(discord.utils.utcnow().timestamp())),
-                inline=True
-            )
-            online_embed.add_field(
-                name="Status",
-                value="🟢 **LIVE & ACTIVE**",
-                inline=True
-            )
-            online_embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
-            online_embed.set_footer(text="Session started via democratic vote • Good luck out there!")
-            
-            # Create non-pressable button view
-            button_view = View(timeout=None)
-            button = Button(
-                label="Started by Vote",
-                style=discord.ButtonStyle.secondary,
-                disabled=True
-            )
-            button_view.add_item(button)
-            
-            await channel.send(content=mention, embed=online_embed, view=button_view)
-            
-            # Update channel name
-            await channel.edit(name="「🟢」nzdf-status")
-
-    @discord.ui.button(label="Vote to Start", style=discord.ButtonStyle.primary, emoji="🗳️")
+        # Send online message
+        role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
+        mention = role.mention if role else ""
+        
+        online_embed = discord.Embed(
+            title="🟢 Session is Now ONLINE!",
+            description="**The session has officially started!**\n\n**Join us for:**\n• **Military Operations** - Coordinated missions\n• **Training Exercises** - Skill development\n• **Team Building** - Work together\n• **Achievement Hunting** - Earn recognition\n\n**Get in-game and join the action!**\n\n-#Some of these activities may be present but are not guaranteed.",
+            color=discord.Color.green()
+        )
+        online_embed.add_field(
+            name="Vote Results",
+            value=f"✅ **{len(self.votes)}/{self.required_votes}** votes achieved",
+            inline=True
+        )
+        online_embed.add_field(
+            name="Session Started",
+            value="<t:{}:R>".format(int(discord.utils.utcnow().timestamp())),
+            inline=True
+        )
+        online_embed.add_field(
+            name="Status",
+            value="🟢 **LIVE & ACTIVE**",
+            inline=True
+        )
+        online_embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
+        online_embed.set_footer(text="Session started via democratic vote • Good luck out there!")
+        
+        # Create non-pressable button view
+        button_view = View(timeout=None)
+        button = Button(
+            label="Started by Vote",
+            style=discord.ButtonStyle.secondary,
+            disabled=True
+        )
+        button_view.add_item(button)
+        
+        await send(self.cog.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), lambda: channel.send(content=mention, embed=online_embed, view=button_view))
+        self.cog.start_attendance(interaction.guild)
+        self.cog.record_transition(self.cog.history.started, "vote", votes=len(self.votes))
+        
+        # Update channel name (renames are heavily rate limited, so don't wait on it)
+        post(self.cog.bot, Priority.ANNOUNCEMENT, ("channel_edit", channel.id), lambda: channel.edit(name="「🟢」nzdf-status"))
+
+    @discord.ui.button(label="Vote to Start", style=discord.ButtonStyle.primary, emoji="🗳️", custom_id="session_vote")
     async def vote(self, interaction: discord.Interaction, button: Button):
         if not isinstance(interaction.user, discord.Member):
             return await interaction.response.send_message("❌ Only server members can vote.", ephemeral=True)
@@ -108,19 +155,225 @@ class SessionVoteView(View):
                 msg += f" Required roles: {required_roles}"
             return await interaction.response.send_message(msg, ephemeral=True)
 
+        if self.closed:
+            return await interaction.response.send_message("This session vote has closed.", ephemeral=True)
+
         if interaction.user.id in self.votes:
             self.votes.remove(interaction.user.id)
-            await interaction.response.send_message("**Vote removed!** Changed your mind? That's okay!", ephemeral=True)
+            reply = "**Vote removed!** Changed your mind? That's okay!"
         else:
             self.votes.add(interaction.user.id)
-            await interaction.response.send_message("✅ **Vote counted!** Thanks for supporting the session!", ephemeral=True)
+            reply = "✅ **Vote counted!** Thanks for supporting the session!"
 
-        await self.update_embed(interaction)
+        # Close in the same step as the vote that reached quorum, before any await, so
+        # concurrent clicks can't start a second session or vote on a message being deleted
+        reached = len(self.votes) >= self.required_votes
+        if reached:
+            self.closed = True
+        await interaction.response.send_message(reply, ephemeral=True)
+
+        if reached:
+            await self.start_session(interaction)
+        else:
+            self.cog.save_vote(self)
+            await self.update_embed(interaction)
 
 class Session(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.protected_message_id = 1425752278530523310  # Message that should never be deleted
+        self.attendance: Optional[SessionAttendance] = None
+        self.voice_channel_ids: Set[int] = set(getattr(config, 'SESSION_VOICE_CHANNELS', []))
+        tz_name = getattr(config, 'SESSION_STATS_TIMEZONE', 'Pacific/Auckland')
+        try:
+            tz = ZoneInfo(tz_name)
+        except ZoneInfoNotFoundError:
+            logger.warning('Unknown SESSION_STATS_TIMEZONE %r; using UTC', tz_name)
+            tz = timezone.utc
+        self.history = SessionHistory(data_path("sessions.db"), tz=tz)
+        self.timers = TimerHeap("session-schedule")
+        self.vote_expiry_minutes: float = getattr(config, 'SESSION_VOTE_EXPIRY_MINUTES', 60)
+        self.schedule_grace_minutes: float = getattr(config, 'SESSION_SCHEDULE_GRACE_MINUTES', 30)
+        self._votes: dict[int, SessionVoteView] = {}
+
+    async def cog_load(self):
+        self.timers.start()
+        # Deadlines that passed while offline fire straight away and are checked against the grace window
+        for row in self.history.schedules():
+            self._arm_schedule(row["id"], row["run_at"])
+        # Rehydrate open votes so their button and expiry survive a restart
+        for row in self.history.open_votes():
+            votes = {int(v) for v in row["votes"].split(",") if v}
+            view = SessionVoteView(self, votes)
+            self.track_vote(view, row["message_id"], row["channel_id"], row["closes_at"], persist=False)
+            self.bot.add_view(view, message_id=row["message_id"])
+
+    async def cog_unload(self):
+        self.timers.stop()
+        for view in self._votes.values():
+            view.stop()
+        self.history.close()
+
+    def track_vote(self, view: SessionVoteView, message_id: int, channel_id: int,
+                   closes_at: Optional[float], persist: bool = True) -> None:
+        """Remember an open vote and arm its expiry timer."""
+        view.message_id = message_id
+        view.channel_id = channel_id
+        view.closes_at = closes_at
+        self._votes[message_id] = view
+        if persist:
+            self.save_vote(view)
+        if closes_at is not None:
+            self.timers.schedule(("vote", message_id), closes_at, lambda: self._expire_vote(message_id))
+
+    def save_vote(self, view: SessionVoteView) -> None:
+        if view.message_id is None or view.channel_id is None or view.closed:
+            return
+        try:
+            self.history.save_vote(view.message_id, view.channel_id, view.closes_at, view.votes)
+        except Exception:
+            logger.exception('Failed to save session vote %s', view.message_id)
+
+    def _finish_vote(self, message_id: int) -> Optional[SessionVoteView]:
+        view = self._votes.pop(message_id, None)
+        self.timers.cancel(("vote", message_id))
+        try:
+            self.history.delete_vote(message_id)
+        except Exception:
+            logger.exception('Failed to delete session vote %s', message_id)
+        return view
+
+    def _arm_schedule(self, schedule_id: int, run_at: float) -> None:
+        self.timers.schedule(("schedule", schedule_id), run_at, lambda: self._run_schedule(schedule_id))
+
+    async def _run_schedule(self, schedule_id: int) -> None:
+        row = self.history.get_schedule(schedule_id)
+        if row is None:
+            return
+        await self.bot.wait_until_ready()
+
+        now = time.time()
+        late = now - row["run_at"]
+        if row["repeat"] in REPEATS:
+            next_run = next_occurrence(row["run_at"], row["repeat"], self.history.tz, now)
+            self.history.reschedule(schedule_id, next_run)
+            self._arm_schedule(schedule_id, next_run)
+        else:
+            self.history.delete_schedule(schedule_id)
+
+        if late > self.schedule_grace_minutes * 60:
+            logger.warning('Skipped scheduled session %s (%s): missed by %d minutes', schedule_id, row["kind"], late // 60)
+            return
+
+        guild = self.bot.get_guild(row["guild_id"])
+        if guild is None:
+            logger.warning('Scheduled session %s skipped: guild %s not available', schedule_id, row["guild_id"])
+            return
+        if self.attendance is not None or self.history.online:
+            logger.info('Scheduled session %s (%s) skipped: a session is already online', schedule_id, row["kind"])
+            return
+        initiator = guild.get_member(row["created_by"]) or guild.me
+        if row["kind"] == "vote":
+            await self.start_vote(guild, initiator, scheduled=True)
+        else:
+            await self.go_online(guild, initiator, scheduled=True)
+
+    async def _expire_vote(self, message_id: int) -> None:
+        """Close a vote that never reached quorum and mark the session offline again."""
+        view = self._votes.get(message_id)
+        if view is None or view.closed:
+            return
+        view.closed = True
+        self._finish_vote(message_id)
+        view.stop()
+        for item in view.children:
+            if isinstance(item, Button):
+                item.disabled = True
+
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(view.channel_id) if view.channel_id else None
+        if not isinstance(channel, discord.TextChannel):
+            return
+        try:
+            message = await channel.fetch_message(message_id)
+        except discord.HTTPException:
+            return
+        embed = message.embeds[0].copy() if message.embeds else discord.Embed(title="🗳️ Session Vote Started")
+        embed.set_field_at(1, name="Status", value=f"⌛ **Vote expired** ({len(view.votes)}/{view.required_votes} votes)")
+        embed.color = discord.Color.dark_grey()
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), lambda: message.edit(embed=embed, view=view))
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel_edit", channel.id), lambda: channel.edit(name="「⚫」nzdf-status"))
+
+    def record_transition(self, func, *args, **kwargs) -> None:
+        """Write a session transition to history without letting a storage error break the command."""
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception('Failed to record session transition %s', getattr(func, '__name__', func))
+
+    def _counts_for_attendance(self, channel: Optional[discord.abc.Connectable]) -> bool:
+        if channel is None:
+            return False
+        if self.voice_channel_ids:
+            return channel.id in self.voice_channel_ids
+        afk = channel.guild.afk_channel
+        return afk is None or channel.id != afk.id
+
+    def start_attendance(self, guild: discord.Guild) -> None:
+        """Begin recording voice attendance, seeded with whoever is already connected."""
+        if self.attendance is not None:
+            return
+        self.attendance = SessionAttendance()
+        for channel in guild.voice_channels + guild.stage_channels:
+            if self._counts_for_attendance(channel):
+                for member in channel.members:
+                    if not member.bot:
+                        self.attendance.join(member.id, self.attendance.started_at)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if self.attendance is None or member.bot:
+            return
+        was_in = self._counts_for_attendance(before.channel)
+        now_in = self._counts_for_attendance(after.channel)
+        if now_in and not was_in:
+            self.attendance.join(member.id)
+        elif was_in and not now_in:
+            self.attendance.leave(member.id)
+
+    def _attendance_embed(self, attendance: SessionAttendance) -> discord.Embed:
+        totals = sorted(attendance.totals().items(), key=lambda item: item[1], reverse=True)
+        ended_at = attendance.ended_at or discord.utils.utcnow().timestamp()
+        duration = int((ended_at - attendance.started_at) // 60)
+        embed = discord.Embed(
+            title="📋 Session Attendance",
+            description=f"**Started:** <t:{int(attendance.started_at)}:t> • **Ended:** <t:{int(ended_at)}:t> • **Length:** {duration} min",
+            color=discord.Color.blurple()
+        )
+        lines = [f"<@{member_id}> — **{int(seconds // 60)}** min" for member_id, seconds in totals]
+        if not lines:
+            embed.add_field(name="Attendees", value="No voice attendance was recorded.", inline=False)
+        # Up to 5 fields of 1024 characters; whoever doesn't fit is summarised on the last line
+        chunks: list[list[str]] = [[]]
+        for line in lines:
+            if sum(len(l) + 1 for l in chunks[-1]) + len(line) > 1024:
+                if len(chunks) == 5:
+                    break
+                chunks.append([])
+            chunks[-1].append(line)
+        shown = sum(len(chunk) for chunk in chunks)
+        if shown < len(lines):
+            last = chunks[-1]
+            while last and sum(len(l) + 1 for l in last) + len(f"…and {len(lines) - shown} more") > 1024:
+                last.pop()
+                shown -= 1
+            last.append(f"…and {len(lines) - shown} more")
+        for chunk in chunks:
+            if chunk:
+                embed.add_field(name="Attendees" if not embed.fields else "\u200b", value="\n".join(chunk), inline=False)
+        embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
+        embed.set_footer(text=f"{len(totals)} attendee(s) • Time in session voice channels")
+        return embed
 
     async def _delete_previous_session_messages(self, channel: discord.TextChannel, limit: int = 10):
         """Delete previous session-related messages, excluding the protected message."""
@@ -131,7 +384,9 @@ class Session(commands.Cog):
                 "⚫ Session OFFLINE",
                 "🗳️ Session Vote Started"
             ]
-            
+            attendance_title = "📋 Session Attendance"
+            deleted_status = deleted_attendance = False
+
             async for message in channel.history(limit=limit):
                 # Never delete the protected message
                 if message.id == self.protected_message_id:
@@ -140,41 +395,35 @@ class Session(commands.Cog):
                 # Check if message has session-related embeds
                 if message.embeds and message.embeds[0].title:
                     embed_title = message.embeds[0].title
-                    if any(title in embed_title for title in session_titles):
+                    # Only delete the most recent status message and attendance summary
+                    if not deleted_status and any(title in embed_title for title in session_titles):
                         await message.delete()
-                        break  # Only delete the most recent session message
+                        deleted_status = True
+                    elif not deleted_attendance and attendance_title in embed_title:
+                        await message.delete()
+                        deleted_attendance = True
+                    if deleted_status and deleted_attendance:
+                        break
                         
         except discord.HTTPException:
             pass  # Ignore deletion errors
 
-    @app_commands.command(name="sessionvote", description="Start a session vote")
-    async def sessionvote(self, interaction: discord.Interaction):
-        if not isinstance(interaction.user, discord.Member):
-            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
-
-        if not config.has_permission(interaction.user, "session"):
-            required_roles = config.get_required_role_mentions("session", interaction.guild)
-            msg = "❌ You don't have permission to use this command."
-            if required_roles:
-                msg += f" Required roles: {required_roles}"
-            return await interaction.response.send_message(msg, ephemeral=True)
-
-        if not interaction.guild:
-            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
-
-        # Get session channel - ALWAYS send vote here regardless of where command was used
-        session_channel = interaction.guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
+    async def start_vote(self, guild: discord.Guild, initiator: discord.abc.User, scheduled: bool = False) -> Optional[discord.Message]:
+        """Post a session vote in the status channel and arm its expiry; returns the vote message."""
+        session_channel = guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
         if not isinstance(session_channel, discord.TextChannel):
-            return await interaction.response.send_message("Session status channel not found.", ephemeral=True)
-
-        # Respond ephemerally first
-        await interaction.response.defer(ephemeral=True)
+            return None
 
         # Update channel name
-        await session_channel.edit(name="「🟡」nzdf-status")
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel_edit", session_channel.id), lambda: session_channel.edit(name="「🟡」nzdf-status"))
 
         # Delete previous session messages before starting new vote
         await self._delete_previous_session_messages(session_channel)
+        # The new vote supersedes any still open
+        for message_id, earlier in list(self._votes.items()):
+            earlier.closed = True
+            earlier.stop()
+            self._finish_vote(message_id)
 
         # Create vote embed
         embed = discord.Embed(
@@ -197,19 +446,54 @@ class Session(commands.Cog):
             value="**3** votes to start",
             inline=True
         )
+        closes_at = time.time() + self.vote_expiry_minutes * 60 if self.vote_expiry_minutes else None
+        if closes_at is not None:
+            embed.add_field(
+                name="Closes",
+                value=f"<t:{int(closes_at)}:R>",
+                inline=True
+            )
         embed.set_footer(
-            text=f"Vote initiated by {interaction.user.display_name} • Vote to participate!",
-            icon_url=interaction.user.display_avatar.url
+            text=f"{'Scheduled vote' if scheduled else 'Vote initiated'} by {initiator.display_name} • Vote to participate!",
+            icon_url=initiator.display_avatar.url
         )
         embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
 
         # Get role to ping
-        role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
+        role = guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
         mention = role.mention if role else ""
 
         view = SessionVoteView(self)
         # ALWAYS send to session channel, not where command was used
-        await session_channel.send(content=mention, embed=embed, view=view)
+        message = await send(self.bot, Priority.ANNOUNCEMENT, ("channel", session_channel.id), lambda: session_channel.send(content=mention, embed=embed, view=view))
+        self.record_transition(self.history.vote_started, initiator.id)
+        self.track_vote(view, message.id, session_channel.id, closes_at)
+        return message
+
+    @app_commands.command(name="sessionvote", description="Start a session vote")
+    async def sessionvote(self, interaction: discord.Interaction):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not config.has_permission(interaction.user, "session"):
+            required_roles = config.get_required_role_mentions("session", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        # Get session channel - ALWAYS send vote here regardless of where command was used
+        session_channel = interaction.guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
+        if not isinstance(session_channel, discord.TextChannel):
+            return await interaction.response.send_message("Session status channel not found.", ephemeral=True)
+
+        # Respond ephemerally first
+        await interaction.response.defer(ephemeral=True)
+
+        await self.start_vote(interaction.guild, interaction.user)
         
         # Confirm to user
         await interaction.followup.send("Session vote started in the session channel!", ephemeral=True)
@@ -238,7 +522,7 @@ class Session(commands.Cog):
             return await interaction.followup.send("Session status channel not found.", ephemeral=True)
 
         # Update channel name
-        await channel.edit(name="「⚫」nzdf-status")
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel_edit", channel.id), lambda: channel.edit(name="「⚫」nzdf-status"))
 
         # Delete previous session messages before sending shutdown message
         await self._delete_previous_session_messages(channel)
@@ -266,40 +550,36 @@ class Session(commands.Cog):
         )
         button_view.add_item(button)
 
-        await channel.send(embed=embed, view=button_view)
-        await interaction.followup.send("Session shut down!", ephemeral=True)
-
-    @app_commands.command(name="fonline", description="Send a regular session online ping")
-    async def fonline(self, interaction: discord.Interaction):
-        if not isinstance(interaction.user, discord.Member):
-            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
-
-        if not config.has_permission(interaction.user, "session"):
-            required_roles = config.get_required_role_mentions("session", interaction.guild)
-            msg = "❌ You don't have permission to use this command."
-            if required_roles:
-                msg += f" Required roles: {required_roles}"
-            return await interaction.response.send_message(msg, ephemeral=True)
-
-        if not interaction.guild:
-            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
-
-        # Defer ephemerally first to remove command log
-        await interaction.response.defer(ephemeral=True)
-
-        # Get the session status channel
-        channel = interaction.guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
+        await send(self.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), lambda: channel.send(embed=embed, view=button_view))
+
+        attendance, self.attendance = self.attendance, None
+        if attendance is None:
+            self.record_transition(self.history.ended, interaction.user.id)
+            return await interaction.followup.send("Session shut down!", ephemeral=True)
+
+        attendance.close()
+        self.record_transition(self.history.ended, interaction.user.id, attendees=len(attendance.totals()))
+        summary = self._attendance_embed(attendance)
+        summary_channel = interaction.guild.get_channel(CHANNEL_CONFIG.get("SESSION_ATTENDANCE_CHANNEL") or channel.id)
+        if not isinstance(summary_channel, discord.TextChannel):
+            summary_channel = channel
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel", summary_channel.id), lambda: summary_channel.send(embed=summary, allowed_mentions=discord.AllowedMentions.none()))
+        await interaction.followup.send(f"Session shut down! Attendance posted in {summary_channel.mention}.", ephemeral=True)
+
+    async def go_online(self, guild: discord.Guild, initiator: discord.abc.User, scheduled: bool = False) -> bool:
+        """Post the session online announcement without a vote."""
+        channel = guild.get_channel(CHANNEL_CONFIG["SESSION_STATUS_CHANNEL"])
         if not isinstance(channel, discord.TextChannel):
-            return await interaction.followup.send("Session status channel not found.", ephemeral=True)
+            return False
 
         # Update channel name to online
-        await channel.edit(name="「🟢」nzdf-status")
+        post(self.bot, Priority.ANNOUNCEMENT, ("channel_edit", channel.id), lambda: channel.edit(name="「🟢」nzdf-status"))
 
         # Delete previous session messages before sending force online message
         await self._delete_previous_session_messages(channel)
 
         # Get role to ping
-        role = interaction.guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
+        role = guild.get_role(ROLE_CONFIG["PING_ROLE_SESSION"])
         mention = role.mention if role else ""
 
         # Send online message (regular ping)
@@ -321,7 +601,7 @@ class Session(commands.Cog):
         )
         online_embed.add_field(
             name="Authorized by",
-            value=f"**{interaction.user.display_name}**",
+            value=f"**{initiator.display_name}**",
             inline=True
         )
         online_embed.add_field(
@@ -330,18 +610,42 @@ class Session(commands.Cog):
             inline=True
         )
         online_embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
-        online_embed.set_footer(text="Session is online")
+        online_embed.set_footer(text="Scheduled session is online" if scheduled else "Session is online")
 
         # Create non-pressable button view
         button_view = View(timeout=None)
         button = Button(
-            label=f"Online: {interaction.user.display_name}",
+            label=f"Online: {initiator.display_name}",
             style=discord.ButtonStyle.secondary,
             disabled=True
         )
         button_view.add_item(button)
 
-        await channel.send(content=mention, embed=online_embed, view=button_view)
+        await send(self.bot, Priority.ANNOUNCEMENT, ("channel", channel.id), lambda: channel.send(content=mention, embed=online_embed, view=button_view))
+        self.start_attendance(guild)
+        self.record_transition(self.history.started, "forced", user_id=initiator.id)
+        return True
+
+    @app_commands.command(name="fonline", description="Send a regular session online ping")
+    async def fonline(self, interaction: discord.Interaction):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not config.has_permission(interaction.user, "session"):
+            required_roles = config.get_required_role_mentions("session", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        # Defer ephemerally first to remove command log
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self.go_online(interaction.guild, interaction.user):
+            return await interaction.followup.send("Session status channel not found.", ephemeral=True)
         await interaction.followup.send("Session is now online.", ephemeral=True)
 
     @app_commands.command(name="sessionlowping", description="Send a low ping encouraging RP participation")
@@ -407,18 +711,171 @@ class Session(commands.Cog):
         )
 
         # Send to session channel
-        await session_channel.send(content=mention, embed=embed)
+        await send(self.bot, Priority.ANNOUNCEMENT, ("channel", session_channel.id), lambda: session_channel.send(content=mention, embed=embed))
         
         # Confirm to user
         await interaction.followup.send("Low ping sent to encourage RP participation!", ephemeral=True)
 
+    @app_commands.command(name="sessionschedule", description="Schedule, list or cancel future session votes and announcements")
+    @app_commands.describe(
+        action="What to do",
+        when="When to run it: a delay like 2h, a time like 19:30, or a date like 2025-11-01 19:30",
+        repeat="Repeat the schedule",
+        schedule_id="Schedule to cancel (see the list action)"
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="Schedule a vote", value="vote"),
+            app_commands.Choice(name="Schedule an online announcement", value="online"),
+            app_commands.Choice(name="List schedules", value="list"),
+            app_commands.Choice(name="Cancel a schedule", value="cancel"),
+        ],
+        repeat=[
+            app_commands.Choice(name="Daily", value="daily"),
+            app_commands.Choice(name="Weekly", value="weekly"),
+        ]
+    )
+    async def sessionschedule(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        when: Optional[str] = None,
+        repeat: Optional[app_commands.Choice[str]] = None,
+        schedule_id: Optional[int] = None
+    ):
+        if not isinstance(interaction.user, discord.Member):
+            return await interaction.response.send_message("This command can only be used by server members.", ephemeral=True)
+
+        if not config.has_permission(interaction.user, "session"):
+            required_roles = config.get_required_role_mentions("session", interaction.guild)
+            msg = "❌ You don't have permission to use this command."
+            if required_roles:
+                msg += f" Required roles: {required_roles}"
+            return await interaction.response.send_message(msg, ephemeral=True)
+
+        if not interaction.guild:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        if action.value == "list":
+            rows = [row for row in self.history.schedules() if row["guild_id"] == interaction.guild.id]
+            embed = discord.Embed(title="🗓️ Scheduled Sessions", color=discord.Color.gold())
+            if not rows:
+                embed.description = "Nothing is scheduled."
+            for row in rows[:25]:
+                kind = "Session vote" if row["kind"] == "vote" else "Online announcement"
+                repeat_text = f" • repeats {row['repeat']}" if row["repeat"] else ""
+                embed.add_field(
+                    name=f"#{row['id']} • {kind}",
+                    value=f"<t:{int(row['run_at'])}:F> (<t:{int(row['run_at'])}:R>){repeat_text}\nScheduled by <@{row['created_by']}>",
+                    inline=False
+                )
+            embed.set_footer(text=f"Times shown in your local timezone • Schedules parsed in {self.history.tz}")
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        if action.value == "cancel":
+            if schedule_id is None:
+                return await interaction.response.send_message("Provide the `schedule_id` to cancel.", ephemeral=True)
+            row = self.history.get_schedule(schedule_id)
+            if row is None or row["guild_id"] != interaction.guild.id:
+                return await interaction.response.send_message(f"No schedule #{schedule_id} found.", ephemeral=True)
+            self.history.delete_schedule(schedule_id)
+            self.timers.cancel(("schedule", schedule_id))
+            return await interaction.response.send_message(f"🗑️ Cancelled schedule #{schedule_id}.", ephemeral=True)
+
+        if not when:
+            return await interaction.response.send_message("Provide `when` to schedule a session.", ephemeral=True)
+        try:
+            run_at = parse_schedule_time(when, self.history.tz)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+
+        timestamp = run_at.timestamp()
+        new_id = self.history.add_schedule(
+            interaction.guild.id, action.value, timestamp, interaction.user.id,
+            repeat=repeat.value if repeat else None,
+        )
+        self._arm_schedule(new_id, timestamp)
+        kind = "session vote" if action.value == "vote" else "online announcement"
+        repeat_text = f", repeating {repeat.value}" if repeat else ""
+        await interaction.response.send_message(
+            f"🗓️ Scheduled {kind} #{new_id} for <t:{int(timestamp)}:F> (<t:{int(timestamp)}:R>){repeat_text}.",
+            ephemeral=True
+        )
+
+    def _heatmap_text(self, slots: list[tuple[int, int, int, float, int]]) -> str:
+        grid = [[0] * 24 for _ in range(7)]
+        for weekday, hour, sessions, _, _ in slots:
+            grid[weekday][hour] = sessions
+        peak = max((max(row) for row in grid), default=0) or 1
+        lines = ["    0     6     12    18   "]
+        for weekday, row in enumerate(grid):
+            cells = "".join(_SHADES[min(len(_SHADES) - 1, -(-count * (len(_SHADES) - 1) // peak))] for count in row)
+            lines.append(f"{_WEEKDAYS[weekday]} {cells}")
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    @app_commands.command(name="sessionstats", description="Show session history, durations and the best times to run sessions")
+    async def sessionstats(self, interaction: discord.Interaction):
+        totals = self.history.totals()
+        if not totals.get("sessions"):
+            return await interaction.response.send_message("No sessions have been recorded yet.", ephemeral=True)
+
+        durations = self.history.percentiles(DURATION)
+        quorum = self.history.percentiles(QUORUM)
+        slots = self.history.heatmap()
+
+        sessions = int(totals.get("sessions", 0))
+        completed = int(totals.get("completed", 0))
+        votes_started = int(totals.get("votes_started", 0))
+        by_vote = int(totals.get("method_vote", 0))
+
+        embed = discord.Embed(
+            title="📈 Session Statistics",
+            description=(
+                f"**Sessions:** {sessions} ({by_vote} by vote, {int(totals.get('method_forced', 0))} forced)\n"
+                f"**Votes reaching quorum:** {by_vote}/{votes_started}"
+                + (f" ({by_vote / votes_started:.0%})" if votes_started else "")
+            ),
+            color=discord.Color.blurple()
+        )
+        embed.add_field(
+            name="Duration",
+            value=f"p50 **{_format_seconds(durations[0.5])}**\np90 {_format_seconds(durations[0.9])}\np95 {_format_seconds(durations[0.95])}",
+            inline=True
+        )
+        embed.add_field(
+            name="Time to Quorum",
+            value=f"p50 **{_format_seconds(quorum[0.5])}**\np90 {_format_seconds(quorum[0.9])}\np95 {_format_seconds(quorum[0.95])}",
+            inline=True
+        )
+        if completed:
+            embed.add_field(
+                name="Turnout",
+                value=f"**{totals.get('attendees', 0) / completed:.1f}** avg attendees\n{totals.get('votes_cast', 0) / max(by_vote, 1):.1f} avg votes",
+                inline=True
+            )
+
+        best = sorted(slots, key=lambda slot: (slot[2], slot[4] / slot[2]), reverse=True)[:3]
+        if best:
+            embed.add_field(
+                name="Best Start Times",
+                value="\n".join(
+                    f"**{_WEEKDAYS[weekday]} {hour:02d}:00** — {count} session(s), {attendees / count:.1f} avg attendees, {minutes / count:.0f} min avg"
+                    for weekday, hour, count, minutes, attendees in best
+                ),
+                inline=False
+            )
+        embed.add_field(name="Start Time Heatmap", value=self._heatmap_text(slots), inline=False)
+        embed.set_thumbnail(url=config.MEDIA.get("LOGO", ""))
+        embed.set_footer(text=f"Times in {self.history.tz} • Percentiles use 1 min (duration) and 15 s (quorum) buckets")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot: commands.Bot):
     cog = Session(bot)
     await bot.add_cog(cog)
 
     # Defensive visibility attributes for slash commands
     try:
-        for cmd_name in ('sessionvote', 'sessionshutdown', 'fonline', 'sessionlowping'):
+        for cmd_name in ('sessionvote', 'sessionshutdown', 'fonline', 'sessionlowping', 'sessionschedule'):
             app_cmd = bot.tree.get_command(cmd_name)
             if app_cmd:
                 try:
@@ -429,5 +886,12 @@ async def setup(bot: commands.Bot):
                     setattr(app_cmd, 'dm_permission', False)
                 except Exception:
                     pass
+    except Exception:
+        pass
+
+    try:
+        app_cmd = bot.tree.get_command('sessionstats')
+        if app_cmd:
+            setattr(app_cmd, 'dm_permission', False)
     except Exception:
         pass
\ No newline at end of file
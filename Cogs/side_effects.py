@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands
+import config
+from Utils.outbound import Priority, post
+from Utils.side_effects import SideEffectQueue, SideEffect, AckTracker
+from Utils.metrics import interaction_label
+from Utils.resthooks import add_rest_hook, callback_interaction_id, remove_rest_hook
+
+class SideEffects(commands.Cog):
+    """Runs DMs, thread posts and log writes after interactions have been acknowledged."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.queue = SideEffectQueue(
+            concurrency=getattr(config, 'SIDE_EFFECT_CONCURRENCY', 4),
+            max_attempts=getattr(config, 'SIDE_EFFECT_MAX_ATTEMPTS', 3),
+            on_dead_letter=self._report_dead_letter,
+        )
+        self.acks = AckTracker()
+
+    async def cog_load(self):
+        self.queue.start()
+        add_rest_hook(self.bot, self._watch_ack)
+
+    async def cog_unload(self):
+        remove_rest_hook(self._watch_ack)
+        await self.queue.stop()
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        self.acks.started(interaction.id, interaction_label(interaction))
+
+    def _watch_ack(self, route, kwargs):
+        interaction_id = callback_interaction_id(route)
+        return self._record_ack(interaction_id) if interaction_id is not None else None
+
+    @contextmanager
+    def _record_ack(self, interaction_id: int):
+        yield
+        # Only reached when the callback succeeded
+        self.acks.acknowledged(interaction_id)
+
+    async def _report_dead_letter(self, job: SideEffect):
+        logging_cog = self.bot.get_cog('LoggingSystem')
+        if not logging_cog or not hasattr(logging_cog, 'get_log_channel'):
+            return
+        channel = await logging_cog.get_log_channel()  # type: ignore
+        if not channel:
+            return
+        embed = discord.Embed(
+            title="📭 Background Task Failed",
+            color=discord.Color.dark_orange(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Task", value=f"`{job.name}`", inline=True)
+        embed.add_field(name="Attempts", value=str(job.attempts), inline=True)
+        embed.add_field(name="Error", value=f"```{(job.error or 'unknown')[:500]}```", inline=False)
+        post(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+
+    @app_commands.command(name="sideeffects", description="[ADMIN] Show background task queue status")
+    async def side_effects_status(self, interaction: discord.Interaction):
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        median = self.acks.median()
+        embed = discord.Embed(title="⚙️ Background Tasks", color=discord.Color.blue())
+        embed.add_field(name="Queued", value=str(self.queue.depth), inline=True)
+        embed.add_field(name="Running", value=str(self.queue.running), inline=True)
+        embed.add_field(name="Completed", value=str(self.queue.completed), inline=True)
+        embed.add_field(name="Retried", value=str(self.queue.retried), inline=True)
+        embed.add_field(name="Dead-lettered", value=str(len(self.queue.dead_letters)), inline=True)
+        embed.add_field(name="Dropped", value=str(self.queue.dropped), inline=True)
+        embed.add_field(
+            name="Median Ack Latency",
+            value=f"**{median:.0f}ms** over {len(self.acks.samples)} interaction(s)" if median is not None else "No samples yet",
+            inline=False
+        )
+        if self.acks.by_label:
+            slowest = sorted(self.acks.by_label, key=lambda label: self.acks.median(label) or 0.0, reverse=True)[:10]
+            embed.add_field(
+                name="Median Ack by Command",
+                value="\n".join(
+                    f"`{label}` — {self.acks.median(label):.0f}ms ({len(self.acks.by_label[label])})" for label in slowest
+                ),
+                inline=False
+            )
+        if self.queue.dead_letters:
+            recent = list(self.queue.dead_letters)[-5:]
+            embed.add_field(
+                name="Recent Failures",
+                value="\n".join(f"`{job.name}`: {(job.error or '')[:80]}" for job in recent),
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(SideEffects(bot))
+    try:
+        app_cmd = bot.tree.get_command('sideeffects')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+from typing import Any, Optional
+from urllib.parse import unquote
+
+import discord
+from discord.ext import commands, tasks
+import config
+from Utils.resthooks import CALLBACK_PATH, add_rest_hook, remove_rest_hook
+from Utils.storage import data_path
+from Utils.tracing import Tracer, current_span, span
+
+logger = logging.getLogger('NZDF.tracing')
+
+_WEBHOOK_PATH = '/webhooks/{webhook_id}/{webhook_token}'
+_WEBHOOK_MESSAGE_PATH = '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}'
+_DEFERRED_TYPES = (5, 6)  # deferred channel message / deferred update
+
+
+def _callback_type(kwargs: dict[str, Any]) -> Optional[int]:
+    payload = kwargs.get('payload')
+    if payload is None and kwargs.get('multipart'):
+        try:
+            payload = json.loads(kwargs['multipart'][0]['value'])
+        except (KeyError, IndexError, TypeError, ValueError):
+            payload = None
+    return payload.get('type') if isinstance(payload, dict) else None
+
+
+def _rest_span_name(route, kwargs: dict[str, Any]) -> str:
+    """Name interaction responses by what they do, so defers and followups stand out in a trace."""
+    if route.path == CALLBACK_PATH:
+        return "defer" if _callback_type(kwargs) in _DEFERRED_TYPES else "respond"
+    if route.path == _WEBHOOK_PATH and route.method == 'POST':
+        return "followup"
+    if route.path == _WEBHOOK_MESSAGE_PATH:
+        edits_original = unquote(route.url.split('?', 1)[0]).endswith('/messages/@original')
+        if route.method == 'PATCH':
+            return "edit_response" if edits_original else "followup_edit"
+        if route.method == 'DELETE':
+            return "delete_response" if edits_original else "followup_delete"
+    return "rest"
+
+
+def _item_name(item: discord.ui.Item) -> str:
+    callback = getattr(item.callback, 'callback', item.callback)
+    name = getattr(callback, '__name__', None)
+    return name if name and name != 'callback' else type(item).__name__
+
+
+class Tracing(commands.Cog):
+    """Records a trace for every app command, component and modal and writes them to a JSONL file."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.tracer = Tracer(
+            data_path(getattr(config, 'TRACE_FILE', 'traces.jsonl')),
+            sample_rate=getattr(config, 'TRACE_SAMPLE_RATE', 1.0),
+            max_bytes=getattr(config, 'TRACE_MAX_BYTES', 5_000_000),
+        )
+        self.tracer.enabled = getattr(config, 'TRACING_ENABLED', True)
+        self._patches: list[tuple[Any, str, Any]] = []
+
+    async def cog_load(self):
+        if not self.tracer.enabled:
+            return
+        self._patch(self.bot.tree, '_call', self._wrap_command(self.bot.tree._call))
+        self._patch(discord.ui.view.BaseView, '_scheduled_task', self._wrap_view(discord.ui.view.BaseView._scheduled_task))
+        self._patch(discord.ui.Modal, '_scheduled_task', self._wrap_modal(discord.ui.Modal._scheduled_task))
+        add_rest_hook(self.bot, self._rest_span)
+        self._patch_permission_checks()
+        self.flush_traces.start()
+
+    async def cog_unload(self):
+        remove_rest_hook(self._rest_span)
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+        if self.flush_traces.is_running():
+            self.flush_traces.cancel()
+        await asyncio.to_thread(self.tracer.flush)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Cogs loaded after this one imported has_permission into their own namespace
+        if self.tracer.enabled:
+            self._patch_permission_checks()
+
+    def _patch(self, owner: Any, attr: str, replacement: Any) -> None:
+        self._patches.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, replacement)
+
+    def _patch_permission_checks(self) -> None:
+        """Time ``has_permission`` wherever a cog imported it."""
+        for name, module in list(sys.modules.items()):
+            if not name.startswith('Cogs.') or module is None:
+                continue
+            check = getattr(module, 'has_permission', None)
+            if check is None or getattr(check, '__traced__', False):
+                continue
+            self._patch(module, 'has_permission', self._wrap_permission(check))
+
+    @staticmethod
+    def _wrap_permission(original):
+        def has_permission(member, command_name: str) -> bool:
+            with span("permission_check", permission=command_name) as s:
+                allowed = original(member, command_name)
+                if s is not None:
+                    s.set(allowed=allowed)
+                return allowed
+
+        has_permission.__traced__ = True  # type: ignore[attr-defined]
+        return has_permission
+
+    @staticmethod
+    def _interaction_attrs(interaction: discord.Interaction) -> dict[str, Any]:
+        queued = (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000
+        return {
+            "interaction_id": interaction.id,
+            "user_id": interaction.user.id if interaction.user else None,
+            "guild_id": interaction.guild_id,
+            "queued_ms": round(max(0.0, queued), 1),
+        }
+
+    def _wrap_command(self, original):
+        tracer = self.tracer
+
+        async def _call(interaction: discord.Interaction) -> None:
+            data = interaction.data or {}
+            kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete else "command"
+            with tracer.trace(data.get('name', 'unknown'), kind, **self._interaction_attrs(interaction)) as root:  # type: ignore[union-attr]
+                await original(interaction)
+                if root is not None and interaction.command_failed:
+                    root.status = "failed"
+
+        return _call
+
+    def _wrap_view(self, original):
+        tracer = self.tracer
+        attrs = self._interaction_attrs
+
+        async def _scheduled_task(view, item, interaction):
+            with tracer.trace(f"{type(view).__name__}.{_item_name(item)}", "component", **attrs(interaction)):
+                return await original(view, item, interaction)
+
+        return _scheduled_task
+
+    def _wrap_modal(self, original):
+        tracer = self.tracer
+        attrs = self._interaction_attrs
+
+        async def _scheduled_task(modal, interaction, *args, **kwargs):
+            with tracer.trace(type(modal).__name__, "modal", **attrs(interaction)):
+                return await original(modal, interaction, *args, **kwargs)
+
+        return _scheduled_task
+
+    @staticmethod
+    def _rest_span(route, kwargs):
+        if current_span() is None:
+            return None
+        return span(_rest_span_name(route, kwargs), route=f"{route.method} {route.path}")
+
+    @tasks.loop(seconds=10)
+    async def flush_traces(self):
+        lines = self.tracer.take()
+        if not lines:
+            return
+        try:
+            await asyncio.to_thread(self.tracer.write, lines)
+        except OSError:
+            logger.exception('Could not write %s traces to %s', len(lines), self.tracer.path)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Tracing(bot))
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands, tasks
+import config
+from Utils.storage import data_path
+from Utils.usagestore import UsageStore, parse_window
+
+logger = logging.getLogger('NZDF.usage')
+
+class CommandUsage(commands.Cog):
+    """Records every slash command completion for /stats (see Utils/usagestore.py)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.store = UsageStore(data_path("usage.db"))
+        self.retention_days: float = getattr(config, 'USAGE_RETENTION_DAYS', 90)
+
+    async def cog_load(self):
+        self.flush_usage.start()
+        self.prune_usage.start()
+
+    async def cog_unload(self):
+        self.flush_usage.cancel()
+        self.prune_usage.cancel()
+        await asyncio.to_thread(self.store.flush)
+        self.store.close()
+
+    def record(self, interaction: discord.Interaction, success: bool) -> None:
+        if interaction.type is not discord.InteractionType.application_command:
+            return
+        name = getattr(interaction.command, 'qualified_name', None) or (interaction.data or {}).get('name', 'unknown')  # type: ignore[union-attr]
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        self.store.add(name, interaction.user.id, interaction.channel_id, time.time(), max(0.0, elapsed) * 1000, success)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.record(interaction, success=True)
+
+    @commands.Cog.listener()
+    async def on_app_command_failed(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self.record(interaction, success=False)
+
+    @tasks.loop(seconds=5)
+    async def flush_usage(self):
+        """Write queued usage rows and their rollups in one batch."""
+        if self.store.pending:
+            try:
+                await asyncio.to_thread(self.store.flush)
+            except Exception:
+                logger.exception('Failed to flush command usage batch')
+
+    @tasks.loop(hours=1)
+    async def prune_usage(self):
+        try:
+            await asyncio.to_thread(self.store.prune, self.retention_days)
+        except Exception:
+            logger.exception('Failed to prune command usage')
+
+    @app_commands.command(name="stats", description="[ADMIN] Top commands, top users and error rates over a time window")
+    @app_commands.describe(window="How far back to look, e.g. 90m, 24h, 7d, 2w", ago="End the window this long ago (default: now)")
+    async def stats(self, interaction: discord.Interaction, window: str = "24h", ago: Optional[str] = None):
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        try:
+            length = parse_window(window)
+            offset = parse_window(ago) if ago else 0
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        if self.store.pending:
+            await asyncio.to_thread(self.store.flush)
+        end = time.time() - offset
+        result = await asyncio.to_thread(self.store.stats, end - length, end)
+
+        embed = discord.Embed(
+            title="📊 Command Usage",
+            description=(
+                f"<t:{result.start}:f> → <t:{result.end}:f>\n"
+                f"**{result.uses:,}** commands • **{result.errors:,}** errors ({result.error_rate:.1%})"
+            ),
+            color=discord.Color.blurple()
+        )
+        if result.commands:
+            embed.add_field(
+                name="Top Commands",
+                value="\n".join(
+                    f"`/{name}` — {uses:,} uses, {errors:,} errors ({errors / uses:.0%}), {avg_ms:,.0f} ms avg"
+                    for name, uses, errors, avg_ms in result.commands
+                )[:1024],
+                inline=False
+            )
+            embed.add_field(
+                name="Top Users",
+                value="\n".join(
+                    f"<@{user_id}> — {uses:,} uses" + (f", {errors:,} errors" if errors else "")
+                    for user_id, uses, errors in result.users
+                )[:1024],
+                inline=False
+            )
+        else:
+            embed.add_field(name="No activity", value="No commands were used in this window.", inline=False)
+        embed.set_footer(text=f"Answered from {result.buckets_read} rollup rows (UTC buckets)")
+        await interaction.response.send_message(embed=embed, ephemeral=True, allowed_mentions=discord.AllowedMentions.none())
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(CommandUsage(bot))
+    try:
+        app_cmd = bot.tree.get_command('stats')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
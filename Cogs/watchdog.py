@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands, Permissions
+from discord.ext import commands
+import config
+from Utils.metrics import REGISTRY
+from Utils.outbound import Priority, post
+from Utils.watchdog import LoopStallWatchdog, Stall, format_stack
+
+logger = logging.getLogger('NZDF.watchdog')
+
+class Watchdog(commands.Cog):
+    """Detects event loop stalls and reports the blocking call sites to the log channel."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.watchdog = LoopStallWatchdog(
+            threshold=getattr(config, 'STALL_THRESHOLD_MS', 250) / 1000,
+            on_stall=self._on_stall,
+        )
+        self.watchdog.enabled = getattr(config, 'STALL_DETECTOR_ENABLED', True)
+        self.cooldown: float = getattr(config, 'STALL_REPORT_COOLDOWN_SECONDS', 300)
+        self._last_report = 0.0
+        self._suppressed = 0
+        self._stall_count = REGISTRY.counter("nzdf_loop_stalls_total", "Event loop stalls over the watchdog threshold")
+        self._stall_seconds = REGISTRY.histogram(
+            "nzdf_loop_stall_seconds", "Duration of event loop stalls",
+            buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0))
+
+    async def cog_load(self):
+        self.watchdog.start()
+
+    async def cog_unload(self):
+        self.watchdog.stop()
+
+    async def _on_stall(self, stall: Stall) -> None:
+        self._stall_count.inc()
+        self._stall_seconds.observe(stall.duration)
+        hotspots = stall.hotspots()
+        where = hotspots[0][1][-1] if hotspots and hotspots[0][1] else None
+        logger.warning(
+            'Event loop blocked for %.0fms%s', stall.duration * 1000,
+            f' at {where.filename}:{where.lineno} in {where.name}' if where else ''
+        )
+
+        now = time.monotonic()
+        if now - self._last_report < self.cooldown:
+            self._suppressed += 1
+            return
+        self._last_report = now
+        suppressed, self._suppressed = self._suppressed, 0
+        await self._report(stall, hotspots, suppressed)
+
+    async def _report(self, stall: Stall, hotspots, suppressed: int) -> None:
+        logging_cog = self.bot.get_cog('LoggingSystem')
+        if not logging_cog or not hasattr(logging_cog, 'get_log_channel'):
+            return
+        channel = await logging_cog.get_log_channel()  # type: ignore
+        if not channel:
+            return
+        embed = discord.Embed(
+            title="🐢 Event Loop Stall",
+            description=(
+                f"The event loop was blocked for **{stall.duration * 1000:.0f}ms** starting <t:{int(stall.started_at)}:T>. "
+                "Interactions arriving during a stall can miss their 3 second deadline."
+            ),
+            color=discord.Color.dark_orange(),
+            timestamp=discord.utils.utcnow()
+        )
+        if not hotspots:
+            embed.add_field(name="Blocking Code", value="No stack was captured.", inline=False)
+        for count, stack in hotspots:
+            embed.add_field(
+                name=f"Blocking Code ({count}/{len(stall.samples)} samples)",
+                value=f"```{format_stack(stack)[:1000]}```",
+                inline=False
+            )
+        footer = f"Threshold {self.watchdog.threshold * 1000:.0f}ms • {self.watchdog.stalls} stall(s) since start"
+        if suppressed:
+            footer += f" • {suppressed} more since the last report"
+        embed.set_footer(text=footer)
+        post(self.bot, Priority.LOG, ("channel", channel.id), lambda: channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none()))
+
+    @app_commands.command(name="stallwatch", description="[ADMIN] Show or change the event loop stall detector")
+    @app_commands.describe(action="What to do", threshold_ms="New stall threshold in milliseconds")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Status", value="status"),
+        app_commands.Choice(name="Enable", value="enable"),
+        app_commands.Choice(name="Disable", value="disable"),
+    ])
+    async def stallwatch(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        threshold_ms: Optional[app_commands.Range[int, 50, 10000]] = None
+    ):
+        if interaction.user.id not in config.BOT_ADMINS:
+            await interaction.response.send_message("❌ You don't have permission to use this admin command. Contact an admin.", ephemeral=True)
+            return
+
+        if action.value == "enable":
+            self.watchdog.enabled = True
+        elif action.value == "disable":
+            self.watchdog.enabled = False
+        if threshold_ms is not None:
+            self.watchdog.threshold = threshold_ms / 1000
+
+        embed = discord.Embed(
+            title="🐢 Stall Detector",
+            color=discord.Color.green() if self.watchdog.enabled else discord.Color.dark_grey()
+        )
+        embed.add_field(name="State", value="🟢 Enabled" if self.watchdog.enabled else "⚫ Disabled", inline=True)
+        embed.add_field(name="Threshold", value=f"{self.watchdog.threshold * 1000:.0f}ms", inline=True)
+        embed.add_field(name="Report Cooldown", value=f"{self.cooldown:.0f}s", inline=True)
+        embed.add_field(name="Stalls Seen", value=str(self.watchdog.stalls), inline=True)
+        embed.add_field(name="Worst", value=f"{self.watchdog.worst * 1000:.0f}ms", inline=True)
+        embed.add_field(name="Suppressed Reports", value=str(self._suppressed), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Watchdog(bot))
+    try:
+        app_cmd = bot.tree.get_command('stallwatch')
+        if app_cmd:
+            try:
+                setattr(app_cmd, 'default_member_permissions', Permissions(manage_roles=True))
+            except Exception:
+                pass
+            try:
+                setattr(app_cmd, 'dm_permission', False)
+            except Exception:
+                pass
+    except Exception:
+        pass
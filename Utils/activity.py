@@ -0,0 +1,103 @@
+"""
+Compact last-activity tracker.
+
+Each member is assigned a dense index the first time they are seen; their
+last message and last voice activity are stored as 32-bit Unix timestamps in
+``array`` columns at that index: 16 bytes of array storage per member plus the
+id -> index dict entry, versus a dict object per member in a dict-of-dicts.
+Recording an event is a dict lookup and an array store.
+``python -m Benchmarks.activity_footprint`` measures both layouts.
+
+The arrays are persisted to a small binary file; ``save`` writes to a temp file
+and renames it so a crash mid-write never corrupts the previous snapshot.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import time
+from array import array
+from typing import Iterable, Iterator, Optional
+
+_MAGIC = b"NZAT"
+_HEADER = struct.Struct("<4sII")  # magic, version, count
+_VERSION = 1
+
+
+class ActivityTracker:
+    def __init__(self) -> None:
+        self.index: dict[int, int] = {}
+        self.ids = array("Q")
+        self.last_message = array("I")
+        self.last_voice = array("I")
+        self.started_at = int(time.time())
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _slot(self, member_id: int) -> int:
+        slot = self.index.get(member_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.index[member_id] = slot
+            self.ids.append(member_id)
+            self.last_message.append(0)
+            self.last_voice.append(0)
+        return slot
+
+    def record_message(self, member_id: int, when: Optional[float] = None) -> None:
+        self.last_message[self._slot(member_id)] = int(when or time.time())
+        self.dirty = True
+
+    def record_voice(self, member_id: int, when: Optional[float] = None) -> None:
+        self.last_voice[self._slot(member_id)] = int(when or time.time())
+        self.dirty = True
+
+    def last_active(self, member_id: int) -> int:
+        """Latest activity timestamp for the member, or 0 if never seen."""
+        slot = self.index.get(member_id)
+        if slot is None:
+            return 0
+        return max(self.last_message[slot], self.last_voice[slot])
+
+    def inactive(self, member_ids: Iterable[int], cutoff: float) -> Iterator[tuple[int, int]]:
+        """Yield ``(member_id, last_active)`` for members with no activity since ``cutoff``."""
+        for member_id in member_ids:
+            last = self.last_active(member_id)
+            if last < cutoff:
+                yield member_id, last
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the arrays and the index dict."""
+        import sys
+        arrays = sum(a.itemsize * len(a) for a in (self.ids, self.last_message, self.last_voice))
+        return arrays + sys.getsizeof(self.index)
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self.ids)))
+            f.write(struct.pack("<I", self.started_at))
+            self.ids.tofile(f)
+            self.last_message.tofile(f)
+            self.last_voice.tofile(f)
+        os.replace(tmp, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> "ActivityTracker":
+        tracker = cls()
+        if not os.path.isfile(path):
+            return tracker
+        with open(path, "rb") as f:
+            magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not an activity snapshot")
+            (tracker.started_at,) = struct.unpack("<I", f.read(4))
+            tracker.ids.fromfile(f, count)
+            tracker.last_message.fromfile(f, count)
+            tracker.last_voice.fromfile(f, count)
+        tracker.index = {member_id: i for i, member_id in enumerate(tracker.ids)}
+        return tracker
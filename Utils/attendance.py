@@ -0,0 +1,79 @@
+"""
+Session attendance from voice join/leave intervals.
+
+While a session is online each member's time in the session voice channels
+is kept as a flat ``array('d')`` of ``start, end`` pairs, with at most one
+open interval per member. Totals come from sorting and merging each member's
+intervals, so overlapping or back-to-back intervals (channel hops, a join
+replayed after a reconnect) are only counted once.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from typing import Iterable, Optional
+
+
+def merge_intervals(flat: Iterable[float]) -> list[tuple[float, float]]:
+    """Merge a flat ``start, end, start, end...`` sequence into disjoint intervals."""
+    values = list(flat)
+    pairs = sorted(zip(values[0::2], values[1::2]))
+    merged: list[tuple[float, float]] = []
+    for start, end in pairs:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class SessionAttendance:
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.time() if started_at is None else started_at
+        self.ended_at: Optional[float] = None
+        self._intervals: dict[int, array] = {}
+        self._open: dict[int, float] = {}
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._open or member_id in self._intervals
+
+    @property
+    def present(self) -> int:
+        return len(self._open)
+
+    def join(self, member_id: int, when: Optional[float] = None) -> None:
+        # A second join without a leave keeps the earlier start
+        self._open.setdefault(member_id, time.time() if when is None else when)
+
+    def leave(self, member_id: int, when: Optional[float] = None) -> None:
+        start = self._open.pop(member_id, None)
+        if start is None:
+            return
+        end = time.time() if when is None else when
+        if end > start:
+            self._intervals.setdefault(member_id, array("d")).extend((start, end))
+
+    def close(self, when: Optional[float] = None) -> None:
+        """Close every open interval and mark the session as ended."""
+        self.ended_at = time.time() if when is None else when
+        for member_id in list(self._open):
+            self.leave(member_id, self.ended_at)
+
+    def intervals(self, member_id: int) -> list[tuple[float, float]]:
+        flat = self._intervals.get(member_id, array("d"))
+        return merge_intervals(flat)
+
+    def totals(self) -> dict[int, float]:
+        """Seconds attended per member; open intervals count up to now."""
+        now = time.time()
+        totals: dict[int, float] = {}
+        for member_id in set(self._intervals) | set(self._open):
+            flat = array("d", self._intervals.get(member_id, ()))
+            if member_id in self._open:
+                flat.extend((self._open[member_id], now))
+            seconds = sum(end - start for start, end in merge_intervals(flat))
+            if seconds > 0:
+                totals[member_id] = seconds
+        return totals
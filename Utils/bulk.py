@@ -0,0 +1,89 @@
+"""
+Bounded-concurrency runner for staff bulk actions (bulk discharge, promotions).
+
+Items are processed by at most ``concurrency`` workers. A progress callback is
+invoked at most every ``progress_interval`` seconds (and once at the end) so
+callers can edit a status message without hammering the API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class BulkResult(Generic[T]):
+    total: int
+    succeeded: list[T] = field(default_factory=list)
+    failed: list[tuple[T, str]] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    @property
+    def done(self) -> int:
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.done}/{self.total} processed • ✅ {len(self.succeeded)} • ❌ {len(self.failed)} • "
+            f"{self.elapsed:.1f}s ({self.throughput:.2f}/s)"
+        )
+
+    def report(self, title: str, label: Callable[[T], str] = str, max_failures: int = 10) -> str:
+        """Final multi-line report listing the first ``max_failures`` failures."""
+        lines = [title, self.summary()]
+        for item, error in self.failed[:max_failures]:
+            lines.append(f"• {label(item)}: {error[:100]}")
+        if len(self.failed) > max_failures:
+            lines.append(f"• ...and {len(self.failed) - max_failures} more failure(s)")
+        return "\n".join(lines)
+
+
+async def run_bulk(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[Any]],
+    concurrency: int = 3,
+    progress: Optional[Callable[[BulkResult[T]], Awaitable[None]]] = None,
+    progress_interval: float = 3.0,
+) -> BulkResult[T]:
+    result: BulkResult[T] = BulkResult(total=len(items))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    last_report = 0.0
+
+    async def report(force: bool = False) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if progress and (force or now - last_report >= progress_interval):
+            last_report = now
+            try:
+                await progress(result)
+            except Exception:
+                pass  # Progress updates are best-effort
+
+    async def run_one(item: T) -> None:
+        async with semaphore:
+            try:
+                await worker(item)
+                result.succeeded.append(item)
+            except Exception as e:
+                result.failed.append((item, f"{type(e).__name__}: {e}"))
+        await report()
+
+    await asyncio.gather(*(run_one(item) for item in items))
+    result.finished = time.monotonic()
+    await report(force=True)
+    return result
@@ -0,0 +1,217 @@
+"""
+Registry of approved callsigns.
+
+Approved callsigns are persisted in ``callsigns.db`` and mirrored in memory
+with two indexes:
+
+* an exact-match dict keyed by the normalized callsign, and
+* an inverted trigram index used to find near-duplicates ("Viper1" vs
+  "V1per-1") without comparing against every registered callsign.
+
+Both lookups stay well under a millisecond with thousands of entries, which
+keeps submissions and autocomplete responsive.
+
+Pending approval requests are stored in the same database so their buttons
+survive a restart.
+"""
+
+from __future__ import annotations
+
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from Utils.storage import SQLiteStore
+
+# Characters commonly swapped in to dodge a duplicate check
+_CONFUSABLES = str.maketrans({"0": "o", "1": "i", "l": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "@": "a", "$": "s"})
+
+
+def normalize(callsign: str) -> str:
+    """Exact-match key: NFKC, casefolded, alphanumerics only."""
+    text = unicodedata.normalize("NFKC", callsign).casefold()
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def _skeleton(callsign: str) -> str:
+    """Looser key for similarity: normalized with look-alike characters folded."""
+    return normalize(callsign).translate(_CONFUSABLES)
+
+
+def trigrams(callsign: str) -> set[str]:
+    padded = f"  {_skeleton(callsign)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class CallsignEntry:
+    key: str
+    display: str
+    user_id: int
+    approved_by: Optional[int]
+    approved_at: int
+
+
+class CallsignRegistry(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS callsigns (
+        key TEXT PRIMARY KEY,
+        display TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        approved_by INTEGER,
+        approved_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_callsigns_user ON callsigns (user_id);
+    CREATE TABLE IF NOT EXISTS pending_requests (
+        message_id INTEGER PRIMARY KEY,
+        channel_id INTEGER NOT NULL,
+        requestor_id INTEGER NOT NULL,
+        callsign TEXT NOT NULL,
+        approved INTEGER,
+        switch_count INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._by_key: dict[str, CallsignEntry] = {}
+        self._by_user: dict[int, str] = {}
+        self._grams: dict[str, set[str]] = {}
+        for row in self.execute("SELECT * FROM callsigns"):
+            self._index(CallsignEntry(row["key"], row["display"], row["user_id"], row["approved_by"], row["approved_at"]))
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def _index(self, entry: CallsignEntry) -> None:
+        self._by_key[entry.key] = entry
+        self._by_user[entry.user_id] = entry.key
+        for gram in trigrams(entry.display):
+            self._grams.setdefault(gram, set()).add(entry.key)
+
+    def _unindex(self, key: str) -> Optional[CallsignEntry]:
+        entry = self._by_key.pop(key, None)
+        if not entry:
+            return None
+        if self._by_user.get(entry.user_id) == key:
+            del self._by_user[entry.user_id]
+        for gram in trigrams(entry.display):
+            keys = self._grams.get(gram)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+        return entry
+
+    def get(self, callsign: str) -> Optional[CallsignEntry]:
+        return self._by_key.get(normalize(callsign))
+
+    def for_user(self, user_id: int) -> Optional[CallsignEntry]:
+        key = self._by_user.get(user_id)
+        return self._by_key.get(key) if key else None
+
+    def is_free(self, callsign: str, user_id: Optional[int] = None) -> bool:
+        entry = self.get(callsign)
+        return entry is None or entry.user_id == user_id
+
+    def similar(self, callsign: str, threshold: float = 0.5, limit: int = 5) -> list[tuple[CallsignEntry, float]]:
+        """Registered callsigns whose trigram Dice similarity is at least ``threshold``."""
+        grams = trigrams(callsign)
+        if not grams:
+            return []
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            for key in self._grams.get(gram, ()):
+                shared[key] += 1
+        results = []
+        for key, overlap in shared.items():
+            entry = self._by_key[key]
+            score = 2 * overlap / (len(grams) + len(trigrams(entry.display)))
+            if score >= threshold:
+                results.append((entry, score))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
+
+    def conflicts(self, callsign: str, user_id: Optional[int] = None, threshold: float = 0.5) -> tuple[Optional[CallsignEntry], list[tuple[CallsignEntry, float]]]:
+        """Return ``(exact_match, near_matches)`` held by members other than ``user_id``."""
+        exact = self.get(callsign)
+        if exact and exact.user_id == user_id:
+            exact = None
+        near = [
+            (entry, score) for entry, score in self.similar(callsign, threshold)
+            if entry.user_id != user_id and (exact is None or entry.key != exact.key)
+        ]
+        return exact, near
+
+    def suggest(self, text: str, user_id: Optional[int] = None, limit: int = 10) -> list[str]:
+        """Suggest free callsigns close to ``text`` for autocomplete."""
+        base = text.strip()
+        if not base:
+            return []
+        suggestions: list[str] = []
+        if self.is_free(base, user_id):
+            suggestions.append(base)
+        stem = base.rstrip("0123456789- ") or base
+        n = 1
+        while len(suggestions) < limit and n <= 99:
+            candidate = f"{stem}-{n}"
+            if len(candidate) <= 32 and self.is_free(candidate, user_id):
+                suggestions.append(candidate)
+            n += 1
+        return suggestions[:limit]
+
+    def register(self, callsign: str, user_id: int, approved_by: Optional[int] = None) -> CallsignEntry:
+        """Assign ``callsign`` to ``user_id``, releasing any callsign they held before.
+
+        Raises ``ValueError`` if the callsign has no letters or digits, since
+        every such callsign would share the same empty key.
+        """
+        key = normalize(callsign)
+        if not key:
+            raise ValueError("A callsign needs at least one letter or number.")
+        entry = CallsignEntry(key, callsign, user_id, approved_by, int(time.time()))
+        previous = self._by_user.get(user_id)
+        if previous:
+            self._unindex(previous)
+        self._unindex(entry.key)
+        self._index(entry)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM callsigns WHERE user_id = ? OR key = ?", (user_id, entry.key))
+                self._conn.execute(
+                    "INSERT INTO callsigns (key, display, user_id, approved_by, approved_at) VALUES (?, ?, ?, ?, ?)",
+                    (entry.key, entry.display, entry.user_id, entry.approved_by, entry.approved_at),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return entry
+
+    def release(self, callsign: str, user_id: Optional[int] = None) -> bool:
+        """Free ``callsign``; when ``user_id`` is given only if that member holds it."""
+        entry = self.get(callsign)
+        if not entry or (user_id is not None and entry.user_id != user_id):
+            return False
+        self._unindex(entry.key)
+        self.execute("DELETE FROM callsigns WHERE key = ?", (entry.key,))
+        return True
+
+    def save_pending(self, message_id: int, channel_id: int, requestor_id: int, callsign: str,
+                     approved: Optional[bool], switch_count: int, created_at: float) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO pending_requests (message_id, channel_id, requestor_id, callsign, approved, "
+            "switch_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (message_id, channel_id, requestor_id, callsign,
+             None if approved is None else int(approved), switch_count, created_at),
+        )
+
+    def delete_pending(self, message_id: int) -> None:
+        self.execute("DELETE FROM pending_requests WHERE message_id = ?", (message_id,))
+
+    def load_pending(self) -> list:
+        return self.execute("SELECT * FROM pending_requests ORDER BY created_at")
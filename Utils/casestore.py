@@ -0,0 +1,182 @@
+"""
+Persistent, indexed case log store used by the Moderation cog.
+
+Cases are written in batches (``add`` only queues a row, ``flush`` commits the
+queue in one transaction) and indexed by user, moderator and time. When the
+SQLite build ships FTS5, punishment and reason are also full-text indexed.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+
+from Utils.storage import SQLiteStore
+
+CASELOG_TITLE = "⚖️ Case Log"
+_DESCRIPTION_RE = re.compile(
+    r"\*\*User:\*\* <@!?(?P<user>\d+)>\n\*\*Punishment:\*\* (?P<punishment>.*?)\n\*\*Reason:\*\* (?P<reason>.*)",
+    re.DOTALL,
+)
+_FOOTER_PREFIX = "Case logged by "
+
+
+@dataclass
+class CaseRecord:
+    message_id: int
+    channel_id: int
+    guild_id: Optional[int]
+    user_id: int
+    moderator_id: Optional[int]
+    moderator_name: str
+    punishment: str
+    reason: str
+    created_at: int
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> Optional["CaseRecord"]:
+        """Parse a case log embed previously posted by the bot, or return None."""
+        if not message.embeds:
+            return None
+        embed = message.embeds[0]
+        if embed.title != CASELOG_TITLE or not embed.description:
+            return None
+        match = _DESCRIPTION_RE.match(embed.description)
+        if not match:
+            return None
+        footer = embed.footer.text or ""
+        moderator_name = footer[len(_FOOTER_PREFIX):] if footer.startswith(_FOOTER_PREFIX) else ""
+        return cls(
+            message_id=message.id,
+            channel_id=message.channel.id,
+            guild_id=message.guild.id if message.guild else None,
+            user_id=int(match.group("user")),
+            moderator_id=None,  # Old embeds only carry the moderator's display name
+            moderator_name=moderator_name,
+            punishment=match.group("punishment"),
+            reason=match.group("reason"),
+            created_at=int(message.created_at.timestamp()),
+        )
+
+
+class CaseStore(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cases (
+        id INTEGER PRIMARY KEY,
+        message_id INTEGER UNIQUE,
+        channel_id INTEGER,
+        guild_id INTEGER,
+        user_id INTEGER NOT NULL,
+        moderator_id INTEGER,
+        moderator_name TEXT NOT NULL DEFAULT '',
+        punishment TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_cases_user ON cases (user_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_cases_moderator ON cases (moderator_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_cases_moderator_name ON cases (moderator_name, created_at);
+    CREATE INDEX IF NOT EXISTS idx_cases_created ON cases (created_at);
+    """
+
+    FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5 (
+        punishment, reason, content='cases', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS cases_ai AFTER INSERT ON cases BEGIN
+        INSERT INTO cases_fts (rowid, punishment, reason) VALUES (new.id, new.punishment, new.reason);
+    END;
+    CREATE TRIGGER IF NOT EXISTS cases_ad AFTER DELETE ON cases BEGIN
+        INSERT INTO cases_fts (cases_fts, rowid, punishment, reason) VALUES ('delete', old.id, old.punishment, old.reason);
+    END;
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pending: list[CaseRecord] = []
+        self._pending_lock = threading.Lock()
+        try:
+            self._conn.executescript(self.FTS_SCHEMA)
+            self.has_fts = True
+        except Exception:
+            # SQLite built without FTS5; fall back to LIKE matching
+            self.has_fts = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, record: CaseRecord) -> None:
+        """Queue a case for the next batched write."""
+        with self._pending_lock:
+            self._pending.append(record)
+
+    def flush(self) -> int:
+        """Write all queued cases in one transaction. Returns the number written."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            self.executemany(
+                "INSERT OR IGNORE INTO cases (message_id, channel_id, guild_id, user_id, moderator_id, "
+                "moderator_name, punishment, reason, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r.message_id, r.channel_id, r.guild_id, r.user_id, r.moderator_id,
+                     r.moderator_name, r.punishment, r.reason, r.created_at)
+                    for r in batch
+                ],
+            )
+        except Exception:
+            # Put the batch back so the next flush retries it
+            with self._pending_lock:
+                self._pending[:0] = batch
+            raise
+        return len(batch)
+
+    def search(
+        self,
+        user_id: Optional[int] = None,
+        moderator_id: Optional[int] = None,
+        text: Optional[str] = None,
+        limit: int = 10,
+        moderator_names: tuple[str, ...] = (),
+    ) -> tuple[int, list]:
+        """Return ``(total_matches, newest_rows)`` for the given filters.
+
+        Backfilled cases whose moderator couldn't be resolved to an id are
+        matched on ``moderator_names`` instead.
+        """
+        where: list[str] = []
+        params: list = []
+        if user_id is not None:
+            where.append("c.user_id = ?")
+            params.append(user_id)
+        if moderator_id is not None:
+            names = [n for n in dict.fromkeys(moderator_names) if n]
+            if names:
+                where.append(f"(c.moderator_id = ? OR (c.moderator_id IS NULL AND c.moderator_name IN ({', '.join('?' * len(names))})))")
+                params.extend([moderator_id, *names])
+            else:
+                where.append("c.moderator_id = ?")
+                params.append(moderator_id)
+        if text:
+            if self.has_fts:
+                # Quote every term so user input can't inject FTS syntax
+                terms = " ".join('"{}"'.format(t.replace('"', '""')) for t in text.split())
+                where.append("c.id IN (SELECT rowid FROM cases_fts WHERE cases_fts MATCH ?)")
+                params.append(terms)
+            else:
+                where.append("(c.punishment LIKE ? OR c.reason LIKE ?)")
+                params.extend([f"%{text}%", f"%{text}%"])
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        total = self.execute(f"SELECT COUNT(*) AS n FROM cases c {clause}", params)[0]["n"]
+        rows = self.execute(
+            f"SELECT c.* FROM cases c {clause} ORDER BY c.created_at DESC LIMIT ?",
+            [*params, limit],
+        )
+        return total, rows
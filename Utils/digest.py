@@ -0,0 +1,70 @@
+"""
+In-memory aggregation of routine command usage for the log channel digest.
+
+``CommandDigest`` counts uses per command, per user and per channel for the
+current period (an hour or a day, aligned to the clock in ``tz``). ``take``
+returns the finished period and starts the next. Adding a use is a few
+counter increments, so one digest embed per period replaces one embed per
+command.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional
+
+PERIODS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+
+
+@dataclass
+class DigestPeriod:
+    start: float
+    end: float
+    commands: Counter = field(default_factory=Counter)
+    users: Counter = field(default_factory=Counter)
+    channels: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.commands.values())
+
+
+class CommandDigest:
+    def __init__(self, period: str, tz: tzinfo = timezone.utc, now: Optional[float] = None):
+        if period not in PERIODS:
+            raise ValueError(f"Unknown digest period {period!r}; use one of {', '.join(PERIODS)}")
+        self.period = period
+        self.tz = tz
+        self.current = self._open(time.time() if now is None else now)
+
+    def _open(self, now: float) -> DigestPeriod:
+        local = datetime.fromtimestamp(now, self.tz)
+        if self.period == "daily":
+            start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        else:
+            start = local.replace(minute=0, second=0, microsecond=0)
+        # Step in wall-clock time so a daily period still ends at local midnight across DST
+        end = (start.replace(tzinfo=None) + PERIODS[self.period]).replace(tzinfo=self.tz)
+        return DigestPeriod(start=start.timestamp(), end=end.timestamp())
+
+    @property
+    def pending(self) -> int:
+        return self.current.total
+
+    def add(self, command: str, user_id: int, channel_id: Optional[int]) -> None:
+        self.current.commands[command] += 1
+        self.current.users[user_id] += 1
+        if channel_id is not None:
+            self.current.channels[channel_id] += 1
+
+    def due(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) >= self.current.end
+
+    def take(self, now: Optional[float] = None) -> DigestPeriod:
+        """Close the current period and open the one containing ``now``."""
+        finished = self.current
+        self.current = self._open(time.time() if now is None else now)
+        return finished
@@ -0,0 +1,98 @@
+"""
+In-memory prefix/fuzzy index for autocomplete.
+
+Built once per catalog version; every lookup is answered from precomputed
+maps, ranked as:
+
+1. names starting with the query,
+2. names with a word starting with the query,
+3. names sharing enough trigrams with the query (typos, abbreviations).
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from typing import Iterable, Optional
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    def __init__(self, names: Iterable[str], max_prefix: int = 12):
+        self.names: list[str] = sorted(dict.fromkeys(names), key=str.casefold)
+        self._folded = [name.casefold() for name in self.names]  # sorted, for bisect
+        self._exact = {folded: name for folded, name in zip(self._folded, self.names)}
+        self.max_prefix = max_prefix
+        self._word_prefixes: dict[str, list[int]] = {}
+        self._grams: dict[str, list[int]] = {}
+        self._gram_counts: list[int] = []
+        for i, folded in enumerate(self._folded):
+            seen: set[str] = set()
+            for word in folded.split():
+                for n in range(1, min(len(word), max_prefix) + 1):
+                    seen.add(word[:n])
+            for prefix in seen:
+                self._word_prefixes.setdefault(prefix, []).append(i)
+            grams = _trigrams(folded)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.casefold() in self._exact
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical catalog spelling for ``name`` (case-insensitive), or None."""
+        return self._exact.get(name.strip().casefold())
+
+    def search(self, query: str, limit: int = 25, threshold: float = 0.5) -> list[str]:
+        query = query.strip().casefold()
+        if not query:
+            return self.names[:limit]
+
+        results: list[int] = []
+        seen: set[int] = set()
+
+        def take(indices: Iterable[int]) -> bool:
+            for i in indices:
+                if i not in seen:
+                    seen.add(i)
+                    results.append(i)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        # Names are sorted, so full-name prefix matches are one contiguous run
+        start = bisect.bisect_left(self._folded, query)
+        end = bisect.bisect_left(self._folded, query + "\uffff", lo=start)
+        if take(range(start, end)):
+            return [self.names[i] for i in results]
+        words = query.split()
+        if words and len(words[-1]) <= self.max_prefix:
+            # Every query word must prefix some word of the name
+            candidates = None
+            for word in words:
+                hits = set(self._word_prefixes.get(word[:self.max_prefix], ()))
+                candidates = hits if candidates is None else candidates & hits
+            if candidates and take(sorted(candidates)):
+                return [self.names[i] for i in results]
+
+        grams = _trigrams(query)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                shared[i] += 1
+        # Score by how much of the query appears in the name, so short queries still match long names
+        scored = sorted(
+            ((overlap / len(grams), -self._gram_counts[i], i) for i, overlap in shared.items()),
+            reverse=True,
+        )
+        take(i for score, _, i in scored if score >= threshold)
+        return [self.names[i] for i in results]
@@ -0,0 +1,135 @@
+"""
+Record raw gateway dispatch events to a gzip-compressed JSONL file.
+
+``GatewayRecorder`` wraps entries in ``ConnectionState.parsers``, the table
+the websocket uses to route each DISPATCH. So it sees the exact payload
+discord.py is about to parse, at no cost to events it isn't recording. Lines
+are buffered and written off the loop by the owner (``take``/``write``), in
+the same way as ``Utils.tracing.Tracer``.
+
+File layout: the first line is a header, then one event per line::
+
+    {"version": 1, "recorded_at": 1700000000.0, "guild_ids": [...], "bot_user_id": 123}
+    {"t": 0.0132, "event": "INTERACTION_CREATE", "d": {...}}
+
+``t`` is seconds since recording started. Interaction tokens are redacted;
+everything else (including member data) is kept as received, so keep
+recordings private.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+FORMAT_VERSION = 1
+
+RECORDED_EVENTS = (
+    "INTERACTION_CREATE",
+    "GUILD_MEMBER_ADD",
+    "GUILD_MEMBER_REMOVE",
+    "GUILD_MEMBER_UPDATE",
+    "VOICE_STATE_UPDATE",
+    "MESSAGE_CREATE",
+)
+
+
+def _scrub(event: str, data: dict[str, Any]) -> dict[str, Any]:
+    if event == "INTERACTION_CREATE" and "token" in data:
+        data = dict(data, token="redacted")
+    return data
+
+
+class GatewayRecorder:
+    def __init__(self, parsers: dict[str, Callable[[Any], None]], path: str,
+                 events: Iterable[str] = RECORDED_EVENTS, max_events: int = 250_000):
+        self.parsers = parsers
+        self.path = path
+        self.events = tuple(events)
+        self.max_events = max_events
+        self.recorded = 0
+        self.started_at: Optional[float] = None
+        self._t0 = 0.0
+        self._originals: dict[str, Callable[[Any], None]] = {}
+        self._pending: list[str] = []
+
+    @property
+    def active(self) -> bool:
+        return bool(self._originals)
+
+    def start(self, header: Optional[dict[str, Any]] = None) -> None:
+        if self.active:
+            return
+        self.started_at = time.time()
+        self._t0 = time.monotonic()
+        self.recorded = 0
+        self._pending.append(json.dumps(dict(header or {}, version=FORMAT_VERSION, recorded_at=self.started_at)))
+        for event in self.events:
+            original = self.parsers.get(event)
+            if original is not None:
+                self._originals[event] = original
+                self.parsers[event] = self._wrap(event, original)
+
+    def stop(self) -> None:
+        for event, original in self._originals.items():
+            self.parsers[event] = original
+        self._originals.clear()
+
+    def _wrap(self, event: str, original: Callable[[Any], None]) -> Callable[[Any], None]:
+        def parse(data: Any) -> None:
+            if self.recorded < self.max_events:
+                self.recorded += 1
+                self._pending.append(json.dumps(
+                    {"t": round(time.monotonic() - self._t0, 4), "event": event, "d": _scrub(event, data)},
+                    separators=(",", ":"),
+                ))
+            original(data)
+
+        return parse
+
+    def take(self) -> list[str]:
+        lines, self._pending = self._pending, []
+        return lines
+
+    def write(self, lines: list[str]) -> None:
+        """Append lines (from a worker thread). Each call adds a gzip member; readers see one stream."""
+        if not lines:
+            return
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def write_recording(path: str, events: Iterable[dict[str, Any]], header: Optional[dict[str, Any]] = None) -> int:
+    """Write a complete recording in one go (used for synthesized scenarios)."""
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(dict(header or {}, version=FORMAT_VERSION, recorded_at=time.time())) + "\n")
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def read_recording(path: str) -> tuple[dict[str, Any], Iterator[dict[str, Any]]]:
+    """Return the header and an iterator over events, in recorded order."""
+    f = gzip.open(path, "rt", encoding="utf-8")
+    first = f.readline()
+    header = json.loads(first) if first.strip() else {}
+    if header.get("version") != FORMAT_VERSION:
+        f.close()
+        raise ValueError(f"Unsupported recording version {header.get('version')!r} in {path}")
+
+    def events() -> Iterator[dict[str, Any]]:
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                # A restarted recording appends a new header; keep only events
+                if "event" in record:
+                    yield record
+
+    return header, events()
@@ -0,0 +1,160 @@
+"""
+Queue-based structured logging.
+
+``setup_logging`` replaces the root logger's handlers with one
+``QueueHandler``. A ``QueueListener`` thread does all formatting and disk
+writes: JSON lines to a size-rotated file (``LOG_FILE`` in ``DATA_DIR``),
+plus a readable line on the console. Logging from the event loop costs a
+record copy and a queue put.
+
+Each line in the file is one JSON object::
+
+    {"ts": "2024-05-01T12:00:00.123+00:00", "level": "INFO", "logger": "NZDF.session", "msg": "...", "module": "session", "line": 42}
+
+Fields passed with ``extra=`` become top-level keys, and tracebacks go in
+``exc``. Loggers keep their own levels, so one module can be turned up to
+DEBUG at runtime (``set_level``, ``/loglevel``) without flooding the rest.
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional
+
+import config
+from Utils.storage import data_path
+
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.threadName != "MainThread":
+            entry["thread"] = record.threadName
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _LoopQueueHandler(QueueHandler):
+    """Hands records to the listener thread with as little work as possible on the caller's thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The message is rendered now because args may be objects the loop keeps mutating;
+        # tracebacks and JSON are left to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """Route all logging through a background listener; safe to call more than once."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    file_handler = RotatingFileHandler(
+        data_path(getattr(config, 'LOG_FILE', 'bot.log.jsonl')),
+        maxBytes=getattr(config, 'LOG_MAX_BYTES', 10_000_000),
+        backupCount=getattr(config, 'LOG_BACKUPS', 5),
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter())
+    handlers: list[logging.Handler] = [file_handler]
+    if getattr(config, 'LOG_CONSOLE', True):
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console)
+
+    root = logging.getLogger()
+    # Handlers installed before this point keep working, just off the loop
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handlers.append(handler)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = _LoopQueueHandler(records)
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(config, 'LOG_LEVEL', 'INFO'))
+    for name, level in (getattr(config, 'LOG_LEVELS', None) or {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and close the sinks."""
+    global _listener, _queue_handler
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def attach(handler: logging.Handler) -> None:
+    """Add a sink. It runs on the listener thread once logging is set up, on the caller's otherwise."""
+    if _listener is not None:
+        _listener.handlers = (*_listener.handlers, handler)
+    else:
+        logging.getLogger().addHandler(handler)
+
+
+def detach(handler: logging.Handler) -> None:
+    if _listener is not None:
+        _listener.handlers = tuple(h for h in _listener.handlers if h is not handler)
+    logging.getLogger().removeHandler(handler)
+
+
+def set_level(name: str, level: Optional[str]) -> None:
+    """Set a logger's level; ``None`` clears it so the logger follows its parent again."""
+    logging.getLogger(name).setLevel(level or logging.NOTSET)
+
+
+def level_overrides() -> dict[str, str]:
+    """Loggers with their own level, by name (the root logger is listed as ``root``)."""
+    overrides = {"root": logging.getLevelName(logging.getLogger().level)}
+    for name, logger in sorted(logging.root.manager.loggerDict.items()):
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET:
+            overrides[name] = logging.getLevelName(logger.level)
+    return overrides
+
+
+def known_loggers() -> list[str]:
+    return sorted(name for name, logger in logging.root.manager.loggerDict.items() if isinstance(logger, logging.Logger))
@@ -0,0 +1,164 @@
+"""
+Medal ledger: every medal request and its decision, plus award aggregates.
+
+Requests and decisions live in ``medals.db``. Award counts per member and per
+medal are kept in aggregate tables that are updated in the same transaction
+as each decision, and mirrored in memory together with a sorted leaderboard,
+so ``/medals`` and ``/medalboard`` never scan the request history.
+
+The catalog of requestable medals is stored here too, so staff can edit it
+without a command re-sync. Every entry in ``config.AVAILABLE_MEDALS`` is
+added on each startup and medals added with ``/medalcatalog`` are kept, so
+edits to the config take effect on the next restart. A config medal removed
+with ``/medalcatalog`` comes back unless it is also removed from the config.
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from Utils.storage import SQLiteStore
+
+PENDING = "pending"
+APPROVED = "approved"
+DENIED = "denied"
+
+
+class MedalLedger(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS medal_requests (
+        id INTEGER PRIMARY KEY,
+        message_id INTEGER UNIQUE NOT NULL,
+        channel_id INTEGER NOT NULL,
+        member_id INTEGER NOT NULL,
+        medal TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        requested_at INTEGER NOT NULL,
+        decided_by INTEGER,
+        decided_at INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_medal_requests_member ON medal_requests (member_id, status);
+    CREATE INDEX IF NOT EXISTS idx_medal_requests_medal ON medal_requests (medal, status);
+    CREATE TABLE IF NOT EXISTS medal_awards (
+        member_id INTEGER NOT NULL,
+        medal TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (member_id, medal)
+    );
+    CREATE TABLE IF NOT EXISTS medal_catalog (
+        name TEXT PRIMARY KEY COLLATE NOCASE
+    );
+    """
+
+    def __init__(self, path: str, default_catalog: Iterable[str] = ()):
+        super().__init__(path)
+        self.config_catalog = {name.casefold() for name in default_catalog}
+        self.executemany("INSERT OR IGNORE INTO medal_catalog (name) VALUES (?)", [(name,) for name in default_catalog])
+        self._awards: dict[int, Counter[str]] = {}
+        self._totals: dict[int, int] = {}
+        self._medal_totals: Counter[str] = Counter()
+        # Ascending list of (-total, member_id): the leaderboard is a prefix slice
+        self._board: list[tuple[int, int]] = []
+        for row in self.execute("SELECT member_id, medal, count FROM medal_awards WHERE count > 0"):
+            self._awards.setdefault(row["member_id"], Counter())[row["medal"]] = row["count"]
+            self._totals[row["member_id"]] = self._totals.get(row["member_id"], 0) + row["count"]
+            self._medal_totals[row["medal"]] += row["count"]
+        self._board = sorted((-total, member_id) for member_id, total in self._totals.items())
+
+    def record_request(self, message_id: int, channel_id: int, member_id: int, medal: str) -> None:
+        self.execute(
+            "INSERT OR IGNORE INTO medal_requests (message_id, channel_id, member_id, medal, requested_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (message_id, channel_id, member_id, medal, int(time.time())),
+        )
+
+    def get_request(self, message_id: int):
+        rows = self.execute("SELECT * FROM medal_requests WHERE message_id = ?", (message_id,))
+        return rows[0] if rows else None
+
+    def decide(self, message_id: int, approved: bool, decided_by: int):
+        """Record a decision and update the award aggregates. Returns the updated row or None."""
+        status = APPROVED if approved else DENIED
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM medal_requests WHERE message_id = ?", (message_id,)).fetchone()
+            if row is None or row["status"] == status:
+                return row
+            delta = 1 if approved else (-1 if row["status"] == APPROVED else 0)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "UPDATE medal_requests SET status = ?, decided_by = ?, decided_at = ? WHERE message_id = ?",
+                    (status, decided_by, int(time.time()), message_id),
+                )
+                if delta:
+                    self._conn.execute(
+                        "INSERT INTO medal_awards (member_id, medal, count) VALUES (?, ?, ?) "
+                        "ON CONFLICT (member_id, medal) DO UPDATE SET count = count + excluded.count",
+                        (row["member_id"], row["medal"], delta),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            updated = self._conn.execute("SELECT * FROM medal_requests WHERE message_id = ?", (message_id,)).fetchone()
+        if delta:
+            self._apply(row["member_id"], row["medal"], delta)
+        return updated
+
+    def _apply(self, member_id: int, medal: str, delta: int) -> None:
+        old_total = self._totals.get(member_id, 0)
+        if old_total:
+            index = bisect.bisect_left(self._board, (-old_total, member_id))
+            if index < len(self._board) and self._board[index] == (-old_total, member_id):
+                self._board.pop(index)
+        new_total = old_total + delta
+        awards = self._awards.setdefault(member_id, Counter())
+        awards[medal] += delta
+        if awards[medal] <= 0:
+            del awards[medal]
+        self._medal_totals[medal] += delta
+        if self._medal_totals[medal] <= 0:
+            del self._medal_totals[medal]
+        if new_total > 0:
+            self._totals[member_id] = new_total
+            bisect.insort(self._board, (-new_total, member_id))
+        else:
+            self._totals.pop(member_id, None)
+            self._awards.pop(member_id, None)
+
+    def medals_for(self, member_id: int) -> Counter[str]:
+        return self._awards.get(member_id, Counter())
+
+    def total_for(self, member_id: int) -> int:
+        return self._totals.get(member_id, 0)
+
+    def rank_of(self, member_id: int) -> Optional[int]:
+        total = self._totals.get(member_id)
+        if not total:
+            return None
+        # Members tied on total share a rank
+        return bisect.bisect_left(self._board, (-total, 0)) + 1
+
+    def leaderboard(self, limit: int = 10) -> list[tuple[int, int]]:
+        """Top ``limit`` ``(member_id, total)`` pairs."""
+        return [(member_id, -neg) for neg, member_id in self._board[:limit]]
+
+    def medal_totals(self) -> Counter[str]:
+        return self._medal_totals
+
+    def catalog(self) -> list[str]:
+        return [row["name"] for row in self.execute("SELECT name FROM medal_catalog ORDER BY name")]
+
+    def add_medal(self, name: str) -> bool:
+        before = self.execute("SELECT COUNT(*) AS n FROM medal_catalog")[0]["n"]
+        self.execute("INSERT OR IGNORE INTO medal_catalog (name) VALUES (?)", (name,))
+        return self.execute("SELECT COUNT(*) AS n FROM medal_catalog")[0]["n"] > before
+
+    def remove_medal(self, name: str) -> bool:
+        if not self.execute("SELECT 1 FROM medal_catalog WHERE name = ?", (name,)):
+            return False
+        self.execute("DELETE FROM medal_catalog WHERE name = ?", (name,))
+        return True
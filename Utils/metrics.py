@@ -0,0 +1,193 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+
+Recording is a dict update keyed by a tuple of label values (plus a bisect for
+histograms), so it is cheap enough to call on every interaction and REST
+request. Values that are already tracked elsewhere (queue depths, gateway
+latency) are read through callbacks at scrape time instead of being pushed.
+
+Metrics live in the module-level ``REGISTRY`` so any module can record without
+looking up a cog; ``Cogs/metrics.py`` serves it over HTTP.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+from typing import Callable, Iterable, Optional, Sequence
+
+import discord
+
+logger = logging.getLogger('NZDF.metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Samples = Iterable[tuple[Sequence[str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A gauge that is either set directly or read from ``callback`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 callback: Optional[Callable[[], Samples]] = None):
+        super().__init__(name, help, labels)
+        self.values: dict[tuple, float] = {}
+        self.callback = callback
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        samples: Samples = self.values.items()
+        if self.callback is not None:
+            try:
+                samples = list(self.callback())
+            except Exception:
+                logger.exception('Metric callback for %s failed', self.name)
+                samples = []
+        for labels, value in samples:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self.counts: dict[tuple, list[int]] = {}
+        self.sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(self.sums[labels])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Reloading a cog re-registers its metrics; keep the old values
+            if type(existing) is type(metric):
+                if isinstance(metric, Gauge):
+                    existing.callback = metric.callback  # type: ignore[attr-defined]
+                return existing
+            raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (),
+              callback: Optional[Callable[[], Samples]] = None) -> Gauge:
+        return self._register(Gauge(name, help, labels, callback))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "nzdf_cache_lookups_total", "Lookups answered from the discord.py cache (hit) or not (miss)", ("cache", "result")
+)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Count a hit or miss for one of the bot's cache lookups."""
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def interaction_label(interaction: discord.Interaction) -> str:
+    """Low-cardinality label for an interaction: the command name, or its kind for everything else."""
+    if interaction.type == discord.InteractionType.application_command:
+        return (interaction.data or {}).get('name', 'unknown')  # type: ignore[union-attr]
+    if interaction.type == discord.InteractionType.autocomplete:
+        return "autocomplete"
+    if interaction.type == discord.InteractionType.modal_submit:
+        return "modal"
+    return "component"
@@ -0,0 +1,300 @@
+"""
+Shared outbound REST scheduler.
+
+Cogs hand their channel sends and edits to the ``Outbound`` cog instead of
+calling discord.py directly. Work is queued per rate-limit bucket (usually a
+channel or guild) and drained in priority order:
+
+    INTERACTION > ANNOUNCEMENT > LOG > WELCOME
+
+Buckets drain in parallel, but at most ``max_inflight`` calls run at once
+across all of them. When more are ready, the free slot goes to the most
+important job in any bucket. A burst of log embeds in the log channel
+therefore waits behind a command's channel post elsewhere.
+
+``INTERACTION`` is for channel sends made on behalf of a command, such as
+the /caselog embed. Interaction responses and followups go straight to the
+interaction webhook and are not scheduled.
+
+Queues are bounded. When a bucket is full, LOG and WELCOME work is shed
+(the job resolves to ``None``) while higher classes are always accepted.
+
+Usage from a cog::
+
+    from Utils.outbound import Priority, send, post
+
+    message = await send(self.bot, Priority.INTERACTION, ("channel", ch.id), lambda: ch.send(embed=e))
+    post(self.bot, Priority.LOG, ("channel", log.id), lambda: log.send(embed=e))
+
+A factory is called again when a 429 is retried, so it must build anything
+single-use, such as a ``discord.File``, inside the lambda rather than close
+over one.
+
+If the Outbound cog isn't loaded, both helpers fall back to running the call
+directly so nothing depends on load order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+import discord
+
+logger = logging.getLogger('NZDF.outbound')
+
+Factory = Callable[[], Awaitable[Any]]
+
+
+class Priority(IntEnum):
+    INTERACTION = 0
+    ANNOUNCEMENT = 1
+    LOG = 2
+    WELCOME = 3
+
+
+SHEDDABLE = frozenset({Priority.LOG, Priority.WELCOME})
+
+
+@dataclass
+class ClassMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    shed: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record_wait(self, waited: float) -> None:
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+
+    @property
+    def wait_avg(self) -> float:
+        done = self.completed + self.failed
+        return self.wait_total / done if done else 0.0
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    enqueued: float = field(compare=False)
+    factory: Factory = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    # The submitter's contextvars (trace span, metrics route); the bucket's worker was started by someone else
+    context: contextvars.Context = field(compare=False)
+
+
+class _PriorityGate:
+    """Caps concurrent calls across buckets, handing each free slot to the most important waiter."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: int, seq: int) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, seq, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Cancelled after the slot was handed over: pass it on
+            if not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # The slot moves straight to the waiter
+                return
+        self.active -= 1
+
+
+class OutboundScheduler:
+    def __init__(self, max_bucket_depth: int = 50, max_total: int = 1000, max_attempts: int = 3, max_inflight: int = 8):
+        self.max_bucket_depth = max_bucket_depth
+        self.max_total = max_total
+        self.max_attempts = max_attempts
+        self._gate = _PriorityGate(max_inflight)
+        self._buckets: dict[Hashable, list[_Job]] = {}
+        self._workers: dict[Hashable, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._total = 0
+        self.rate_limited = 0
+        self.metrics: dict[Priority, ClassMetrics] = {p: ClassMetrics() for p in Priority}
+
+    @property
+    def depth(self) -> int:
+        return self._total
+
+    @property
+    def inflight(self) -> int:
+        return self._gate.active
+
+    def depth_by_class(self) -> dict[Priority, int]:
+        counts = {p: 0 for p in Priority}
+        for heap in self._buckets.values():
+            for job in heap:
+                counts[Priority(job.priority)] += 1
+        return counts
+
+    def submit(self, priority: Priority, bucket: Hashable, factory: Factory) -> asyncio.Future:
+        """Queue ``factory`` on ``bucket`` and return a future for its result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self.metrics[priority].submitted += 1
+        heap = self._buckets.setdefault(bucket, [])
+
+        if len(heap) >= self.max_bucket_depth or self._total >= self.max_total:
+            if not self._make_room(heap, priority):
+                self.metrics[priority].shed += 1
+                future.set_result(None)
+                return future
+
+        heapq.heappush(heap, _Job(int(priority), next(self._seq), time.monotonic(), factory, future, contextvars.copy_context()))
+        self._total += 1
+        if bucket not in self._workers:
+            self._workers[bucket] = asyncio.create_task(self._drain(bucket))
+        return future
+
+    def _make_room(self, heap: list[_Job], priority: Priority) -> bool:
+        """Evict the least important sheddable job that ranks below ``priority``.
+
+        Returns False when the new job itself should be shed instead.
+        """
+        victims = [job for job in heap if Priority(job.priority) in SHEDDABLE]
+        if victims:
+            victim = max(victims)
+            if victim.priority > priority or priority not in SHEDDABLE:
+                heap.remove(victim)
+                heapq.heapify(heap)
+                self._total -= 1
+                self.metrics[Priority(victim.priority)].shed += 1
+                if not victim.future.done():
+                    victim.future.set_result(None)
+                return True
+        # Never shed interaction responses or announcements, even over the bound
+        return priority not in SHEDDABLE
+
+    async def _drain(self, bucket: Hashable) -> None:
+        heap = self._buckets[bucket]
+        try:
+            while heap:
+                job = heapq.heappop(heap)
+                self._total -= 1
+                if job.future.done():
+                    continue
+                metrics = self.metrics[Priority(job.priority)]
+                try:
+                    await self._run(job, metrics)
+                except asyncio.CancelledError:
+                    # Unloading: don't leave the caller awaiting send() forever
+                    if not job.future.done():
+                        job.future.cancel()
+                    raise
+        finally:
+            self._workers.pop(bucket, None)
+            if not heap:
+                self._buckets.pop(bucket, None)
+
+    async def _run(self, job: _Job, metrics: ClassMetrics) -> None:
+        for attempt in range(self.max_attempts):
+            # Hold a slot only for the call itself, not for a 429 backoff
+            await self._gate.acquire(job.priority, job.seq)
+            if attempt == 0:
+                metrics.record_wait(time.monotonic() - job.enqueued)
+            try:
+                result = await asyncio.create_task(job.factory(), context=job.context)
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == self.max_attempts - 1:
+                    metrics.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                    return
+                retry_after = float(getattr(e.response, 'headers', {}).get('Retry-After', 1.0))
+            except Exception as e:
+                metrics.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+            else:
+                metrics.completed += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+                return
+            finally:
+                self._gate.release()
+            # 429: hold the whole bucket until the limit resets, then retry
+            self.rate_limited += 1
+            logger.warning('Outbound bucket rate limited, backing off %.2fs', retry_after)
+            await asyncio.sleep(retry_after)
+        metrics.failed += 1
+        if not job.future.done():
+            job.future.set_exception(RuntimeError("rate limited after retries"))
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        for heap in self._buckets.values():
+            for job in heap:
+                if not job.future.done():
+                    job.future.cancel()
+        # Let each worker cancel the job it was running before we return
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._buckets.clear()
+        self._workers.clear()
+        self._total = 0
+
+
+def get_scheduler(bot: Any) -> Optional[OutboundScheduler]:
+    cog = bot.get_cog('Outbound') if bot else None
+    return getattr(cog, 'scheduler', None)
+
+
+async def send(bot: Any, priority: Priority, bucket: Hashable, factory: Factory) -> Any:
+    """Run ``factory`` through the scheduler and wait for its result."""
+    scheduler = get_scheduler(bot)
+    if scheduler is None:
+        return await factory()
+    return await scheduler.submit(priority, bucket, factory)
+
+
+def _log_failure(future: asyncio.Future) -> None:
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error:
+        logger.warning('Queued outbound call failed: %s', error)
+
+
+def post(bot: Any, priority: Priority, bucket: Hashable, factory: Factory) -> asyncio.Future:
+    """Fire-and-forget variant of :func:`send`; failures are logged."""
+    scheduler = get_scheduler(bot)
+    if scheduler is None:
+        future = asyncio.ensure_future(factory())
+    else:
+        future = scheduler.submit(priority, bucket, factory)
+    future.add_done_callback(_log_failure)
+    return future
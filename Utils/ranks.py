@@ -0,0 +1,58 @@
+"""
+Rank ladder compiled from ``config.RANK_LADDER``.
+
+``RANK_LADDER`` lists rank role IDs from lowest to highest. The ladder is
+compiled once into a role-id -> position index so looking up a member's rank
+is a single pass over their roles, and a promotion or demotion becomes one
+role list computed up front and applied with a single ``member.edit``.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import discord
+
+
+class RankError(Exception):
+    pass
+
+
+class RankLadder:
+    def __init__(self, role_ids: Sequence[int]):
+        self.roles: list[int] = list(dict.fromkeys(role_ids))
+        self.index: dict[int, int] = {role_id: i for i, role_id in enumerate(self.roles)}
+
+    def __bool__(self) -> bool:
+        return bool(self.roles)
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def position(self, member: discord.Member) -> Optional[int]:
+        """Ladder position of the member's highest rank role, or None if unranked."""
+        positions = [self.index[role.id] for role in member.roles if role.id in self.index]
+        return max(positions) if positions else None
+
+    def target(self, member: discord.Member, steps: int) -> tuple[Optional[int], int]:
+        """Return ``(current, new)`` positions for moving ``steps`` rungs (negative demotes)."""
+        current = self.position(member)
+        if current is None:
+            if steps < 0:
+                raise RankError(f"{member.display_name} has no rank to demote from.")
+            new = steps - 1
+        else:
+            new = current + steps
+        if new < 0:
+            raise RankError(f"{member.display_name} is already at the lowest rank.")
+        if new >= len(self.roles):
+            raise RankError(f"{member.display_name} is already at the highest rank.")
+        return current, new
+
+    def roles_for(self, member: discord.Member, guild: discord.Guild, new: int) -> list[discord.Role]:
+        """Member's roles with every ladder role replaced by the rank at ``new``."""
+        rank_role = guild.get_role(self.roles[new])
+        if rank_role is None:
+            raise RankError(f"Rank role `{self.roles[new]}` no longer exists.")
+        kept = [role for role in member.roles if role.id not in self.index and not role.is_default()]
+        return kept + [rank_role]
@@ -0,0 +1,85 @@
+"""
+Shared instrumentation point for Discord REST requests.
+
+Metrics, Tracing and the side-effect ack tracker all need to see every
+request discord.py makes: bot REST calls through ``bot.http.request`` and
+interaction responses through the webhook adapter's ``request``. If each cog
+wrapped those methods itself, unloading one out of order would restore a
+method captured before the others wrapped it and silently drop their
+instrumentation. Instead one wrapper is installed here, the first time a
+hook is added, and cogs only add or remove hooks.
+
+A hook is called as ``hook(route, kwargs)`` just before the request is sent.
+It may return a context manager, which is entered around the request, so
+exceptions from the request pass through its ``__exit__``::
+
+    @contextmanager
+    def timed(route, kwargs):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            observe(route.path, time.perf_counter() - started)
+
+    add_rest_hook(bot, timed)
+    ...
+    remove_rest_hook(timed)
+"""
+
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, ExitStack
+from typing import Any, Callable, Optional
+
+from discord.webhook.async_ import async_context
+
+# Route discord.py uses for the initial interaction response (reply or defer)
+CALLBACK_PATH = '/interactions/{webhook_id}/{webhook_token}/callback'
+
+RestHook = Callable[[Any, dict[str, Any]], Optional[AbstractContextManager]]
+
+_hooks: list[RestHook] = []
+
+
+def callback_interaction_id(route: Any) -> Optional[int]:
+    """The interaction a ``CALLBACK_PATH`` request answers, or None for any other route."""
+    if route.path != CALLBACK_PATH:
+        return None
+    try:
+        return int(route.url.split('/interactions/', 1)[1].split('/', 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _wrap(original):
+    async def request(route, *args, **kwargs):
+        if not _hooks:
+            return await original(route, *args, **kwargs)
+        with ExitStack() as stack:
+            for hook in tuple(_hooks):
+                manager = hook(route, kwargs)
+                if manager is not None:
+                    stack.enter_context(manager)
+            return await original(route, *args, **kwargs)
+
+    request.__rest_hooks__ = True  # type: ignore[attr-defined]
+    return request
+
+
+def _install(owner: Any) -> None:
+    if not getattr(owner.request, '__rest_hooks__', False):
+        owner.request = _wrap(owner.request)
+
+
+def add_rest_hook(bot: Any, hook: RestHook) -> None:
+    """Run ``hook`` around every REST request; hooks run in the order they were added."""
+    _install(bot.http)
+    _install(async_context.get())
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_rest_hook(hook: RestHook) -> None:
+    """Stop running ``hook``. The wrapper stays installed and is a plain pass-through with no hooks."""
+    if hook in _hooks:
+        _hooks.remove(hook)
@@ -0,0 +1,330 @@
+"""
+Session history with incrementally maintained rollups.
+
+Every session transition (vote started, session online, shutdown) updates a
+row in ``sessions``. In the same transaction it bumps a few small rollup tables:
+
+* ``session_hist`` - per-metric histograms (duration in minutes, time to
+  quorum in 15 second steps) so percentiles are a walk over at most a few
+  hundred buckets however many sessions have been recorded;
+* ``session_heatmap`` - starts, minutes and attendees per local weekday/hour.
+
+``/sessionstats`` only ever reads the rollups, never scans ``sessions``.
+
+Scheduled votes and announcements live in ``session_schedule``, and open
+votes with their deadlines in ``session_votes``, so they survive restarts;
+the Session cog drives them all from one ``TimerHeap``.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional
+
+from Utils.storage import SQLiteStore
+
+DURATION = "duration_min"
+QUORUM = "quorum_15s"
+
+_MAX_BUCKET = {DURATION: 24 * 60, QUORUM: 24 * 60 * 4}
+_BUCKET_SIZE = {DURATION: 60, QUORUM: 15}
+
+REPEATS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+_RELATIVE = re.compile(r"^(?:in\s+)?(?:(\d+)\s*d)?\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?$", re.IGNORECASE)
+_ABSOLUTE_FORMATS = ("%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M")
+
+
+def parse_schedule_time(text: str, tz: tzinfo, now: Optional[datetime] = None) -> datetime:
+    """Parse ``2h``, ``1d 30m``, ``19:30``, ``2025-11-01 19:30`` or ``01/11 19:30`` in ``tz``.
+
+    A bare ``HH:MM`` means the next time that clock time comes round, and
+    ``DD/MM HH:MM`` the next time that date comes round. Raises ``ValueError`` for anything else or for times in the past.
+    """
+    now = now or datetime.now(tz)
+    text = text.strip()
+    match = _RELATIVE.match(text)
+    if match and any(match.groups()):
+        days, hours, minutes = (int(g or 0) for g in match.groups())
+        delay = timedelta(days=days, hours=hours, minutes=minutes)
+        # Delays are elapsed time, so step in UTC rather than local wall-clock time
+        return datetime.fromtimestamp(now.timestamp() + delay.total_seconds(), tz)
+
+    clock = re.fullmatch(r"(\d{1,2}):(\d{2})", text)
+    if clock:
+        when = now.replace(hour=int(clock.group(1)), minute=int(clock.group(2)), second=0, microsecond=0)
+        return when if when > now else when + timedelta(days=1)
+
+    day_month = re.fullmatch(r"(\d{1,2})/(\d{1,2}) (\d{1,2}):(\d{2})", text)
+    if day_month:
+        # No year given: this year, or next year once the date has passed (29/02 needs a leap year)
+        day, month, hour, minute = (int(g) for g in day_month.groups())
+        for year in (now.year, now.year + 1, now.year + 4 - now.year % 4):
+            try:
+                when = datetime(year, month, day, hour, minute, tzinfo=tz)
+            except ValueError:
+                continue
+            if when > now:
+                return when
+        raise ValueError("That isn't a valid date.")
+
+    for fmt in _ABSOLUTE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        when = parsed.replace(tzinfo=tz)
+        if when <= now:
+            raise ValueError("That time is in the past.")
+        return when
+    raise ValueError("Use a delay like `2h` or `1d 30m`, a time like `19:30`, or a date like `2025-11-01 19:30`.")
+
+
+def next_occurrence(run_at: float, repeat: str, tz: tzinfo, after: float) -> float:
+    """Advance a repeating schedule past ``after``, keeping the local wall-clock time across DST."""
+    step = REPEATS[repeat]
+    local = datetime.fromtimestamp(run_at, tz)
+    while local.timestamp() <= after:
+        local = (local.replace(tzinfo=None) + step).replace(tzinfo=tz)
+    return local.timestamp()
+
+
+class SessionHistory(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        vote_started_at REAL,
+        initiated_by    INTEGER,
+        started_at      REAL,
+        started_by      INTEGER,
+        method          TEXT,
+        votes           INTEGER NOT NULL DEFAULT 0,
+        quorum_seconds  REAL,
+        ended_at        REAL,
+        ended_by        INTEGER,
+        duration_seconds REAL,
+        attendees       INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+    CREATE TABLE IF NOT EXISTS session_hist (
+        metric TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count  INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (metric, bucket)
+    );
+    CREATE TABLE IF NOT EXISTS session_heatmap (
+        weekday   INTEGER NOT NULL,
+        hour      INTEGER NOT NULL,
+        sessions  INTEGER NOT NULL DEFAULT 0,
+        minutes   REAL NOT NULL DEFAULT 0,
+        attendees INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (weekday, hour)
+    );
+    CREATE TABLE IF NOT EXISTS session_totals (
+        key   TEXT PRIMARY KEY,
+        value REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS session_schedule (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id   INTEGER NOT NULL,
+        kind       TEXT NOT NULL,
+        run_at     REAL NOT NULL,
+        repeat     TEXT,
+        created_by INTEGER NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS session_votes (
+        message_id INTEGER PRIMARY KEY,
+        channel_id INTEGER NOT NULL,
+        closes_at  REAL,
+        votes      TEXT NOT NULL DEFAULT ''
+    );
+    """
+
+    def __init__(self, path: str, tz: tzinfo = timezone.utc):
+        super().__init__(path)
+        self.tz = tz
+
+    @property
+    def current_id(self) -> Optional[int]:
+        value = self.get_meta("current_session")
+        return int(value) if value else None
+
+    @property
+    def online(self) -> bool:
+        """Whether the current session has started and not yet ended."""
+        current = self.current_id
+        if current is None:
+            return False
+        rows = self.execute("SELECT started_at, ended_at FROM sessions WHERE id = ?", (current,))
+        return bool(rows) and rows[0]["started_at"] is not None and rows[0]["ended_at"] is None
+
+    def _slot(self, when: float) -> tuple[int, int]:
+        local = datetime.fromtimestamp(when, self.tz)
+        return local.weekday(), local.hour
+
+    @staticmethod
+    def _bump_hist(conn, metric: str, seconds: float) -> None:
+        bucket = min(int(seconds // _BUCKET_SIZE[metric]), _MAX_BUCKET[metric])
+        conn.execute(
+            "INSERT INTO session_hist (metric, bucket, count) VALUES (?, ?, 1) "
+            "ON CONFLICT(metric, bucket) DO UPDATE SET count = count + 1",
+            (metric, bucket),
+        )
+
+    @staticmethod
+    def _bump_total(conn, key: str, amount: float = 1) -> None:
+        conn.execute(
+            "INSERT INTO session_totals (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, amount),
+        )
+
+    def vote_started(self, user_id: int, when: Optional[float] = None) -> int:
+        """Open a new session row for a vote; an earlier vote that never started stays unstarted.
+
+        A session that is still online stays current, so its later shutdown
+        closes it rather than the vote row.
+        """
+        when = time.time() if when is None else when
+        current = self.current_id
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT started_at, ended_at FROM sessions WHERE id = ?", (current,)
+            ).fetchone() if current else None
+            live = row is not None and row["started_at"] is not None and row["ended_at"] is None
+            cursor = conn.execute(
+                "INSERT INTO sessions (vote_started_at, initiated_by) VALUES (?, ?)", (when, user_id)
+            )
+            session_id = cursor.lastrowid
+            if not live:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('current_session', ?)", (str(session_id),))
+            self._bump_total(conn, "votes_started")
+        return session_id
+
+    def started(self, method: str, votes: int = 0, user_id: Optional[int] = None,
+                when: Optional[float] = None) -> int:
+        """Mark the current session online, opening a row if it was forced without a vote."""
+        when = time.time() if when is None else when
+        current = self.current_id
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT vote_started_at, started_at FROM sessions WHERE id = ?", (current,)
+            ).fetchone() if current else None
+            if row is not None and row["started_at"] is not None:
+                # Already online (e.g. /fonline after a successful vote)
+                return current
+            if row is None:
+                cursor = conn.execute("INSERT INTO sessions (initiated_by) VALUES (?)", (user_id,))
+                current = cursor.lastrowid
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('current_session', ?)", (str(current),))
+            quorum = when - row["vote_started_at"] if row is not None and row["vote_started_at"] and method == "vote" else None
+            conn.execute(
+                "UPDATE sessions SET started_at = ?, started_by = ?, method = ?, votes = ?, quorum_seconds = ? WHERE id = ?",
+                (when, user_id, method, votes, quorum, current),
+            )
+            weekday, hour = self._slot(when)
+            conn.execute(
+                "INSERT INTO session_heatmap (weekday, hour, sessions) VALUES (?, ?, 1) "
+                "ON CONFLICT(weekday, hour) DO UPDATE SET sessions = sessions + 1",
+                (weekday, hour),
+            )
+            self._bump_total(conn, "sessions")
+            self._bump_total(conn, f"method_{method}")
+            self._bump_total(conn, "votes_cast", votes)
+            if quorum is not None:
+                self._bump_hist(conn, QUORUM, quorum)
+        return current
+
+    def ended(self, user_id: Optional[int] = None, attendees: Optional[int] = None,
+              when: Optional[float] = None) -> Optional[int]:
+        """Close the current online session; returns its id, or None if nothing was online."""
+        when = time.time() if when is None else when
+        current = self.current_id
+        if current is None:
+            return None
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT started_at, ended_at FROM sessions WHERE id = ?", (current,)
+            ).fetchone()
+            if row is None or row["started_at"] is None or row["ended_at"] is not None:
+                return None
+            duration = max(0.0, when - row["started_at"])
+            conn.execute(
+                "UPDATE sessions SET ended_at = ?, ended_by = ?, duration_seconds = ?, attendees = ? WHERE id = ?",
+                (when, user_id, duration, attendees, current),
+            )
+            # Minutes and turnout are credited to the hour the session started in
+            weekday, hour = self._slot(row["started_at"])
+            conn.execute(
+                "UPDATE session_heatmap SET minutes = minutes + ?, attendees = attendees + ? WHERE weekday = ? AND hour = ?",
+                (duration / 60, attendees or 0, weekday, hour),
+            )
+            self._bump_hist(conn, DURATION, duration)
+            self._bump_total(conn, "completed")
+            self._bump_total(conn, "attendees", attendees or 0)
+            conn.execute("DELETE FROM meta WHERE key = 'current_session'")
+        return current
+
+    def percentiles(self, metric: str, points: tuple[float, ...] = (0.5, 0.9, 0.95)) -> dict[float, Optional[float]]:
+        """Percentiles in seconds from the metric's histogram (bucket lower bounds)."""
+        rows = self.execute("SELECT bucket, count FROM session_hist WHERE metric = ? ORDER BY bucket", (metric,))
+        total = sum(row["count"] for row in rows)
+        result: dict[float, Optional[float]] = {p: None for p in points}
+        if not total:
+            return result
+        targets = sorted(points)
+        seen = 0
+        index = 0
+        for row in rows:
+            seen += row["count"]
+            while index < len(targets) and seen >= targets[index] * total:
+                result[targets[index]] = row["bucket"] * _BUCKET_SIZE[metric]
+                index += 1
+        return result
+
+    def heatmap(self) -> list[tuple[int, int, int, float, int]]:
+        """``(weekday, hour, sessions, minutes, attendees)`` for every slot with at least one session."""
+        rows = self.execute("SELECT weekday, hour, sessions, minutes, attendees FROM session_heatmap WHERE sessions > 0")
+        return [(r["weekday"], r["hour"], r["sessions"], r["minutes"], r["attendees"]) for r in rows]
+
+    def totals(self) -> dict[str, float]:
+        return {row["key"]: row["value"] for row in self.execute("SELECT key, value FROM session_totals")}
+
+    def add_schedule(self, guild_id: int, kind: str, run_at: float, created_by: int,
+                     repeat: Optional[str] = None) -> int:
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO session_schedule (guild_id, kind, run_at, repeat, created_by, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, kind, run_at, repeat, created_by, time.time()),
+            )
+            return cursor.lastrowid
+
+    def reschedule(self, schedule_id: int, run_at: float) -> None:
+        self.execute("UPDATE session_schedule SET run_at = ? WHERE id = ?", (run_at, schedule_id))
+
+    def delete_schedule(self, schedule_id: int) -> bool:
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM session_schedule WHERE id = ?", (schedule_id,)).rowcount > 0
+
+    def get_schedule(self, schedule_id: int):
+        rows = self.execute("SELECT * FROM session_schedule WHERE id = ?", (schedule_id,))
+        return rows[0] if rows else None
+
+    def schedules(self) -> list:
+        return self.execute("SELECT * FROM session_schedule ORDER BY run_at")
+
+    def save_vote(self, message_id: int, channel_id: int, closes_at: Optional[float], votes: set[int]) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO session_votes (message_id, channel_id, closes_at, votes) VALUES (?, ?, ?, ?)",
+            (message_id, channel_id, closes_at, ",".join(str(v) for v in sorted(votes))),
+        )
+
+    def delete_vote(self, message_id: int) -> None:
+        self.execute("DELETE FROM session_votes WHERE message_id = ?", (message_id,))
+
+    def open_votes(self) -> list:
+        return self.execute("SELECT * FROM session_votes")
@@ -0,0 +1,181 @@
+"""
+Background queue for work that should happen after an interaction is acknowledged.
+
+Handlers answer Discord first and then ``enqueue`` DMs, thread posts and log
+writes. A fixed pool of workers drains the queue with retry and backoff;
+jobs that still fail are moved to a dead-letter list and reported through
+the ``on_dead_letter`` callback.
+
+Acknowledgement latency (interaction created -> initial response sent) is
+sampled for every interaction by ``AckTracker``, per command, so commands
+that moved work off the response path can be compared with those that
+didn't and with earlier runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+import discord
+
+logger = logging.getLogger('NZDF.side_effects')
+
+Factory = Callable[[], Awaitable[Any]]
+
+# Failures that will never succeed on retry (DMs closed, message deleted, ...)
+PERMANENT_ERRORS = (discord.Forbidden, discord.NotFound)
+
+
+@dataclass
+class SideEffect:
+    name: str
+    factory: Factory
+    attempts: int = 0
+    enqueued: float = field(default_factory=time.monotonic)
+    error: Optional[str] = None
+
+
+class SideEffectQueue:
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        maxsize: int = 1000,
+        on_dead_letter: Optional[Callable[[SideEffect], Awaitable[None]]] = None,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.on_dead_letter = on_dead_letter
+        self._queue: asyncio.Queue[SideEffect] = asyncio.Queue(maxsize=maxsize)
+        self._workers: list[asyncio.Task] = []
+        self.dead_letters: deque[SideEffect] = deque(maxlen=100)
+        self.completed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.running = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def enqueue(self, name: str, factory: Factory) -> bool:
+        try:
+            self._queue.put_nowait(SideEffect(name, factory))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning('Side-effect queue full, dropping %s', name)
+            return False
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: SideEffect) -> None:
+        while True:
+            job.attempts += 1
+            try:
+                await job.factory()
+                self.completed += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                if isinstance(e, PERMANENT_ERRORS) or job.attempts >= self.max_attempts:
+                    await self._dead_letter(job)
+                    return
+                self.retried += 1
+                await asyncio.sleep(self.base_delay * (2 ** (job.attempts - 1)))
+
+    async def _dead_letter(self, job: SideEffect) -> None:
+        self.dead_letters.append(job)
+        logger.warning('Side effect %s failed after %d attempt(s): %s', job.name, job.attempts, job.error)
+        if self.on_dead_letter:
+            try:
+                await self.on_dead_letter(job)
+            except Exception:
+                logger.exception('Dead-letter reporting failed for %s', job.name)
+
+
+class AckTracker:
+    """Rolling windows of interaction acknowledgement latencies in milliseconds, overall and per command.
+
+    ``started`` is called for every interaction and ``acknowledged`` when its
+    initial response (reply or defer) reaches Discord, so every command is
+    measured the same way whether or not it queues side effects.
+    """
+
+    def __init__(self, size: int = 500, per_label: int = 100, max_inflight: int = 512):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.by_label: dict[str, deque[float]] = {}
+        self.per_label = per_label
+        self.max_inflight = max_inflight
+        self._inflight: dict[int, str] = {}
+
+    def started(self, interaction_id: int, label: str) -> None:
+        if len(self._inflight) >= self.max_inflight:
+            # Interactions that were never answered would otherwise pile up
+            self._inflight.pop(next(iter(self._inflight)))
+        self._inflight[interaction_id] = label
+
+    def acknowledged(self, interaction_id: int) -> None:
+        label = self._inflight.pop(interaction_id, "other")
+        created = discord.utils.snowflake_time(interaction_id)
+        latency = max((discord.utils.utcnow() - created).total_seconds() * 1000, 0.0)
+        self.samples.append(latency)
+        self.by_label.setdefault(label, deque(maxlen=self.per_label)).append(latency)
+
+    def median(self, label: Optional[str] = None) -> Optional[float]:
+        samples = self.samples if label is None else self.by_label.get(label)
+        return statistics.median(samples) if samples else None
+
+
+# Fallback tasks run without the cog; the loop only keeps weak references to tasks
+_unqueued: set[asyncio.Task] = set()
+
+
+def _get_cog(bot: Any) -> Any:
+    return bot.get_cog('SideEffects') if bot else None
+
+
+async def _run_unqueued(name: str, factory: Factory) -> None:
+    try:
+        await factory()
+    except Exception as e:
+        logger.warning('Side effect %s failed: %s', name, e)
+
+
+def enqueue(bot: Any, name: str, factory: Factory) -> None:
+    """Run ``factory`` in the background after the caller has responded."""
+    cog = _get_cog(bot)
+    if cog is None:
+        task = asyncio.ensure_future(_run_unqueued(name, factory))
+        _unqueued.add(task)
+        task.add_done_callback(_unqueued.discard)
+        return
+    cog.queue.enqueue(name, factory)
@@ -0,0 +1,92 @@
+"""
+Shared SQLite helpers for the bot's local data stores.
+
+Every store lives in its own database file under ``DATA_DIR`` (defaults to
+``data/`` next to bot.py). Connections run in WAL mode so reads from slash
+commands never block on the periodic batched writes.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import config
+
+logger = logging.getLogger('NZDF.storage')
+
+
+def data_path(filename: str) -> str:
+    """Return the path of ``filename`` inside the configured data directory."""
+    directory = getattr(config, 'DATA_DIR', None) or 'data'
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+
+class SQLiteStore:
+    """Thin thread-safe wrapper around a WAL-mode SQLite connection.
+
+    Subclasses set ``SCHEMA`` to a script that is executed on open; a small
+    ``meta`` key/value table is always created for checkpoints. All calls
+    are serialized through a lock so the same store can be used from the event
+    loop and from ``asyncio.to_thread`` workers.
+    """
+
+    SCHEMA: str = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if self.SCHEMA:
+            self._conn.executescript(self.SCHEMA)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        """Run ``sql`` for every row inside a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the lock and run several statements as one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                logger.exception('Failed to close %s', self.path)
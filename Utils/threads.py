@@ -0,0 +1,45 @@
+"""
+Helpers for creating message threads reliably.
+
+Right after a message is sent, Discord can briefly answer thread creation with
+``404 Unknown Message`` while the message propagates. Instead of sleeping a
+fixed amount before every call, retry with exponential backoff only on that
+specific error; everything else is raised immediately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import discord
+
+logger = logging.getLogger('NZDF.threads')
+
+UNKNOWN_MESSAGE = 10008
+
+
+async def create_thread_with_retry(
+    message: discord.Message,
+    *,
+    name: str,
+    auto_archive_duration: int = 1440,
+    reason: str | None = None,
+    attempts: int = 4,
+    base_delay: float = 0.25,
+) -> discord.Thread:
+    """Create a thread on ``message``, retrying while the message isn't ready yet."""
+    for attempt in range(attempts):
+        try:
+            return await message.create_thread(
+                name=name,
+                auto_archive_duration=auto_archive_duration,  # type: ignore[arg-type]
+                reason=reason,
+            )
+        except discord.NotFound as e:
+            if e.code != UNKNOWN_MESSAGE or attempt == attempts - 1:
+                raise
+            delay = base_delay * (2 ** attempt)
+            logger.debug('Message %s not ready for thread creation, retrying in %.2fs', message.id, delay)
+            await asyncio.sleep(delay)
+    raise RuntimeError("unreachable")
@@ -0,0 +1,64 @@
+"""
+Persistence for ticket inactivity notices.
+
+A notice is keyed by the ticket channel and remembers the snowflake of the
+``/inactivity`` interaction. Snowflakes embed their creation time and sort by
+it, so the deadline is derived from the notice id and "has anyone replied?"
+is just ``channel.last_message_id > notice_id`` - no history fetches needed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from discord.utils import DISCORD_EPOCH
+
+from Utils.storage import SQLiteStore
+
+
+def snowflake_unix(snowflake: int) -> float:
+    """Unix timestamp (seconds) encoded in a Discord snowflake."""
+    return ((snowflake >> 22) + DISCORD_EPOCH) / 1000
+
+
+@dataclass
+class TicketNotice:
+    channel_id: int
+    notice_id: int
+    user_id: int
+    issued_by: int
+    hours: float
+
+    @property
+    def deadline(self) -> float:
+        return snowflake_unix(self.notice_id) + self.hours * 3600
+
+
+class TicketNoticeStore(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ticket_notices (
+        channel_id INTEGER PRIMARY KEY,
+        notice_id  INTEGER NOT NULL,
+        user_id    INTEGER NOT NULL,
+        issued_by  INTEGER NOT NULL,
+        hours      REAL NOT NULL
+    );
+    """
+
+    def save(self, notice: TicketNotice) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO ticket_notices (channel_id, notice_id, user_id, issued_by, hours) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (notice.channel_id, notice.notice_id, notice.user_id, notice.issued_by, notice.hours),
+        )
+
+    def get(self, channel_id: int) -> Optional[TicketNotice]:
+        rows = self.execute("SELECT * FROM ticket_notices WHERE channel_id = ?", (channel_id,))
+        return TicketNotice(**dict(rows[0])) if rows else None
+
+    def delete(self, channel_id: int) -> None:
+        self.execute("DELETE FROM ticket_notices WHERE channel_id = ?", (channel_id,))
+
+    def load_all(self) -> list[TicketNotice]:
+        return [TicketNotice(**dict(row)) for row in self.execute("SELECT * FROM ticket_notices ORDER BY notice_id")]
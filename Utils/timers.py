@@ -0,0 +1,96 @@
+"""
+Single-task timer scheduler.
+
+Rather than one sleeping task per deadline, callers register ``(key, when,
+callback)`` entries on a ``TimerHeap`` and one background task sleeps until
+the earliest deadline. Rescheduling or cancelling a key is O(log n); stale
+heap entries are skipped lazily when they surface. Deadlines are wall-clock
+Unix timestamps so they can be persisted and restored across restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger('NZDF.timers')
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class TimerHeap:
+    def __init__(self, name: str = "timers"):
+        self.name = name
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._entries: dict[Hashable, tuple[float, int, Callback]] = {}
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks; hold callbacks until they finish
+        self._firing: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"TimerHeap:{self.name}")
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, key: Hashable, when: float, callback: Callback) -> None:
+        """Run ``callback`` at Unix time ``when``, replacing any timer for ``key``."""
+        seq = next(self._seq)
+        self._entries[key] = (when, seq, callback)
+        heapq.heappush(self._heap, (when, seq, key))
+        if self._heap[0][1] == seq:
+            # New earliest deadline: wake the runner so it re-arms its sleep
+            self._wake.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def _is_live(self, item: tuple[float, int, Hashable]) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry[1] == item[1]
+
+    async def _run(self) -> None:
+        while True:
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, key = heapq.heappop(self._heap)
+            _, _, callback = self._entries.pop(key)
+            task = asyncio.create_task(self._fire(key, callback))
+            self._firing.add(task)
+            task.add_done_callback(self._firing.discard)
+
+    async def _fire(self, key: Hashable, callback: Callback) -> None:
+        try:
+            await callback()
+        except Exception:
+            logger.exception('Timer %s in %s failed', key, self.name)
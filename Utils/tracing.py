@@ -0,0 +1,282 @@
+"""
+Per-interaction tracing.
+
+Each app command, component callback and modal submit runs inside a trace;
+anything that happens while it runs (permission checks, REST calls, defers,
+followups) can open a child span with ``span(name, **attrs)``. The current
+span lives in a ``ContextVar``, so spans nest across awaits without being
+passed around, and ``span`` is a no-op outside a trace.
+
+Finished traces are buffered in memory and appended to a JSONL file (one
+trace per line) by ``Tracer.flush``, which the Tracing cog runs off the loop.
+
+Summarise a trace file with::
+
+    python -m Utils.tracing [path] [--top 10] [--command caselog]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+_current: ContextVar[Optional['Span']] = ContextVar('nzdf_trace_span', default=None)
+
+_MAX_PENDING = 2000
+
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attrs', 'start', 'end', 'status')
+
+    def __init__(self, trace: 'Trace', span_id: int, parent_id: Optional[int], name: str, attrs: dict[str, Any]):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin: float) -> dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        data: dict[str, Any] = {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+        }
+        if self.status != "ok":
+            data["status"] = self.status
+        if self.attrs:
+            data["attrs"] = self.attrs
+        return data
+
+
+class Trace:
+    def __init__(self, name: str, kind: str, attrs: dict[str, Any]):
+        self.trace_id = os.urandom(8).hex()
+        self.kind = kind
+        self.started_at = time.time()
+        self.spans: list[Span] = []
+        self.finished = False
+        self.root = self.child(name, None, attrs)
+
+    def child(self, name: str, parent: Optional[Span], attrs: dict[str, Any]) -> Span:
+        span = Span(self, len(self.spans), parent.span_id if parent else None, name, attrs)
+        # Tasks spawned by a command can outlive it; their spans are dropped rather than
+        # attached to a trace that has already been written
+        if not self.finished:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> dict[str, Any]:
+        origin = self.root.start
+        return {
+            "trace_id": self.trace_id,
+            "kind": self.kind,
+            "name": self.root.name,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(((self.root.end or time.perf_counter()) - origin) * 1000, 3),
+            "status": self.root.status,
+            "spans": [span.to_dict(origin) for span in self.spans],
+        }
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time the block as a child of the current span. Does nothing outside a trace."""
+    parent = _current.get()
+    if parent is None or parent.trace.finished:
+        yield None
+        return
+    child = parent.trace.child(name, parent, attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = type(e).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+
+class Tracer:
+    """Starts root traces and writes finished ones to a JSONL file."""
+
+    def __init__(self, path: str, sample_rate: float = 1.0, max_bytes: int = 5_000_000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.dropped = 0
+        self._pending: list[str] = []
+
+    @contextmanager
+    def trace(self, name: str, kind: str, **attrs: Any) -> Iterator[Optional[Span]]:
+        if not self.enabled or _current.get() is not None or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(name, kind, attrs)
+        token = _current.set(trace.root)
+        try:
+            yield trace.root
+        except BaseException as e:
+            trace.root.status = type(e).__name__
+            raise
+        finally:
+            trace.root.end = time.perf_counter()
+            trace.finished = True
+            _current.reset(token)
+            self._record(trace)
+
+    def _record(self, trace: Trace) -> None:
+        if len(self._pending) >= _MAX_PENDING:
+            self._pending.pop(0)
+            self.dropped += 1
+        self._pending.append(json.dumps(trace.to_dict(), separators=(",", ":"), default=str))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def take(self) -> list[str]:
+        """Hand over buffered lines (call on the loop, then ``write`` them from a thread)."""
+        lines, self._pending = self._pending, []
+        return lines
+
+    def write(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def flush(self) -> None:
+        self.write(self.take())
+
+
+# ---------------------- SUMMARY CLI ------------------ #
+
+def load_traces(path: str) -> list[dict[str, Any]]:
+    traces = []
+    for candidate in (path + ".1", path):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    traces.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return traces
+
+
+def critical_path(trace: dict[str, Any]) -> list[tuple[int, dict[str, Any]]]:
+    """The chain of spans the root actually waited on, as (depth, span) pairs.
+
+    Working back from the end of each span, take the child that finished last,
+    then the child that finished last before that one started, and so on;
+    overlapping (concurrent) children that finished earlier didn't hold it up.
+    """
+    children: dict[Optional[int], list[dict[str, Any]]] = {}
+    for s in trace["spans"]:
+        children.setdefault(s["parent"], []).append(s)
+
+    def walk(node: dict[str, Any], depth: int) -> list[tuple[int, dict[str, Any]]]:
+        chain = []
+        cursor = node["start_ms"] + node["duration_ms"]
+        for child in sorted(children.get(node["id"], []), key=lambda s: s["start_ms"] + s["duration_ms"], reverse=True):
+            if child["start_ms"] + child["duration_ms"] <= cursor + 1e-6:
+                chain.append(child)
+                cursor = child["start_ms"]
+        path = [(depth, node)]
+        for child in reversed(chain):
+            path.extend(walk(child, depth + 1))
+        return path
+
+    roots = children.get(None, [])
+    return walk(roots[0], 0) if roots else []
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _describe(s: dict[str, Any]) -> str:
+    attrs = s.get("attrs") or {}
+    detail = attrs.get("route") or attrs.get("permission") or ""
+    status = f" [{s['status']}]" if s.get("status") else ""
+    return f"{s['name']} {detail}".strip() + status
+
+
+def summarize(traces: list[dict[str, Any]], top: int = 10) -> str:
+    if not traces:
+        return "No traces recorded."
+    by_name: dict[str, list[dict[str, Any]]] = {}
+    for t in traces:
+        by_name.setdefault(f"{t['kind']}:{t['name']}", []).append(t)
+
+    lines = [f"{len(traces)} traces\n", f"{'name':<40} {'count':>6} {'p50':>9} {'p95':>9} {'max':>9} {'errors':>7}"]
+    rows = []
+    for name, group in by_name.items():
+        durations = sorted(t["duration_ms"] for t in group)
+        errors = sum(1 for t in group if t.get("status", "ok") != "ok")
+        rows.append((_percentile(durations, 0.95), name, len(group), _percentile(durations, 0.5), durations[-1], errors))
+    for p95, name, count, p50, worst, errors in sorted(rows, reverse=True):
+        lines.append(f"{name[:40]:<40} {count:>6} {p50:>8.1f}ms {p95:>7.1f}ms {worst:>7.1f}ms {errors:>7}")
+
+    lines.append(f"\nSlowest {min(top, len(traces))} traces (critical path):")
+    for t in sorted(traces, key=lambda t: t["duration_ms"], reverse=True)[:top]:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t["started_at"]))
+        queued = ((t["spans"][0].get("attrs") or {}).get("queued_ms") if t["spans"] else None)
+        lines.append(
+            f"\n{t['kind']}:{t['name']} {t['duration_ms']:.1f}ms at {when} ({t.get('status', 'ok')})"
+            + (f", queued {queued:.0f}ms before starting" if queued is not None else "")
+        )
+        path = critical_path(t)
+        waited = sum(s["duration_ms"] for depth, s in path if depth == 1)
+        for depth, s in path[1:]:
+            lines.append(f"  {'  ' * (depth - 1)}+{s['start_ms']:>7.1f}ms {s['duration_ms']:>8.1f}ms  {_describe(s)}")
+        lines.append(f"  {'':>10} {max(0.0, t['duration_ms'] - waited):>8.1f}ms  (own code between spans)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Summarise the bot's interaction traces.")
+    parser.add_argument("path", nargs="?", default=None, help="Trace file (defaults to traces.jsonl in DATA_DIR)")
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest traces to break down")
+    parser.add_argument("--command", help="Only include traces with this name")
+    args = parser.parse_args(argv)
+
+    path = args.path
+    if path is None:
+        from Utils.storage import data_path
+        path = data_path("traces.jsonl")
+    traces = load_traces(path)
+    if args.command:
+        traces = [t for t in traces if t["name"] == args.command]
+    print(summarize(traces, args.top))
+
+
+if __name__ == "__main__":
+    main()
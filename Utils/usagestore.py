@@ -0,0 +1,249 @@
+"""
+Command usage analytics with incrementally maintained rollups.
+
+Every slash command completion is stored as a compact row in ``usage``:
+command id (a small integer from ``usage_commands``, not the name), user,
+channel, Unix time, duration in ms and success. Rows are queued by ``add``
+and written in batches by ``flush``. The same transaction adds the batch to
+two rollup tables, each kept at three grains (minute, hour, day, all UTC):
+
+* ``usage_by_command`` - uses, errors and total duration per command;
+* ``usage_by_user`` - uses and errors per user.
+
+``stats`` answers any window from the rollups alone. The window is tiled
+with as few buckets as possible: whole days in the middle, then whole hours,
+then minutes at the edges. Minute rollups are kept for two days and hour
+rollups for 90 days, so a window edge further back than that is widened to
+a whole hour or day.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from Utils.storage import SQLiteStore
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+GRAINS = (DAY, HOUR, MINUTE)
+# How long each rollup grain is kept (seconds); day rollups are kept forever
+ROLLUP_RETENTION = {MINUTE: 2 * DAY, HOUR: 90 * DAY}
+
+_WINDOW = re.compile(r"^(?:(\d+)\s*w)?\s*(?:(\d+)\s*d)?\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?$", re.IGNORECASE)
+
+
+def parse_window(text: str) -> int:
+    """Parse ``90m``, ``24h``, ``7d`` or ``1w 2d`` into seconds. Raises ``ValueError`` otherwise."""
+    match = _WINDOW.match(text.strip())
+    if not match or not any(match.groups()):
+        raise ValueError("Use a length like `90m`, `24h`, `7d` or `2w`.")
+    weeks, days, hours, minutes = (int(g or 0) for g in match.groups())
+    seconds = ((weeks * 7 + days) * 24 + hours) * 3600 + minutes * 60
+    if seconds <= 0:
+        raise ValueError("The window must be longer than zero.")
+    return seconds
+
+
+def cover(start: int, end: int) -> list[tuple[int, int, int]]:
+    """Tile ``[start, end)`` with rollup buckets, coarsest first, as ``(grain, first, stop)`` ranges.
+
+    ``start`` is rounded down and ``end`` up to whole minutes.
+    """
+    start -= start % MINUTE
+    end += -end % MINUTE
+    ranges: list[tuple[int, int, int]] = []
+
+    def split(lo: int, hi: int, grains: tuple[int, ...]) -> None:
+        if lo >= hi:
+            return
+        grain, finer = grains[0], grains[1:]
+        if not finer:
+            ranges.append((grain, lo, hi))
+            return
+        first = -(-lo // grain) * grain
+        last = hi // grain * grain
+        if first >= last:
+            split(lo, hi, finer)
+            return
+        ranges.append((grain, first, last))
+        split(lo, first, finer)
+        split(last, hi, finer)
+
+    split(start, end, GRAINS)
+    return ranges
+
+
+@dataclass
+class UsageStats:
+    start: int
+    end: int
+    uses: int = 0
+    errors: int = 0
+    # (command name, uses, errors, average duration in ms), most used first
+    commands: list[tuple[str, int, int, float]] = field(default_factory=list)
+    # (user id, uses, errors), most active first
+    users: list[tuple[int, int, int]] = field(default_factory=list)
+    buckets_read: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.uses if self.uses else 0.0
+
+
+class UsageStore(SQLiteStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS usage_commands (
+        id   INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS usage (
+        command_id  INTEGER NOT NULL,
+        user_id     INTEGER NOT NULL,
+        channel_id  INTEGER,
+        at          INTEGER NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        success     INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_usage_at ON usage (at);
+    CREATE TABLE IF NOT EXISTS usage_by_command (
+        grain       INTEGER NOT NULL,
+        bucket      INTEGER NOT NULL,
+        command_id  INTEGER NOT NULL,
+        uses        INTEGER NOT NULL DEFAULT 0,
+        errors      INTEGER NOT NULL DEFAULT 0,
+        duration_ms INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (grain, bucket, command_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS usage_by_user (
+        grain   INTEGER NOT NULL,
+        bucket  INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        uses    INTEGER NOT NULL DEFAULT 0,
+        errors  INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (grain, bucket, user_id)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pending: list[tuple[str, int, Optional[int], int, int, bool]] = []
+        self._pending_lock = threading.Lock()
+        self._command_ids = self._load_command_ids()
+
+    def _load_command_ids(self) -> dict[str, int]:
+        return {row["name"]: row["id"] for row in self.execute("SELECT id, name FROM usage_commands")}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, command: str, user_id: int, channel_id: Optional[int], at: float, duration_ms: float, success: bool) -> None:
+        """Queue one command completion for the next batched write."""
+        with self._pending_lock:
+            self._pending.append((command, user_id, channel_id, int(at), int(duration_ms), success))
+
+    def _command_id(self, conn, name: str) -> int:
+        command_id = self._command_ids.get(name)
+        if command_id is None:
+            conn.execute("INSERT OR IGNORE INTO usage_commands (name) VALUES (?)", (name,))
+            command_id = conn.execute("SELECT id FROM usage_commands WHERE name = ?", (name,)).fetchone()["id"]
+            self._command_ids[name] = command_id
+        return command_id
+
+    def flush(self) -> int:
+        """Write queued rows and fold them into the rollups in one transaction. Returns the number written."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            with self.transaction() as conn:
+                rows = [
+                    (self._command_id(conn, name), user_id, channel_id, at, duration_ms, int(success))
+                    for name, user_id, channel_id, at, duration_ms, success in batch
+                ]
+                conn.executemany(
+                    "INSERT INTO usage (command_id, user_id, channel_id, at, duration_ms, success) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                # Aggregate in Python first so each rollup row is written once per batch
+                by_command: dict[tuple[int, int, int], list[int]] = defaultdict(lambda: [0, 0, 0])
+                by_user: dict[tuple[int, int, int], list[int]] = defaultdict(lambda: [0, 0])
+                for command_id, user_id, _, at, duration_ms, success in rows:
+                    for grain in GRAINS:
+                        bucket = at - at % grain
+                        command = by_command[(grain, bucket, command_id)]
+                        command[0] += 1
+                        command[1] += 1 - success
+                        command[2] += duration_ms
+                        user = by_user[(grain, bucket, user_id)]
+                        user[0] += 1
+                        user[1] += 1 - success
+                conn.executemany(
+                    "INSERT INTO usage_by_command (grain, bucket, command_id, uses, errors, duration_ms) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(grain, bucket, command_id) DO UPDATE SET uses = uses + excluded.uses, "
+                    "errors = errors + excluded.errors, duration_ms = duration_ms + excluded.duration_ms",
+                    [(*key, *totals) for key, totals in by_command.items()],
+                )
+                conn.executemany(
+                    "INSERT INTO usage_by_user (grain, bucket, user_id, uses, errors) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(grain, bucket, user_id) DO UPDATE SET uses = uses + excluded.uses, errors = errors + excluded.errors",
+                    [(*key, *totals) for key, totals in by_user.items()],
+                )
+        except Exception:
+            # Put the batch back so the next flush retries it; ids handed out in the failed transaction are gone
+            with self._pending_lock:
+                self._pending[:0] = batch
+            self._command_ids = self._load_command_ids()
+            raise
+        return len(batch)
+
+    def prune(self, raw_retention_days: float, now: Optional[float] = None) -> None:
+        """Drop raw rows and fine-grained rollups past their retention."""
+        now = time.time() if now is None else now
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM usage WHERE at < ?", (int(now - raw_retention_days * DAY),))
+            for grain, keep in ROLLUP_RETENTION.items():
+                for table in ("usage_by_command", "usage_by_user"):
+                    conn.execute(f"DELETE FROM {table} WHERE grain = ? AND bucket < ?", (grain, int(now - keep)))
+
+    @staticmethod
+    def _align(when: int, now: int, up: bool) -> int:
+        # Minute and hour rollups are pruned with age, so old window edges move to coarser buckets
+        for grain, coarser in ((MINUTE, HOUR), (HOUR, DAY)):
+            if now - when > ROLLUP_RETENTION[grain] - coarser:
+                when = -(-when // coarser) * coarser if up else when - when % coarser
+        return when
+
+    def stats(self, start: float, end: float, limit: int = 10, now: Optional[float] = None) -> UsageStats:
+        """Totals, top commands and top users for ``[start, end)``, read from the rollups."""
+        now = int(time.time() if now is None else now)
+        start, end = self._align(int(start), now, up=False), self._align(int(end), now, up=True)
+        ranges = cover(start, end)
+        params = [value for r in ranges for value in r]
+        where = " OR ".join("(r.grain = ? AND r.bucket >= ? AND r.bucket < ?)" for _ in ranges) or "0"
+        result = UsageStats(start=start, end=end)
+
+        totals = self.execute(
+            f"SELECT COUNT(*) AS n, COALESCE(SUM(uses), 0) AS uses, COALESCE(SUM(errors), 0) AS errors "
+            f"FROM usage_by_command r WHERE {where}", params,
+        )[0]
+        result.uses, result.errors, result.buckets_read = totals["uses"], totals["errors"], totals["n"]
+
+        rows = self.execute(
+            f"SELECT c.name AS name, SUM(r.uses) AS uses, SUM(r.errors) AS errors, SUM(r.duration_ms) AS duration_ms "
+            f"FROM usage_by_command r JOIN usage_commands c ON c.id = r.command_id WHERE {where} "
+            f"GROUP BY r.command_id ORDER BY uses DESC, name LIMIT ?", [*params, limit],
+        )
+        result.commands = [(row["name"], row["uses"], row["errors"], row["duration_ms"] / row["uses"]) for row in rows]
+
+        rows = self.execute(
+            f"SELECT r.user_id AS user_id, SUM(r.uses) AS uses, SUM(r.errors) AS errors FROM usage_by_user r WHERE {where} "
+            f"GROUP BY r.user_id ORDER BY uses DESC, r.user_id LIMIT ?", [*params, limit],
+        )
+        result.users = [(row["user_id"], row["uses"], row["errors"]) for row in rows]
+        return result
@@ -0,0 +1,153 @@
+"""
+Event loop stall detector.
+
+A tiny ticker coroutine stamps ``time.monotonic()`` every ``tick`` seconds.
+A daemon thread watches the stamp; once it is older than ``threshold`` the
+loop is blocked by a synchronous callback, and the thread samples the loop
+thread's current stack with ``sys._current_frames()``. That shows what is
+blocking *while* it blocks. It keeps sampling every ``threshold`` (up to
+``max_samples``) until the ticker runs again, and the ticker then hands the
+finished ``Stall`` to ``on_stall`` on the loop.
+
+Nothing here touches the loop from the watcher thread except reading frames,
+so an unhealthy loop can't stop the watchdog from seeing it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger('NZDF.watchdog')
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Stall:
+    started_at: float  # wall clock
+    duration: float = 0.0
+    samples: list[traceback.StackSummary] = field(default_factory=list)
+
+    def hotspots(self, limit: int = 3) -> list[tuple[int, traceback.StackSummary]]:
+        """Distinct sampled stacks (keyed by their innermost frames), most frequent first."""
+        counts: Counter = Counter()
+        first: dict[tuple, traceback.StackSummary] = {}
+        for stack in self.samples:
+            key = tuple((f.filename, f.lineno) for f in stack[-3:])
+            counts[key] += 1
+            first.setdefault(key, stack)
+        return [(count, first[key]) for key, count in counts.most_common(limit)]
+
+
+def format_stack(stack: traceback.StackSummary, max_frames: int = 6) -> str:
+    """Innermost frames, keeping our own code and the frame that was actually running."""
+    frames = list(stack)
+    if not frames:
+        return "(no frames)"
+    innermost = frames[-1]
+    ours = [f for f in frames if f.filename.startswith(_PROJECT_ROOT) and 'site-packages' not in f.filename]
+    shown = ours[-(max_frames - 1):] if ours else frames[-max_frames:]
+    if innermost not in shown:
+        shown.append(innermost)
+    lines = []
+    for frame in shown:
+        filename = os.path.relpath(frame.filename, _PROJECT_ROOT) if frame.filename.startswith(_PROJECT_ROOT) else os.path.basename(frame.filename)
+        lines.append(f"{filename}:{frame.lineno} in {frame.name}")
+        if frame.line:
+            lines.append(f"    {frame.line.strip()[:80]}")
+    return "\n".join(lines)
+
+
+class LoopStallWatchdog:
+    def __init__(self, threshold: float = 0.25, tick: float = 0.05, max_samples: int = 5,
+                 on_stall: Optional[Callable[[Stall], Awaitable[None]]] = None):
+        self.threshold = threshold
+        self.tick = tick
+        self.max_samples = max_samples
+        self.on_stall = on_stall
+        self.enabled = True
+        self.stalls = 0
+        self.worst = 0.0
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._current: Optional[Stall] = None
+        self._last_sample = 0.0
+        self._loop_thread: Optional[int] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start from a coroutine running on the loop to be watched."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._ticker = asyncio.create_task(self._tick(), name="LoopStallWatchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._ticker:
+            self._ticker.cancel()
+            self._ticker = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            now = time.monotonic()
+            with self._lock:
+                stall, self._current = self._current, None
+                if stall is not None:
+                    stall.duration = now - self._last_tick
+                self._last_tick = now
+            if stall is not None:
+                self.stalls += 1
+                self.worst = max(self.worst, stall.duration)
+                if self.on_stall:
+                    try:
+                        await self.on_stall(stall)
+                    except Exception:
+                        logger.exception('Stall callback failed')
+
+    def _watch(self) -> None:
+        poll = max(0.01, self.threshold / 4)
+        while not self._stop.wait(poll):
+            if not self.enabled:
+                continue
+            now = time.monotonic()
+            with self._lock:
+                behind = now - self._last_tick
+                if behind < self.threshold:
+                    continue
+                if self._current is None:
+                    self._current = Stall(started_at=time.time() - behind)
+                    self._last_sample = 0.0
+                stall = self._current
+                if len(stall.samples) >= self.max_samples or now - self._last_sample < self.threshold:
+                    continue
+                self._last_sample = now
+            frame = sys._current_frames().get(self._loop_thread or 0)
+            if frame is not None:
+                stack = traceback.extract_stack(frame)
+                with self._lock:
+                    if self._current is stall:
+                        stall.samples.append(stack)
@@ -0,0 +1,69 @@
+"""
+Fixed-size rolling sample windows for latency percentiles.
+
+Samples go into a preallocated ``array('d')`` ring buffer, so recording is an
+index store regardless of how often it happens. Percentiles are computed on
+demand by sorting a copy of at most ``size`` floats, which only happens when
+someone asks (e.g. ``/ping``).
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Sequence
+
+
+class RollingWindow:
+    def __init__(self, size: int):
+        self.size = size
+        self._samples = array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def add(self, value: float) -> None:
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self.count += 1
+
+    @property
+    def last(self) -> float | None:
+        return self._samples[self._next - 1] if self.count else None
+
+    def values(self) -> list[float]:
+        """Samples in the window, oldest first."""
+        if self.count < self.size:
+            return self._samples[:self.count].tolist()
+        return (self._samples[self._next:] + self._samples[:self._next]).tolist()
+
+    @staticmethod
+    def _percentiles(ordered: Sequence[float], points: Sequence[float]) -> list[float]:
+        n = len(ordered)
+        # Nearest-rank percentile
+        return [ordered[min(n - 1, max(0, int(-(-p * n // 1)) - 1))] for p in points]
+
+    def percentiles(self, points: Sequence[float] = (0.5, 0.95, 0.99)) -> list[float] | None:
+        values = self.values()
+        if not values:
+            return None
+        return self._percentiles(sorted(values), points)
+
+    def trend(self, threshold: float = 0.2) -> str:
+        """Arrow comparing the median of the newest quarter of samples to the whole window."""
+        values = self.values()
+        if len(values) < 8:
+            return "→"
+        recent = sorted(values[-max(2, len(values) // 4):])
+        overall = sorted(values)
+        recent_p50 = self._percentiles(recent, (0.5,))[0]
+        overall_p50 = self._percentiles(overall, (0.5,))[0]
+        if overall_p50 <= 0:
+            return "→"
+        change = (recent_p50 - overall_p50) / overall_p50
+        if change > threshold:
+            return "↑"
+        if change < -threshold:
+            return "↓"
+        return "→"
@@ -2,8 +2,12 @@ import discord
 from discord.ext import commands, tasks 
 import os 
 import asyncio 
+import logging
 from itertools import cycle 
 from dotenv import load_dotenv
+from Utils.logsetup import setup_logging
+
+logger = logging.getLogger('NZDF.bot')
 
 bot = commands.Bot(command_prefix='!', intents=discord.Intents.all())
 
@@ -18,13 +22,13 @@ async def change_status():
 ## ------------- BOT ONLINE IN TERMINAL ------------- #
 @bot.event 
 async def on_ready():
-    print('☑️ Bot online')
+    logger.info('Bot online as %s', bot.user)
     change_status.start()
     try:
         synced = await bot.tree.sync() 
-        print(f'☑️ Synced {len(synced)} commands.') 
-    except Exception as e:
-        print(f"❌ ERROR: Failed to sync commands: {e}") 
+        logger.info('Synced %d commands', len(synced))
+    except Exception:
+        logger.exception('Failed to sync commands')
 
 
 
@@ -49,7 +53,8 @@ async def on_command_error(ctx, error):
         await ctx.send("❌ You don't have the required role to use this command.")
         return
 
-    print(f"[PrefixCmdError] {getattr(ctx.command, 'qualified_name', 'unknown')}: {error}")
+    cmd_name = getattr(ctx.command, 'qualified_name', 'unknown')
+    logger.error('Prefix command %s failed: %s', cmd_name, error, exc_info=error, extra={"command": cmd_name})
     
     # Try to log the error to the logging channel
     logging_cog = bot.get_cog('LoggingSystem')
@@ -66,8 +71,8 @@ async def on_command_error(ctx, error):
                 embed.add_field(name="User", value=f"{ctx.author.mention} ({ctx.author.display_name})", inline=True)
                 embed.add_field(name="Error", value=f"```{str(error)[:500]}```", inline=False)
                 await channel.send(embed=embed)
-        except Exception as log_error:
-            print(f"[LOGGING] Failed to log prefix command error: {log_error}")
+        except Exception:
+            logger.exception('Failed to log prefix command error')
     
     try:
         await ctx.send(f"❌ An error occurred: {error}")
@@ -77,9 +82,10 @@ async def on_command_error(ctx, error):
 # Slash command (app command) errors
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error):
+    # Cogs that count failures listen for this instead of wrapping tree.on_error
+    bot.dispatch("app_command_failed", interaction, error)
     try:
         cmd_name = getattr(getattr(interaction, 'command', None), 'qualified_name', 'unknown')
-        print(f"[AppCmdError] {cmd_name}: {error}")
         # Permission-related errors: inform the user which roles are required but do NOT ping admins
         from discord import app_commands as _appcmd
         import config as _config
@@ -87,6 +93,7 @@ async def on_app_command_error(interaction: discord.Interaction, error):
         # If this is a permission/check failure (or wraps one), inform the user and do NOT ping admins
         orig = getattr(error, 'original', None)
         if isinstance(error, _appcmd.CheckFailure) or isinstance(orig, _appcmd.CheckFailure):
+            logger.info('App command %s refused: %s', cmd_name, error, extra={"command": cmd_name, "user_id": interaction.user.id})
             # Try to determine which role(s) would be required for this command
             required = _config.get_command_roles(cmd_name) or _config.ROLE_CONFIG.get(f"{cmd_name.upper()}_ALLOWED_ROLES", [])
             if required:
@@ -108,6 +115,8 @@ async def on_app_command_error(interaction: discord.Interaction, error):
                 await interaction.followup.send(msg, ephemeral=True)
             return
 
+        logger.error('App command %s failed: %s', cmd_name, error, exc_info=orig or error,
+                     extra={"command": cmd_name, "user_id": interaction.user.id})
         # Unexpected errors: try to get the logging system cog for enhanced error logging
         logging_cog = bot.get_cog('LoggingSystem')
         if logging_cog and hasattr(logging_cog, 'log_error_with_ping'):
@@ -118,9 +127,9 @@ async def on_app_command_error(interaction: discord.Interaction, error):
             await interaction.response.send_message("❌ Something went wrong running that command. The error has been logged and admins have been notified.", ephemeral=True)
         else:
             await interaction.followup.send("❌ Something went wrong running that command. The error has been logged and admins have been notified.", ephemeral=True)
-    except Exception as e:
+    except Exception:
         # Last-ditch logging if even error handling fails
-        print(f"[AppCmdErrorHandlerFailure] {e}")
+        logger.exception('App command error handler failed')
 
 # ---------------------- COGS ------------------ #
 
@@ -130,12 +139,13 @@ async def load():
             continue
         try:
             await bot.load_extension(f'Cogs.{filename[:-3]}')
-            print(f"⚙️ Successfully loaded Cog: {filename}")
-        except Exception as e:
-            print(f"❌ Failed to load Cog: {filename}: {str(e)}")
+            logger.info('Loaded cog %s', filename)
+        except Exception:
+            logger.exception('Failed to load cog %s', filename)
 
 #--------------------- RUN BOT ------------------ #
 async def main():
+    setup_logging()
     async with bot:
         await load()
         await bot.start(TOKEN) 